@@ -0,0 +1,239 @@
+"""
+Escalado de deutsch_jozsa_qiskit con n para cada método de AerSimulator.
+
+Cada configuración (n, método, ruido) se mide en un proceso hijo creado con
+fork, para que el pico de memoria (ru_maxrss) sea el de esa configuración y
+un método que se quede sin memoria o tarde demasiado no tumbe el barrido.
+Se guarda el tiempo por ejecución de 1 shot (lo que hace el barrido de
+ruido), los shots por segundo con muchos shots y el pico de RSS.
+
+Una sola medida por configuración no basta para elegir método: entre
+métodos parecidos el más rápido cambia de una ejecución a otra. Por eso el
+barrido se repite en `--rondas` rondas intercaladas (todas las
+configuraciones en cada ronda, para que la carga del sistema afecte a todos
+los métodos por igual) y en varios niveles de ruido. El tiempo de un método
+para (ruido, n) es la suma sobre los niveles de la mediana entre rondas. La
+tabla de rutas que consulta Cuantico/rutasimulador.py se suaviza en rangos
+de n: al subir n sólo se cambia de método si el nuevo es más de un
+`--tolerancia` más rápido que el actual, y un método abandonado no vuelve.
+
+    python escalado.py --n 2 4 6 8 10 12 --rondas 3 --guardar
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "Cuantico"))
+
+from rutasimulador import PATH_RUTAS
+
+METODOS = ["statevector", "density_matrix", "stabilizer", "matrix_product_state"]
+
+# Memoria máxima estimada para intentar density_matrix (16 bytes * 4^(n+1))
+MEMORIA_MAXIMA_DENSIDAD = 2 * 1024**3
+
+
+def _medir(n, metodo, ruido, nivel, repeticiones, shots, conexion):
+    from qiskit_aer import AerSimulator
+    from Analisismodelosruido import build_noise_model, deutsch_jozsa_circuit
+
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        # Oráculo balanceado con una CNOT por qubit de entrada: el caso más costoso
+        circuito = deutsch_jozsa_circuit(n, "balanced", 2**n - 1)
+        opciones = {"noise_model": build_noise_model(nivel, ruido)} if ruido else {}
+        simulador = AerSimulator(method=metodo)
+
+        resultado = simulador.run(circuito, shots=1, **opciones).result()
+        if not resultado.success:
+            raise RuntimeError(resultado.status)
+        if ruido is None and resultado.get_counts() != {"1" * n: 1}:
+            raise RuntimeError(f"resultado incorrecto: {resultado.get_counts()}")
+
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            simulador.run(circuito, shots=1, **opciones).result()
+            tiempos.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        simulador.run(circuito, shots=shots, **opciones).result()
+        duracion_shots = time.perf_counter() - inicio
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        conexion.send({
+            "valido": True,
+            "tiempo_s": float(np.median(tiempos)),
+            "shots_por_s": shots / duracion_shots,
+            "rss_pico_mb": rss / 1024,
+            "rss_extra_mb": (rss - rss_inicial) / 1024
+        })
+    except Exception as e:
+        conexion.send({"valido": False, "error": f"{type(e).__name__}: {e}"[:200]})
+
+
+def medir_configuracion(n, metodo, ruido, nivel=0.05, repeticiones=20, shots=1000, tiempo_limite=120):
+    """
+    Mide una configuración en un proceso hijo.
+
+    Returns:
+        diccionario con n, metodo, ruido, valido y las medidas (o error)
+    """
+    medida = {"n": n, "metodo": metodo, "ruido": ruido or "ideal"}
+    if metodo == "density_matrix" and 16 * 4 ** (n + 1) > MEMORIA_MAXIMA_DENSIDAD:
+        medida.update(valido=False, error="omitido: matriz densidad demasiado grande")
+        return medida
+
+    contexto = multiprocessing.get_context("fork")
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_medir, args=(n, metodo, ruido, nivel, repeticiones, shots, emisor))
+    proceso.start()
+    if receptor.poll(tiempo_limite):
+        medida.update(receptor.recv())
+    else:
+        proceso.terminate()
+        medida.update(valido=False, error=f"tiempo límite de {tiempo_limite} s")
+    proceso.join()
+    return medida
+
+
+def tiempos_por_metodo(medidas):
+    """
+    Agrega las medidas de todas las rondas y niveles.
+
+    Returns:
+        diccionario ruido -> {n: {método: segundos}}, con la suma sobre los
+        niveles de la mediana entre rondas; sólo los métodos válidos en todas
+        las medidas
+    """
+    por_configuracion = {}
+    for medida in medidas:
+        clave = (medida["ruido"], medida["n"], medida["metodo"])
+        por_configuracion.setdefault(clave, []).append(medida)
+
+    tiempos = {}
+    for (ruido, n, metodo), grupo in por_configuracion.items():
+        if not all(medida["valido"] for medida in grupo):
+            continue
+        por_nivel = {}
+        for medida in grupo:
+            por_nivel.setdefault(medida.get("nivel"), []).append(medida["tiempo_s"])
+        tiempos.setdefault(ruido, {}).setdefault(n, {})[metodo] = float(sum(np.median(t) for t in por_nivel.values()))
+    return tiempos
+
+
+def tabla_rutas(medidas, tolerancia=0.1):
+    """
+    Elige un método por (ruido, n) en rangos de n crecientes: se mantiene el
+    método del n anterior mientras sea válido y el más rápido no lo mejore en
+    más de `tolerancia` (fracción); un método abandonado no vuelve a elegirse.
+
+    Returns:
+        diccionario ruido -> {n: método}
+    """
+    rutas = {}
+    for ruido, por_n in tiempos_por_metodo(medidas).items():
+        actual = None
+        descartados = set()
+        rutas[ruido] = {}
+        for n in sorted(por_n):
+            candidatos = {metodo: t for metodo, t in por_n[n].items() if metodo not in descartados}
+            if not candidatos:
+                candidatos = por_n[n]
+            mejor = min(candidatos, key=candidatos.get)
+            if actual not in candidatos or candidatos[mejor] < (1 - tolerancia) * candidatos[actual]:
+                if actual is not None:
+                    descartados.add(actual)
+                actual = mejor
+            rutas[ruido][str(n)] = actual
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalado de los métodos de AerSimulator con n")
+    parser.add_argument("--n", type=int, nargs="+", default=[2, 4, 6, 8, 10, 12])
+    parser.add_argument("--metodos", nargs="+", default=METODOS)
+    parser.add_argument("--ruidos", nargs="+", default=["ideal", "depolarizing", "dephasing", "damping"])
+    parser.add_argument("--niveles", type=float, nargs="+", default=[0.05, 0.3],
+                        help="niveles de ruido de las medidas con ruido")
+    parser.add_argument("--repeticiones", type=int, default=20, help="ejecuciones de 1 shot por medida (mediana)")
+    parser.add_argument("--rondas", type=int, default=3, help="rondas intercaladas de todo el barrido")
+    parser.add_argument("--descarte", type=float, default=5.0,
+                        help="tras la primera ronda no se repiten los métodos más de estas veces más lentos que el mejor")
+    parser.add_argument("--tolerancia", type=float, default=0.1,
+                        help="mejora relativa mínima para cambiar de método al subir n")
+    parser.add_argument("--shots", type=int, default=1000)
+    parser.add_argument("--tiempo-limite", type=float, default=120)
+    parser.add_argument("--guardar", nargs="?", const=PATH_RUTAS, help="escribir la tabla de rutas")
+    args = parser.parse_args()
+
+    # Importar qiskit una vez aquí: los hijos creados con fork lo heredan ya cargado
+    import Analisismodelosruido  # noqa: F401
+
+    configuraciones = [(n, None if ruido == "ideal" else ruido, nivel)
+                       for n in args.n for ruido in args.ruidos
+                       for nivel in ([None] if ruido == "ideal" else args.niveles)]
+    metodos = {configuracion: list(args.metodos) for configuracion in configuraciones}
+    medidas = []
+    print(f"{'Ronda':>5} | {'n':>3} | {'Ruido':<12} | {'Nivel':>5} | {'Método':<20} | {'1 shot (ms)':>11} | "
+          f"{'shots/s':>9} | {'RSS (MB)':>8}")
+    for ronda in range(args.rondas):
+        for configuracion in configuraciones:
+            n, ruido, nivel = configuracion
+            ronda_actual = []
+            for metodo in metodos[configuracion]:
+                medida = medir_configuracion(n, metodo, ruido, nivel or 0.0, args.repeticiones, args.shots,
+                                             args.tiempo_limite)
+                medida.update(nivel=nivel, ronda=ronda)
+                ronda_actual.append(medida)
+                texto = (f"{medida['tiempo_s']*1e3:>11.2f} | {medida['shots_por_s']:>9.0f} | {medida['rss_pico_mb']:>8.0f}"
+                         if medida["valido"] else f"no válido: {medida['error'][:60]}")
+                print(f"{ronda:>5} | {n:>3} | {medida['ruido']:<12} | {nivel or 0:>5.2f} | {metodo:<20} | {texto}")
+            medidas.extend(ronda_actual)
+            if ronda == 0:
+                # Los métodos muy lentos (o no válidos) no necesitan más rondas para
+                # descartarse: su tiempo se queda con la medida de la primera ronda
+                validas = [medida for medida in ronda_actual if medida["valido"]]
+                if validas:
+                    mejor = min(medida["tiempo_s"] for medida in validas)
+                    metodos[configuracion] = [medida["metodo"] for medida in validas
+                                              if medida["tiempo_s"] <= args.descarte * mejor]
+
+    rutas = tabla_rutas(medidas, args.tolerancia)
+    print("\nRUTAS (método más rápido por configuración):")
+    for ruido, por_n in rutas.items():
+        print(f"  {ruido:<12}: " + ", ".join(f"n={n} {metodo}" for n, metodo in por_n.items()))
+
+    if args.guardar:
+        import qiskit_aer
+        with open(args.guardar, 'w', encoding='utf-8') as f:
+            json.dump({
+                "metadatos": {
+                    "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "plataforma": platform.platform(),
+                    "qiskit_aer": qiskit_aer.__version__,
+                    "comando": " ".join(["python", "Benchmarks/escalado.py"] + sys.argv[1:]),
+                    "niveles_ruido": args.niveles,
+                    "rondas": args.rondas,
+                    "repeticiones": args.repeticiones,
+                    "descarte": args.descarte,
+                    "tolerancia": args.tolerancia,
+                    "criterio": "suma sobre los niveles de la mediana entre rondas del tiempo de 1 shot, "
+                                "suavizada en rangos de n crecientes"
+                },
+                "rutas": rutas,
+                "medidas": medidas
+            }, f, indent=2)
+        print(f"\nTabla de rutas guardada en {args.guardar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "Clasico"))
+sys.path.insert(0, os.path.join(RAIZ, "Cuantico"))
+
+PATH_CALIBRACION = os.path.join(RAIZ, "Cuantico", "Cesga", "2025_04_23__12_00_02.json")
+PATH_RESULTADOS = os.path.join(RAIZ, "Cuantico", "Cesga", "4qubitscesga.json")
+PATH_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Cada benchmark es una función que prepara los datos y devuelve la función a medir
+BENCHMARKS = {}
+
+
+def benchmark(nombre):
+    def registrar(preparar):
+        BENCHMARKS[nombre] = preparar
+        return preparar
+    return registrar
+
+
+class BenchmarkOmitido(Exception):
+    """El benchmark no puede ejecutarse en este entorno (falta una dependencia)."""
+
+
+# --- Clásico -----------------------------------------------------------------
+
+def _registrar_clasicos():
+    for n in (8, 12, 16):
+        def preparar_oraculo(n=n):
+            from AjusteexponencialClasico import create_oracle
+            return lambda: create_oracle(n, "balanceado")
+        benchmark(f"create_oracle_balanceado_n{n}")(preparar_oraculo)
+
+        def preparar_clasico_balanceado(n=n):
+            from AjusteexponencialClasico import create_oracle, deutsch_jozsa_classical
+            oracle = create_oracle(n, "balanceado")
+            return lambda: deutsch_jozsa_classical(n, oracle)
+        benchmark(f"deutsch_jozsa_classical_balanceado_n{n}")(preparar_clasico_balanceado)
+
+        def preparar_clasico_constante(n=n):
+            from AjusteexponencialClasico import create_oracle, deutsch_jozsa_classical
+            oracle = create_oracle(n, "constante")
+            return lambda: deutsch_jozsa_classical(n, oracle)
+        benchmark(f"deutsch_jozsa_classical_constante_n{n}")(preparar_clasico_constante)
+
+
+_registrar_clasicos()
+
+
+@benchmark("bootstrap_modelos_ajuste_1000")
+def _bootstrap_ajuste():
+    from ajustemodelos import bootstrap_modelos
+    rng = np.random.default_rng(0)
+    n = np.arange(2, 20)
+    evaluaciones = np.array([rng.integers(1, 2**(k-1) + 2, 200) for k in n])
+    return lambda: bootstrap_modelos(n, evaluaciones, num_remuestreos=1000, semilla=0)
+
+
+# --- Cuántico ----------------------------------------------------------------
+
+@benchmark("deutsch_jozsa_circuit_n4")
+def _circuito_n4():
+    from Analisismodelosruido import deutsch_jozsa_circuit
+    return lambda: deutsch_jozsa_circuit(4, "balanced", 11)
+
+
+@benchmark("deutsch_jozsa_circuit_n10")
+def _circuito_n10():
+    from Analisismodelosruido import deutsch_jozsa_circuit
+    return lambda: deutsch_jozsa_circuit(10, "balanced", 2**10 - 2)
+
+
+@benchmark("deutsch_jozsa_qiskit_ideal_n4")
+def _ejecucion_ideal():
+    from Analisismodelosruido import deutsch_jozsa_qiskit
+    return lambda: deutsch_jozsa_qiskit(4, "balanced", 11)
+
+
+@benchmark("deutsch_jozsa_qiskit_despolarizante_n4")
+def _ejecucion_ruido():
+    from Analisismodelosruido import deutsch_jozsa_qiskit
+    return lambda: deutsch_jozsa_qiskit(4, "balanced", 11, 0.1, "depolarizing")
+
+
+@benchmark("build_noise_model_dephasing")
+def _modelo_uniforme():
+    from Analisismodelosruido import build_noise_model
+    return lambda: build_noise_model(0.1, "dephasing")
+
+
+@benchmark("construir_modelo_ruido_calibrado")
+def _modelo_calibrado():
+    from calibracion import cargar_calibracion
+    from ruidocalibrado import construir_modelo_ruido
+    calibracion = cargar_calibracion(PATH_CALIBRACION)
+    return lambda: construir_modelo_ruido(calibracion, [2, 6, 11, 12, 3])
+
+
+@benchmark("evaluate_accuracy_with_error_celda")
+def _celda_barrido():
+    from Analisismodelosruido import evaluate_accuracy_with_error
+
+    def celda():
+        # Una celda del barrido: un nivel de ruido, 10 pruebas, 1 ejecución
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            evaluate_accuracy_with_error(4, [0.1], num_tests=10, num_runs=1, usar_cache=False)
+    return celda
+
+
+@benchmark("transpile_fakeqmio_n4")
+def _transpile_fakeqmio():
+    try:
+        from qmiotools.integrations.qiskitqmio.fakeqmio import FakeQmio
+    except ImportError:
+        raise BenchmarkOmitido("qmiotools no está instalado")
+    from qiskit import transpile
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    backend = FakeQmio(PATH_CALIBRACION)
+    circuit = deutsch_jozsa_circuit(4, "balanced", 11)
+    return lambda: transpile(circuit, backend, initial_layout=[2, 6, 11, 12, 3], optimization_level=2)
+
+
+def _opciones_calibracion():
+    from qiskit.transpiler import CouplingMap
+    from calibracion import aristas_acoplamiento, cargar_calibracion
+
+    coupling_map = CouplingMap(aristas_acoplamiento(cargar_calibracion(PATH_CALIBRACION)))
+    return {"coupling_map": coupling_map, "basis_gates": ["ecr", "rz", "sx", "x"]}
+
+
+@benchmark("transpile_calibracion_n4")
+def _transpile_calibracion():
+    from qiskit import transpile
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    opciones = _opciones_calibracion()
+    circuit = deutsch_jozsa_circuit(4, "balanced", 11)
+    return lambda: transpile(circuit, initial_layout=[2, 6, 11, 12, 3], optimization_level=2, **opciones)
+
+
+@benchmark("gestor_pases_calibracion_n4")
+def _gestor_pases():
+    from transpilacion import gestor_pases
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    gestor = gestor_pases(None, [2, 6, 11, 12, 3], **_opciones_calibracion())
+    circuit = deutsch_jozsa_circuit(4, "balanced", 11)
+    return lambda: gestor.run(circuit)
+
+
+@benchmark("seleccionar_layout_n4_sin_cache")
+def _layout():
+    import calibracion
+
+    def seleccionar():
+        calibracion._cache_layouts.clear()
+        calibracion.seleccionar_layout(PATH_CALIBRACION, 4)
+    return seleccionar
+
+
+# --- Carga de resultados ----------------------------------------------------
+
+@benchmark("json_load_resultados_4qubits")
+def _json_resultados():
+    def cargar():
+        with open(PATH_RESULTADOS, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return cargar
+
+
+@benchmark("cargar_calibracion")
+def _json_calibracion():
+    # Lectura sin la caché por proceso de cargar_calibracion
+    from calibracion import leer_calibracion
+    return lambda: leer_calibracion(PATH_CALIBRACION)
+
+
+@benchmark("bootstrap_pruebas_4qubits_1e5")
+def _bootstrap():
+    from intervalos import bootstrap_pruebas
+    with open(PATH_RESULTADOS, 'r', encoding='utf-8') as f:
+        pruebas = json.load(f)["pruebas"]
+    return lambda: bootstrap_pruebas(pruebas, num_remuestreos=100000, semilla=0)
+
+
+# --- Medición y comparación -------------------------------------------------
+
+def medir(funcion, repeticiones=7, tiempo_minimo=0.2):
+    """
+    Mide el tiempo por llamada de una función.
+
+    Primero calibra cuántas llamadas caben en tiempo_minimo y después toma
+    `repeticiones` muestras de ese bloque.
+
+    Args:
+        funcion: función sin argumentos a medir
+        repeticiones: número de muestras
+        tiempo_minimo: duración mínima de cada muestra en segundos
+
+    Returns:
+        diccionario con mediana, mínimo, media, desviación y rango
+        intercuartílico por llamada (s)
+    """
+    funcion()  # calentamiento: imports perezosos, cachés de qiskit...
+
+    llamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= tiempo_minimo or llamadas >= 1 << 20:
+            break
+        llamadas *= 2 if transcurrido < tiempo_minimo / 10 else max(2, int(tiempo_minimo / transcurrido) + 1)
+
+    muestras = [transcurrido / llamadas]
+    for _ in range(repeticiones - 1):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        muestras.append((time.perf_counter() - inicio) / llamadas)
+
+    muestras = np.array(muestras)
+    q1, q3 = np.percentile(muestras, [25, 75])
+    return {
+        "mediana": float(np.median(muestras)),
+        "minimo": float(muestras.min()),
+        "media": float(muestras.mean()),
+        "desviacion": float(muestras.std(ddof=1)) if len(muestras) > 1 else 0.0,
+        "iqr": float(q3 - q1),
+        "llamadas_por_muestra": llamadas
+    }
+
+
+def ejecutar(filtro=None, repeticiones=7, tiempo_minimo=0.2):
+    """
+    Ejecuta los benchmarks registrados.
+
+    Args:
+        filtro: subcadena que deben contener los nombres (None = todos)
+        repeticiones: muestras por benchmark
+        tiempo_minimo: duración mínima de cada muestra en segundos
+
+    Returns:
+        diccionario nombre -> estadísticas (o {"omitido": motivo})
+    """
+    resultados = {}
+    for nombre, preparar in BENCHMARKS.items():
+        if filtro and filtro not in nombre:
+            continue
+        print(f"\r{nombre:<45}", end="", flush=True)
+        random.seed(42)
+        try:
+            funcion = preparar()
+        except BenchmarkOmitido as e:
+            resultados[nombre] = {"omitido": str(e)}
+            continue
+        resultados[nombre] = medir(funcion, repeticiones, tiempo_minimo)
+    print("\r" + " " * 45 + "\r", end="")
+    return resultados
+
+
+def combinar_rondas(rondas):
+    """
+    Combina varias rondas de ejecutar quedándose, para cada benchmark, con la
+    ronda de menor mínimo. La carga del sistema cambia entre rondas más de lo
+    que cambia entre las repeticiones de una misma ronda, así que la baseline
+    se guarda con la mejor de varias y la tolerancia incluye la dispersión de
+    los mínimos entre rondas.
+
+    Args:
+        rondas: lista de resultados de ejecutar
+
+    Returns:
+        diccionario nombre -> estadísticas, como ejecutar
+    """
+    combinados = {}
+    for nombre in rondas[0]:
+        medidas = [ronda[nombre] for ronda in rondas if "omitido" not in ronda[nombre]]
+        if not medidas:
+            combinados[nombre] = rondas[0][nombre]
+            continue
+        mejor = dict(min(medidas, key=lambda m: m["minimo"]))
+        minimos = [m["minimo"] for m in medidas]
+        mejor["iqr"] = max([m["iqr"] for m in medidas] + [max(minimos) - min(minimos)])
+        combinados[nombre] = mejor
+    return combinados
+
+
+def metadatos():
+    versiones = {"python": platform.python_version(), "numpy": np.__version__}
+    for modulo in ("qiskit", "qiskit_aer", "qmiotools"):
+        try:
+            versiones[modulo] = __import__(modulo).__version__
+        except (ImportError, AttributeError):
+            versiones[modulo] = None
+    return {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor(),
+        "versiones": versiones
+    }
+
+
+def comparar(actual, baseline, umbral=0.2, factor_iqr=3.0):
+    """
+    Compara los resultados actuales con la baseline guardada.
+
+    Se compara el mínimo de las repeticiones, que es la estimación menos
+    sensible a las interrupciones del sistema (el ruido sólo puede sumar
+    tiempo). Para que un benchmark con mucha variación entre repeticiones no
+    dé falsas regresiones, la tolerancia es la mayor entre umbral·mínimo y
+    factor_iqr veces el rango intercuartílico de la baseline.
+
+    Args:
+        actual: resultados de ejecutar
+        baseline: resultados guardados con --guardar
+        umbral: variación relativa mínima del mínimo a partir de la cual se
+            marca una mejora o una regresión
+        factor_iqr: múltiplo del rango intercuartílico de la baseline que se
+            tolera como ruido
+
+    Returns:
+        lista de nombres con regresión
+    """
+    regresiones = []
+    print(f"{'Benchmark':<45} | {'Baseline':>11} | {'Actual':>11} | {'Ratio':>6} |")
+    print("-" * 85)
+    for nombre, estadisticas in actual.items():
+        base = baseline.get(nombre)
+        if "omitido" in estadisticas:
+            print(f"{nombre:<45} | {'':>11} | {'omitido':>11} | {'':>6} |")
+            continue
+        if base is None or "omitido" in base:
+            print(f"{nombre:<45} | {'-':>11} | {_formatear(estadisticas['minimo']):>11} | {'':>6} | nuevo")
+            continue
+        tolerancia = max(umbral * base["minimo"], factor_iqr * base.get("iqr", 0.0))
+        diferencia = estadisticas["minimo"] - base["minimo"]
+        if diferencia > tolerancia:
+            estado = "REGRESIÓN"
+            regresiones.append(nombre)
+        elif diferencia < -tolerancia:
+            estado = "mejora"
+        else:
+            estado = ""
+        ratio = estadisticas["minimo"] / base["minimo"]
+        print(f"{nombre:<45} | {_formatear(base['minimo']):>11} | {_formatear(estadisticas['minimo']):>11} | {ratio:6.2f} | {estado}")
+    return regresiones
+
+
+def _formatear(segundos):
+    for unidad, factor in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if segundos >= factor:
+            return f"{segundos / factor:.3f} {unidad}"
+    return f"{segundos / 1e-9:.1f} ns"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks de los caminos críticos del TFG")
+    parser.add_argument("--filtro", help="ejecutar sólo los benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--guardar", action="store_true", help="guardar los resultados como nueva baseline")
+    parser.add_argument("--baseline", default=PATH_BASELINE, help="fichero de baseline")
+    parser.add_argument("--umbral", type=float, default=0.2, help="variación relativa mínima para marcar regresión")
+    parser.add_argument("--factor-iqr", type=float, default=3.0,
+                        help="múltiplo del rango intercuartílico de la baseline tolerado como ruido")
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--rondas", type=int, default=1,
+                        help="ejecutar los benchmarks varias veces y quedarse con la mejor ronda")
+    parser.add_argument("--tiempo-minimo", type=float, default=0.2)
+    args = parser.parse_args()
+
+    resultados = combinar_rondas([ejecutar(args.filtro, args.repeticiones, args.tiempo_minimo)
+                                  for _ in range(args.rondas)])
+
+    if args.guardar:
+        baseline = {"metadatos": metadatos(), "resultados": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline["resultados"] = json.load(f).get("resultados", {})
+        baseline["resultados"].update(resultados)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"Baseline guardada en {args.baseline}")
+        for nombre, estadisticas in resultados.items():
+            valor = estadisticas.get("omitido") or _formatear(estadisticas["minimo"])
+            print(f"  {nombre:<45} {valor}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Comparando con la baseline del {baseline['metadatos']['fecha']} ({baseline['metadatos']['plataforma']})")
+        regresiones = comparar(resultados, baseline["resultados"], args.umbral, args.factor_iqr)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones: {', '.join(regresiones)}")
+            sys.exit(1)
+    else:
+        print(f"No existe {args.baseline}; ejecuta con --guardar para crearla")
+        for nombre, estadisticas in resultados.items():
+            valor = estadisticas.get("omitido") or _formatear(estadisticas["minimo"])
+            print(f"  {nombre:<45} {valor}")
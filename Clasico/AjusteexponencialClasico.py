@@ -1,8 +1,12 @@
+import os
 import random
-import matplotlib.pyplot as plt
+import sys
 import numpy as np
-from scipy import stats
-from scipy.optimize import curve_fit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cacheresultados import calcular_celdas
+from ajustemodelos import bootstrap_modelos, comparar_modelos
+from consultas import auditar, escanear
 
 def create_oracle(n, type="balanceado"):
     """Crea el oráculo."""
@@ -15,33 +19,20 @@ def create_oracle(n, type="balanceado"):
         mapping = {i: values[i] for i in range(2**n)}
         return lambda x: mapping[x]
 
+@auditar
 def deutsch_jozsa_classical(n, oracle):
-    evaluations = 1
-    first_output = oracle(0)
-    
-    for x in range(1, 2**(n-1)+1):
-        if oracle(x) != first_output:
-            return evaluations
-        evaluations += 1
-    
-    return evaluations
+    # Peor caso: 2^(n-1) + 1 consultas
+    return escanear(oracle, 2**(n-1))
 
 # Función de ajuste: y = a * 2^n
 def exponential_func(n, a):
     return a * (2 ** n)
 
-# Parámetros
-num_trials = 200
-rango = range(2, 20)
-media = []
-error_estandar = []
-
-print("Calculando estadísticas para cada valor de n...")
-print("=" * 50)
-
-for n in rango:
+def _estadisticas_n(spec):
+    """Media y error estándar de las evaluaciones para un único valor de n."""
+    n, num_trials = spec["n"], spec["num_trials"]
     evaluaciones_por_trial = []
-    
+
     for _ in range(num_trials):
         if random.random() < 0.5:
             oracle = create_oracle(n, "constante")
@@ -49,91 +40,193 @@ for n in rango:
         else:
             oracle = create_oracle(n, "balanceado")
             evaluaciones_por_trial.append(deutsch_jozsa_classical(n, oracle))
-    
+
     mean_val = np.mean(evaluaciones_por_trial)
     std_val = np.std(evaluaciones_por_trial, ddof=1)  
     se_val = std_val / np.sqrt(num_trials)  
+
+    return {"media": float(mean_val), "error_estandar": float(se_val), "evaluaciones": evaluaciones_por_trial}
+
+def _celdas(rango, num_trials, seed):
+    return [{"experimento": "ajuste_clasico", "version": 3, "n": n, "num_trials": num_trials, "seed": seed}
+            for n in rango]
+
+def calcular_estadisticas(rango, num_trials=200, seed=None, usar_cache=True):
+    """
+    Calcula la media y el error estándar del número de evaluaciones para cada n.
+    Cada n es una celda de la caché de resultados: al ampliar el rango sólo
+    se calculan los valores nuevos.
+    
+    Args:
+        rango: valores de n a evaluar
+        num_trials: número de experimentos por valor de n
+        seed: semilla (cada n usa una semilla derivada de ella)
+        usar_cache: reutilizar y guardar resultados en la caché
+    
+    Returns:
+        tupla (media, error_estandar, evaluaciones): media y error estándar con
+        un valor por cada n, y las evaluaciones de cada prueba de las que salen,
+        array (len(rango), num_trials) para remuestrear en el bootstrap
+    """
+    print("Calculando estadísticas para cada valor de n...")
+    print("=" * 50)
+
+    resultados = calcular_celdas(_celdas(rango, num_trials, seed), _estadisticas_n, usar_cache=usar_cache)
+
+    media = [r["media"] for r in resultados]
+    error_estandar = [r["error_estandar"] for r in resultados]
+    evaluaciones = np.array([r["evaluaciones"] for r in resultados])
+    for n, mean_val, se_val in zip(rango, media, error_estandar):
+        print(f"n={n:2d}: μ={mean_val:8.2f}, SE={se_val:6.3f}")
+
+    print("=" * 50)
+
+    return media, error_estandar, evaluaciones
+
+def ajustar(rango, media, error_estandar, evaluaciones=None, num_remuestreos=1000):
+    """
+    Ajusta y = a * 2^n ponderando por el error estándar, compara los modelos
+    de ajustemodelos.MODELOS por AIC/BIC e imprime el análisis.
+    
+    Args:
+        rango: valores de n
+        media: media de evaluaciones por n
+        error_estandar: error estándar por n
+        evaluaciones: evaluaciones por prueba (len(rango), num_trials); si se
+            indican, se añaden intervalos bootstrap de los parámetros
+        num_remuestreos: remuestreos del bootstrap
+    
+    Returns:
+        diccionario con a, a_error, a_intervalo, r_squared, r_pearson, cv_mean y modelos
+    """
+    x = np.array(rango)
+    y = np.array(media)
+    std_errors = np.array(error_estandar)
+
+    # AJUSTE: y = a * 2^n, mínimos cuadrados ponderados por 1/SE²
+    modelos = comparar_modelos(x, y, std_errors)
+    ajuste = next(m for m in modelos if m["modelo"] == "a·2^n")
+    a = ajuste["parametros"]["a"]
+    a_error = ajuste["errores"]["a"]
+
+    # Calcular valores ajustados
+    fit_y = exponential_func(x, a)
+
+    # Coeficiente de determinación (R²)
+    r_squared = ajuste["r_squared"]
+
+    # Coeficiente de Pearson
+    correlation_matrix = np.corrcoef(y, fit_y)
+    r_pearson = correlation_matrix[0, 1]
+
+    # Análisis de la variabilidad
+    cv_mean = np.mean(std_errors / y) * 100
+
+    print("="*60)
+    print("           ANÁLISIS DEL ALGORITMO DEUTSCH-JOZSA")
+    print("="*60)
+    print(f"Ecuación del ajuste:")
+    print(f"    y = {a:.6f} × 2^n")
+    print(f"    Error en 'a': ±{a_error:.6f}")
+    print()
+    print(f"Coeficiente de determinación (R²): {r_squared:.4f}")
+    print(f"Coeficiente de correlación de Pearson: {r_pearson:.4f}")
+    print(f"Coeficiente de variación promedio (CV): {cv_mean:.2f}%")
+
+    bootstrap = bootstrap_modelos(x, evaluaciones, num_remuestreos=num_remuestreos) if evaluaciones is not None else {}
+
+    print()
+    print(f"{'Modelo':<14} | {'χ²_red':>9} | {'ΔAIC':>9} | {'ΔBIC':>9} | {'Peso':>6} | Parámetros (IC 95%)")
+    bic_minimo = min(m["bic"] for m in modelos)
+    for m in modelos:
+        intervalos = bootstrap.get(m["modelo"], m)["intervalos"]
+        parametros = ", ".join(f"{p}={v:.4g} [{intervalos[p][0]:.4g}, {intervalos[p][1]:.4g}]"
+                               for p, v in m["parametros"].items())
+        print(f"{m['modelo']:<14} | {m['chi2_reducido']:>9.3g} | {m['delta_aic']:>9.2f} | "
+              f"{m['bic'] - bic_minimo:>9.2f} | {m['peso_akaike']:>6.3f} | {parametros}")
+    if bootstrap:
+        print(f"Intervalos bootstrap ({num_remuestreos} remuestreos); selección por AIC: " +
+              ", ".join(f"{nombre} {datos['frecuencia_seleccion']:.0%}" for nombre, datos in bootstrap.items()))
+        for m in modelos:
+            m["bootstrap"] = bootstrap[m["modelo"]]
+
+    return {
+        "a": float(a),
+        "a_error": float(a_error),
+        "a_intervalo": (bootstrap.get("a·2^n") or ajuste)["intervalos"]["a"],
+        "r_squared": float(r_squared),
+        "r_pearson": float(r_pearson),
+        "cv_mean": float(cv_mean),
+        "modelos": modelos
+    }
+
+def graficar_ajuste(rango, media, error_estandar, a):
+    """
+    Dibuja los datos experimentales con barras de error y la curva ajustada.
     
-    # Guardar resultados
-    media.append(mean_val)
-    error_estandar.append(se_val)
+    Args:
+        rango: valores de n
+        media: media de evaluaciones por n
+        error_estandar: error estándar por n
+        a: coeficiente del ajuste y = a * 2^n
     
-    print(f"n={n:2d}: μ={mean_val:8.2f}, SE={se_val:6.3f}")
-
-print("=" * 50)
-
-x = np.array(rango)
-y = np.array(media)
-std_errors = np.array(error_estandar)
-
-# AJUSTE: y = a * 2^n
-popt, pcov = curve_fit(exponential_func, x, y)
-a = popt[0]
-a_error = np.sqrt(np.diag(pcov))[0]
-
-# Calcular valores ajustados
-fit_y = exponential_func(x, a)
-
-# Coeficiente de determinación (R²)
-ss_res = np.sum((y - fit_y) ** 2)
-ss_tot = np.sum((y - np.mean(y)) ** 2)
-r_squared = 1 - (ss_res / ss_tot)
-
-# Coeficiente de Pearson
-correlation_matrix = np.corrcoef(y, fit_y)
-r_pearson = correlation_matrix[0, 1]
-
-# Análisis de la variabilidad
-cv_mean = np.mean(std_errors / y) * 100
-
-print("="*60)
-print("           ANÁLISIS DEL ALGORITMO DEUTSCH-JOZSA")
-print("="*60)
-print(f"Ecuación del ajuste:")
-print(f"    y = {a:.6f} × 2^n")
-print(f"    Error en 'a': ±{a_error:.6f}")
-print()
-print(f"Coeficiente de determinación (R²): {r_squared:.4f}")
-print(f"Coeficiente de correlación de Pearson: {r_pearson:.4f}")
-print(f"Coeficiente de variación promedio (CV): {cv_mean:.2f}%")
-
-# Gráfica
-plt.rcParams.update({'font.size': 12, 'font.family': 'serif'})
-fig, ax = plt.subplots(figsize=(10, 7))
-
-# Datos experimentales con barras de error
-ax.errorbar(rango, media, yerr=3*std_errors, fmt='o', color='blue', 
-            markersize=6, markerfacecolor='lightblue', markeredgecolor='blue', 
-            markeredgewidth=0.7, ecolor='red', elinewidth=2.5, capsize=0,
-            label="Datos experimentales ± 3σ")
-
-# Línea de ajuste
-x_smooth = np.linspace(min(rango), max(rango), 100)
-fit_y_smooth = exponential_func(x_smooth, a)
-ax.plot(x_smooth, fit_y_smooth, '-', color='red', linewidth=2, 
-        label=f'Ajuste: y = {a:.4f} × 2$^n$')
-
-# Escala logarítmica
-ax.set_yscale("log", base=2)
-
-# Etiquetas y título académicos
-ax.set_xlabel("Número de bits (n)", fontsize=14)
-ax.set_ylabel("Número de evaluaciones", fontsize=14)
-ax.set_title("Algoritmo Deutsch-Jozsa Clásico", 
-             fontsize=16, pad=20)
-ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.8)
-ax.grid(True, alpha=0.15, linestyle='-', linewidth=0.3, which='minor')
-
-ax.legend(fontsize=12, loc='upper left', frameon=True)
-
-ax.tick_params(axis='both', which='major', labelsize=11)
-
-ax.set_xticks(rango)
-ax.set_xlim(min(rango)-0.5, max(rango)+0.5)
-
-# Fondo blanco 
-ax.set_facecolor('white')
-fig.patch.set_facecolor('white')
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+    Returns:
+        figura de matplotlib
+    """
+    import matplotlib.pyplot as plt
+
+    std_errors = np.array(error_estandar)
+
+    # Gráfica
+    plt.rcParams.update({'font.size': 12, 'font.family': 'serif'})
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    # Datos experimentales con barras de error
+    ax.errorbar(rango, media, yerr=3*std_errors, fmt='o', color='blue', 
+                markersize=6, markerfacecolor='lightblue', markeredgecolor='blue', 
+                markeredgewidth=0.7, ecolor='red', elinewidth=2.5, capsize=0,
+                label="Datos experimentales ± 3σ")
+
+    # Línea de ajuste
+    x_smooth = np.linspace(min(rango), max(rango), 100)
+    fit_y_smooth = exponential_func(x_smooth, a)
+    ax.plot(x_smooth, fit_y_smooth, '-', color='red', linewidth=2, 
+            label=f'Ajuste: y = {a:.4f} × 2$^n$')
+
+    # Escala logarítmica
+    ax.set_yscale("log", base=2)
+
+    # Etiquetas y título académicos
+    ax.set_xlabel("Número de bits (n)", fontsize=14)
+    ax.set_ylabel("Número de evaluaciones", fontsize=14)
+    ax.set_title("Algoritmo Deutsch-Jozsa Clásico", 
+                 fontsize=16, pad=20)
+    ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.8)
+    ax.grid(True, alpha=0.15, linestyle='-', linewidth=0.3, which='minor')
+
+    ax.legend(fontsize=12, loc='upper left', frameon=True)
+
+    ax.tick_params(axis='both', which='major', labelsize=11)
+
+    ax.set_xticks(rango)
+    ax.set_xlim(min(rango)-0.5, max(rango)+0.5)
+
+    # Fondo blanco 
+    ax.set_facecolor('white')
+    fig.patch.set_facecolor('white')
+
+    plt.tight_layout()
+
+    return fig
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # Parámetros
+    num_trials = 200
+    rango = range(2, 20)
+
+    media, error_estandar, evaluaciones = calcular_estadisticas(rango, num_trials)
+    ajuste = ajustar(rango, media, error_estandar, evaluaciones)
+    graficar_ajuste(rango, media, error_estandar, ajuste["a"])
+    plt.show()
@@ -0,0 +1,248 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+# Cota inferior del error estándar relativo a la media, para que un punto con
+# SE = 0 (todas las pruebas iguales) no tenga peso infinito
+ERROR_RELATIVO_MINIMO = 1e-3
+
+
+def _columnas(*columnas):
+    return np.stack([np.asarray(c, dtype=float) for c in columnas], axis=-1)
+
+
+def _polinomio(grado):
+    return {
+        "parametros": [f"c{k}" for k in range(grado + 1)],
+        "espacio": "lineal",
+        "diseno": lambda n: _columnas(*(n ** k for k in range(grado + 1)))
+    }
+
+
+# Todos los modelos son lineales en sus parámetros, directamente o en log2(y),
+# así que se ajustan por mínimos cuadrados ponderados en forma cerrada.
+MODELOS = {
+    "a·2^n": {
+        "parametros": ["a"],
+        "espacio": "lineal",
+        "diseno": lambda n: _columnas(2.0 ** n)
+    },
+    "a·2^(n-1)+c": {
+        "parametros": ["a", "c"],
+        "espacio": "lineal",
+        "diseno": lambda n: _columnas(2.0 ** (n - 1), np.ones_like(n))
+    },
+    # log2(y) = log2(a) + b·n
+    "a·2^(bn)": {
+        "parametros": ["a", "b"],
+        "espacio": "log",
+        "diseno": lambda n: _columnas(np.ones_like(n), n)
+    },
+    "polinomio_2": _polinomio(2),
+    "polinomio_3": _polinomio(3),
+}
+
+
+def _sigma(y, sigma):
+    return np.maximum(sigma, ERROR_RELATIVO_MINIMO * np.maximum(np.abs(y), 1.0))
+
+
+def _minimos_cuadrados(X, y, w):
+    """
+    Mínimos cuadrados ponderados en forma cerrada, vectorizado sobre las
+    dimensiones iniciales de y y w.
+
+    Args:
+        X: matriz de diseño (N, p)
+        y: observaciones (..., N)
+        w: pesos 1/σ² (..., N)
+
+    Returns:
+        tupla (beta (..., p), covarianza (..., p, p))
+    """
+    A = np.einsum('...n,np,nq->...pq', w, X, X)
+    b = np.einsum('...n,np,...n->...p', w, X, y)
+    covarianza = np.linalg.inv(A)
+    beta = np.einsum('...pq,...q->...p', covarianza, b)
+    return beta, covarianza
+
+
+def ajustar_lote(nombre, n, y, sigma):
+    """
+    Ajusta un modelo a muchos conjuntos de datos a la vez (p.ej. los
+    remuestreos de un bootstrap).
+
+    Args:
+        nombre: clave de MODELOS
+        n: valores de n (N,)
+        y: medias (..., N)
+        sigma: errores estándar (..., N)
+
+    Returns:
+        tupla (parametros (..., p) en la forma del modelo, chi2 (...,), beta, covarianza)
+        donde beta y covarianza son los del problema lineal (en log2 para
+        los modelos en espacio logarítmico)
+    """
+    modelo = MODELOS[nombre]
+    n = np.asarray(n, dtype=float)
+    y = np.asarray(y, dtype=float)
+    sigma = _sigma(y, np.asarray(sigma, dtype=float))
+    X = modelo["diseno"](n)
+
+    if modelo["espacio"] == "log":
+        # Propagación del error: σ(log2 y) = σ / (y·ln 2)
+        sigma_log = sigma / (y * math.log(2))
+        beta, covarianza = _minimos_cuadrados(X, np.log2(y), 1 / sigma_log ** 2)
+        parametros = beta.copy()
+        parametros[..., 0] = 2.0 ** beta[..., 0]
+        prediccion = 2.0 ** np.einsum('np,...p->...n', X, beta)
+    else:
+        beta, covarianza = _minimos_cuadrados(X, y, 1 / sigma ** 2)
+        parametros = beta
+        prediccion = np.einsum('np,...p->...n', X, beta)
+
+    # χ² siempre en el espacio original, para poder comparar modelos
+    chi2 = np.sum(((y - prediccion) / sigma) ** 2, axis=-1)
+    return parametros, chi2, beta, covarianza
+
+
+def predecir(nombre, parametros, n):
+    """Evalúa un modelo ajustado en los valores de n."""
+    modelo = MODELOS[nombre]
+    n = np.asarray(n, dtype=float)
+    parametros = np.asarray(parametros, dtype=float)
+    if modelo["espacio"] == "log":
+        return parametros[0] * 2.0 ** (parametros[1] * n)
+    return modelo["diseno"](n) @ parametros
+
+
+def ajustar_modelo(nombre, n, y, sigma, confianza=0.95):
+    """
+    Ajusta un modelo ponderando cada punto por su error estándar.
+
+    Args:
+        nombre: clave de MODELOS
+        n: valores de n
+        y: media de evaluaciones por n
+        sigma: error estándar por n
+        confianza: nivel de confianza de los intervalos de los parámetros
+
+    Returns:
+        diccionario con parametros, errores, intervalos, chi2, chi2_reducido,
+        aic, bic y r_squared
+    """
+    n = np.asarray(n, dtype=float)
+    y = np.asarray(y, dtype=float)
+    parametros, chi2, beta, covarianza = ajustar_lote(nombre, n, y, sigma)
+    nombres = MODELOS[nombre]["parametros"]
+    k = len(nombres)
+    errores_beta = np.sqrt(np.diag(covarianza))
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+
+    errores = errores_beta.copy()
+    inferior = beta - z * errores_beta
+    superior = beta + z * errores_beta
+    if MODELOS[nombre]["espacio"] == "log":
+        # a = 2^β0: error por propagación e intervalo transformando los extremos
+        errores[0] = parametros[0] * math.log(2) * errores_beta[0]
+        inferior[0], superior[0] = 2.0 ** inferior[0], 2.0 ** superior[0]
+
+    prediccion = predecir(nombre, parametros, n)
+    ss_res = np.sum((y - prediccion) ** 2)
+    ss_tot = np.sum((y - np.mean(y)) ** 2)
+
+    return {
+        "modelo": nombre,
+        "parametros": {p: float(v) for p, v in zip(nombres, parametros)},
+        "errores": {p: float(e) for p, e in zip(nombres, errores)},
+        "intervalos": {p: [float(i), float(s)] for p, i, s in zip(nombres, inferior, superior)},
+        "chi2": float(chi2),
+        "chi2_reducido": float(chi2 / (len(n) - k)) if len(n) > k else float("nan"),
+        # Con σ conocidas, -2·log L = χ² + constante
+        "aic": float(chi2 + 2 * k),
+        "bic": float(chi2 + k * math.log(len(n))),
+        "r_squared": float(1 - ss_res / ss_tot)
+    }
+
+
+def comparar_modelos(n, y, sigma, modelos=None, confianza=0.95):
+    """
+    Ajusta varios modelos y los ordena por AIC.
+
+    Args:
+        n: valores de n
+        y: media de evaluaciones por n
+        sigma: error estándar por n
+        modelos: nombres de MODELOS (por defecto todos)
+        confianza: nivel de confianza de los intervalos
+
+    Returns:
+        lista de resultados de ajustar_modelo, ordenada por AIC, con
+        "delta_aic" y "peso_akaike"
+    """
+    ajustes = [ajustar_modelo(nombre, n, y, sigma, confianza) for nombre in (modelos or MODELOS)]
+    ajustes.sort(key=lambda ajuste: ajuste["aic"])
+    aic_minimo = ajustes[0]["aic"]
+    pesos = np.exp(-0.5 * np.array([ajuste["aic"] - aic_minimo for ajuste in ajustes]))
+    for ajuste, peso in zip(ajustes, pesos / pesos.sum()):
+        ajuste["delta_aic"] = ajuste["aic"] - aic_minimo
+        ajuste["peso_akaike"] = float(peso)
+    return ajustes
+
+
+def remuestrear_medias(evaluaciones, num_remuestreos=1000, semilla=None):
+    """
+    Remuestrea con reemplazo las pruebas de cada n y calcula media y error estándar.
+
+    Args:
+        evaluaciones: array (N, T) con las evaluaciones de cada prueba para cada n
+        num_remuestreos: número de remuestreos
+        semilla: semilla del generador
+
+    Returns:
+        tupla (medias, errores) de arrays (num_remuestreos, N)
+    """
+    evaluaciones = np.asarray(evaluaciones, dtype=float)
+    num_n, t = evaluaciones.shape
+    rng = np.random.default_rng(semilla)
+    indices = rng.integers(0, t, size=(num_remuestreos, num_n, t))
+    remuestras = np.take_along_axis(evaluaciones[None], indices, axis=-1)
+    return remuestras.mean(axis=-1), remuestras.std(axis=-1, ddof=1) / np.sqrt(t)
+
+
+def bootstrap_modelos(n, evaluaciones, modelos=None, num_remuestreos=1000, confianza=0.95, semilla=None):
+    """
+    Reajusta todos los modelos en cada remuestreo de las pruebas.
+
+    Args:
+        n: valores de n (N,)
+        evaluaciones: array (N, T) con las evaluaciones de cada prueba
+        modelos: nombres de MODELOS (por defecto todos)
+        num_remuestreos: número de remuestreos
+        confianza: nivel de confianza de los intervalos percentil
+        semilla: semilla del generador
+
+    Returns:
+        diccionario modelo -> {"intervalos": {parametro: [inf, sup]},
+        "frecuencia_seleccion": fracción de remuestreos en que tiene el menor AIC}
+    """
+    modelos = list(modelos or MODELOS)
+    medias, errores = remuestrear_medias(evaluaciones, num_remuestreos, semilla)
+    alfa = (1 - confianza) / 2
+
+    aic = np.empty((len(modelos), num_remuestreos))
+    resultado = {}
+    for i, nombre in enumerate(modelos):
+        parametros, chi2, _, _ = ajustar_lote(nombre, n, medias, errores)
+        aic[i] = chi2 + 2 * len(MODELOS[nombre]["parametros"])
+        inferior, superior = np.quantile(parametros, [alfa, 1 - alfa], axis=0)
+        resultado[nombre] = {
+            "intervalos": {p: [float(a), float(b)]
+                           for p, a, b in zip(MODELOS[nombre]["parametros"], inferior, superior)}
+        }
+
+    ganadores = np.bincount(np.argmin(aic, axis=0), minlength=len(modelos))
+    for nombre, veces in zip(modelos, ganadores):
+        resultado[nombre]["frecuencia_seleccion"] = float(veces / num_remuestreos)
+    return resultado
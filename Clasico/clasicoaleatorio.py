@@ -0,0 +1,188 @@
+"""
+Variante aleatoria del algoritmo Deutsch-Jozsa clásico con error acotado.
+
+En lugar de recorrer las entradas en orden se hacen k consultas en posiciones
+uniformes al azar y se declara "constante" si todas coinciden. Una función
+constante nunca se clasifica mal; una balanceada sólo si las k respuestas
+coinciden, lo que con consultas independientes ocurre con probabilidad
+exactamente 2^(1-k), sea cual sea n.
+
+La ejecución está vectorizada sobre las pruebas. Para una función balanceada
+uniforme, los valores en d posiciones distintas son d extracciones sin
+reemplazo de una urna con 2^(n-1) unos y 2^(n-1) ceros, así que basta con
+contar las posiciones distintas de cada prueba y sacar el número de unos de
+una hipergeométrica: no hace falta construir la tabla de verdad y el coste
+es O(pruebas·k) para cualquier n.
+"""
+import numpy as np
+
+# NumPy sólo admite hipergeométricas con urnas de menos de 10^9 bolas de cada color
+LIMITE_HIPERGEOMETRICA = 10**9
+
+
+def cota_error(k):
+    """Probabilidad de clasificar mal una función balanceada con k consultas independientes: 2^(1-k)."""
+    return 2.0 ** (1 - np.asarray(k, dtype=float))
+
+
+def _distintas(n, k, num_trials, rng, reemplazo):
+    if not reemplazo:
+        return np.full(num_trials, min(k, 1 << n))
+    consultas = np.sort(rng.integers(0, 1 << n, size=(num_trials, k), dtype=np.uint64), axis=1)
+    return 1 + np.count_nonzero(np.diff(consultas, axis=1), axis=1)
+
+
+def _unos(mitad, distintas, rng):
+    """Número de unos en `distintas` posiciones distintas de una función balanceada uniforme."""
+    if mitad < LIMITE_HIPERGEOMETRICA:
+        return rng.hypergeometric(mitad, mitad, distintas)
+    # Urna demasiado grande: extracciones sin reemplazo una a una, vectorizadas sobre las pruebas
+    unos = np.zeros(len(distintas), dtype=np.int64)
+    for j in range(int(distintas.max())):
+        activa = j < distintas
+        p = (mitad - unos) / (2.0 * mitad - j)
+        unos += activa & (rng.random(len(distintas)) < p)
+    return unos
+
+
+def deutsch_jozsa_aleatorio(n, k, num_trials, fraccion_constantes=0.5, reemplazo=True, semilla=None):
+    """
+    Ejecuta num_trials pruebas de la variante aleatoria con oráculos uniformes.
+
+    Args:
+        n: número de bits
+        k: número de consultas por prueba
+        num_trials: número de pruebas
+        fraccion_constantes: probabilidad de que el oráculo de una prueba sea constante
+        reemplazo: si False, las k consultas se hacen en posiciones distintas
+        semilla: semilla del generador
+
+    Returns:
+        tupla (es_constante, correcto) de arrays booleanos (num_trials,)
+    """
+    rng = np.random.default_rng(semilla)
+    es_constante = rng.random(num_trials) < fraccion_constantes
+
+    mitad = 1 << (n - 1)
+    distintas = _distintas(n, k, num_trials, rng, reemplazo)
+    unos = _unos(mitad, distintas, rng)
+    # Balanceada clasificada como constante si las consultas coinciden (todo ceros o todo unos)
+    coinciden = (unos == 0) | (unos == distintas)
+
+    correcto = es_constante | ~coinciden
+    return es_constante, correcto
+
+
+def deutsch_jozsa_aleatorio_tablas(tablas, n, k, semilla=None):
+    """
+    Misma variante consultando tablas de verdad reales, p.ej. oráculos del
+    almacén de oraculos.py; sirve para validar el muestreo hipergeométrico.
+
+    Args:
+        tablas: lista de tablas empaquetadas (arrays o np.memmap uint8, bit x en el byte x >> 3)
+        n: número de bits
+        k: número de consultas por oráculo
+        semilla: semilla del generador
+
+    Returns:
+        array booleano (len(tablas),): True si se clasificó como constante
+    """
+    rng = np.random.default_rng(semilla)
+    consultas = rng.integers(0, 1 << n, size=(len(tablas), k))
+    clasificadas_constante = np.empty(len(tablas), dtype=bool)
+    for i, tabla in enumerate(tablas):
+        valores = (np.asarray(tabla[consultas[i] >> 3]) >> (consultas[i] & 7)) & 1
+        clasificadas_constante[i] = np.all(valores == valores[0])
+    return clasificadas_constante
+
+
+def curva_error(n, ks, num_trials=100000, reemplazo=True, semilla=None):
+    """
+    Error empírico frente a la cota teórica para cada número de consultas.
+
+    Args:
+        n: número de bits
+        ks: valores de k
+        num_trials: pruebas por k
+        reemplazo: consultas con o sin reemplazo
+        semilla: semilla del generador
+
+    Returns:
+        lista de diccionarios con k, error_balanceadas, error_estandar, cota y error_total
+    """
+    rng = np.random.default_rng(semilla)
+    curva = []
+    for k in ks:
+        es_constante, correcto = deutsch_jozsa_aleatorio(n, k, num_trials, reemplazo=reemplazo, semilla=rng)
+        fallos_balanceadas = ~correcto[~es_constante]
+        error = fallos_balanceadas.mean()
+        curva.append({
+            "k": int(k),
+            "error_balanceadas": float(error),
+            "error_estandar": float(np.sqrt(error * (1 - error) / len(fallos_balanceadas))),
+            "cota": float(cota_error(k)),
+            "error_total": float(1 - correcto.mean())
+        })
+    return curva
+
+
+def graficar_curva(n, curva):
+    """
+    Dibuja el error de la variante aleatoria frente al número de consultas.
+
+    Args:
+        n: número de bits
+        curva: resultado de curva_error
+
+    Returns:
+        figura de matplotlib
+    """
+    import matplotlib.pyplot as plt
+
+    plt.rcParams.update({'font.size': 12, 'font.family': 'serif'})
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    ks = np.array([punto["k"] for punto in curva])
+    error = np.array([punto["error_balanceadas"] for punto in curva])
+    error_estandar = np.array([punto["error_estandar"] for punto in curva])
+
+    # Los puntos con error 0 no se pueden dibujar en escala logarítmica
+    visibles = error > 0
+    ax.errorbar(ks[visibles], error[visibles], yerr=3*error_estandar[visibles], fmt='o', color='blue',
+                markerfacecolor='lightblue', ecolor='red', capsize=0, label="Error empírico (balanceadas) ± 3σ")
+    ax.plot(ks, cota_error(ks), '-', color='red', linewidth=2, label="Cota $2^{1-k}$")
+
+    ax.set_yscale("log", base=2)
+    ax.set_xlabel("Número de consultas (k)", fontsize=14)
+    ax.set_ylabel("Probabilidad de error", fontsize=14)
+    ax.set_title(f"Deutsch-Jozsa clásico aleatorio (n = {n})", fontsize=16, pad=20)
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=12)
+    plt.tight_layout()
+
+    return fig
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # Parámetros
+    n = 30
+    ks = range(1, 21)
+    num_trials = 200000
+
+    curva = curva_error(n, ks, num_trials)
+    print(f"{'k':>3} | {'Error empírico':>19} | {'Cota 2^(1-k)':>12}")
+    for punto in curva:
+        print(f"{punto['k']:>3} | {punto['error_balanceadas']:.6f} ± {punto['error_estandar']:.6f} | {punto['cota']:>12.6f}")
+
+    # Validación con oráculos reales del almacén (n pequeño para que sea rápido)
+    from oraculos import pool_oraculos
+
+    n_tablas, k_tablas = 16, 3
+    tablas = [np.memmap(path, dtype=np.uint8, mode='r') for path in pool_oraculos(n_tablas, 16)]
+    constantes = np.concatenate([deutsch_jozsa_aleatorio_tablas(tablas, n_tablas, k_tablas, semilla=s) for s in range(2000)])
+    print(f"\nOráculos del almacén (n={n_tablas}, k={k_tablas}): error {constantes.mean():.4f}, cota {cota_error(k_tablas):.4f}")
+
+    graficar_curva(n, curva)
+    plt.show()
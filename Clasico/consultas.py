@@ -0,0 +1,152 @@
+"""
+Recuento verificado de consultas a los oráculos clásicos.
+
+OraculoContado envuelve un oráculo y registra cuántas consultas recibe, qué
+entradas distintas se han consultado y en qué consulta apareció la primera
+respuesta distinta de la primera. El decorador `auditar` compara el número de
+evaluaciones que devuelve un algoritmo con el tráfico real del oráculo.
+
+La auditoría se decide al importar (DJ_AUDITORIA=1): desactivada, `auditar`
+devuelve la función sin tocar y el coste es nulo.
+"""
+import functools
+import os
+
+import numpy as np
+
+AUDITORIA = os.environ.get("DJ_AUDITORIA", "") not in ("", "0")
+
+
+class ConteoIncorrecto(AssertionError):
+    """El número de evaluaciones devuelto no coincide con las consultas hechas al oráculo."""
+
+
+class OraculoContado:
+    """
+    Oráculo que cuenta sus consultas.
+
+    Atributos:
+        consultas: número total de consultas
+        unicas: conjunto de entradas consultadas
+        primera_discrepancia: número de consulta (desde 1) de la primera
+            respuesta distinta de la primera, o None
+    """
+
+    __slots__ = ("oraculo", "vectorial", "consultas", "unicas", "primera_discrepancia", "_primer_valor")
+
+    def __init__(self, oraculo, vectorial=None):
+        """
+        Args:
+            oraculo: función x -> 0/1
+            vectorial: función opcional array -> array para consultar en bloque
+        """
+        self.oraculo = oraculo
+        self.vectorial = vectorial
+        self.consultas = 0
+        self.unicas = set()
+        self.primera_discrepancia = None
+        self._primer_valor = None
+
+    def __call__(self, x):
+        valor = self.oraculo(x)
+        self.consultas += 1
+        self.unicas.add(x)
+        if self._primer_valor is None:
+            self._primer_valor = valor
+        elif self.primera_discrepancia is None and valor != self._primer_valor:
+            self.primera_discrepancia = self.consultas
+        return valor
+
+    def consultar(self, xs):
+        """
+        Consulta un bloque de entradas de una vez.
+
+        Args:
+            xs: array de entradas
+
+        Returns:
+            array de valores
+        """
+        xs = np.asarray(xs)
+        if self.vectorial is not None:
+            valores = np.asarray(self.vectorial(xs))
+        else:
+            valores = np.fromiter((self.oraculo(int(x)) for x in xs), dtype=np.int64, count=len(xs))
+        if len(valores) == 0:
+            return valores
+
+        if self._primer_valor is None:
+            self._primer_valor = valores[0]
+        if self.primera_discrepancia is None:
+            distintos = np.flatnonzero(valores != self._primer_valor)
+            if len(distintos):
+                self.primera_discrepancia = self.consultas + int(distintos[0]) + 1
+        self.consultas += len(xs)
+        self.unicas.update(xs.tolist())
+        return valores
+
+    @property
+    def repetidas(self):
+        return self.consultas - len(self.unicas)
+
+
+def verificar(evaluaciones, oraculo_contado):
+    """
+    Comprueba un recuento de evaluaciones contra el tráfico registrado.
+
+    Args:
+        evaluaciones: número devuelto por el algoritmo
+        oraculo_contado: OraculoContado usado en la ejecución
+
+    Raises:
+        ConteoIncorrecto: si no coinciden
+    """
+    if evaluaciones != oraculo_contado.consultas:
+        raise ConteoIncorrecto(
+            f"El algoritmo devolvió {evaluaciones} evaluaciones pero el oráculo recibió "
+            f"{oraculo_contado.consultas} consultas ({len(oraculo_contado.unicas)} distintas, "
+            f"primera discrepancia en la consulta {oraculo_contado.primera_discrepancia})"
+        )
+
+
+def auditar(funcion):
+    """
+    Decorador para algoritmos funcion(n, oracle, ...) -> evaluaciones. Con la
+    auditoría activada envuelve el oráculo en un OraculoContado y verifica el
+    resultado; desactivada devuelve la misma función.
+    """
+    if not AUDITORIA:
+        return funcion
+
+    @functools.wraps(funcion)
+    def auditada(n, oracle, *args, **kwargs):
+        contado = oracle if isinstance(oracle, OraculoContado) else OraculoContado(oracle)
+        antes = contado.consultas
+        evaluaciones = funcion(n, contado, *args, **kwargs)
+        verificar(evaluaciones + antes, contado)
+        return evaluaciones
+
+    return auditada
+
+
+def escanear(oracle, ultima_entrada):
+    """
+    Búsqueda secuencial: consulta f(0), f(1), ... hasta encontrar una
+    respuesta distinta de f(0) o llegar a ultima_entrada.
+
+    Args:
+        oracle: función oráculo
+        ultima_entrada: última entrada que se consulta
+
+    Returns:
+        número de consultas realizadas
+    """
+    evaluations = 1
+    first_output = oracle(0)
+
+    for x in range(1, ultima_entrada + 1):
+        evaluations += 1
+        if oracle(x) != first_output:
+            return evaluations  # Encuentro diferencia: es balanceado
+
+    return evaluations  # No hay diferencias: es constante
@@ -0,0 +1,167 @@
+"""
+Almacén de oráculos balanceados en ficheros mapeados en memoria.
+
+La tabla de verdad de un oráculo de n bits se guarda empaquetada (un bit por
+entrada, 2^n/8 bytes: 128 MB para n = 30) y se abre con np.memmap en modo
+lectura. Todos los procesos que abren el mismo fichero comparten las páginas
+de la caché del sistema operativo, así que un barrido paralelo no multiplica
+la RAM por el número de procesos. Los oráculos se generan una sola vez y se
+reutilizan entre pruebas y ejecuciones.
+"""
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+DIRECTORIO_ORACULOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache_oraculos")
+
+# Entradas generadas por bloque (múltiplo de 8): la memoria al generar es O(BLOQUE), no O(2^n)
+BLOQUE = 1 << 20
+
+
+def path_oraculo(n, indice, directorio=DIRECTORIO_ORACULOS, semilla=0):
+    # La semilla va en el nombre: pools con semillas distintas no comparten ficheros
+    return os.path.join(directorio, f"balanceado_n{n}_s{semilla}_{indice:04d}.bits")
+
+
+def generar_oraculo(path, n, semilla=None):
+    """
+    Escribe la tabla de verdad empaquetada de una función balanceada aleatoria.
+
+    El dominio se reparte en bloques; el número de unos de cada bloque sale
+    de una hipergeométrica con los unos y ceros que quedan por colocar, y
+    dentro del bloque se colocan con una permutación aleatoria. El resultado
+    es uniforme entre todas las funciones balanceadas sin tener nunca las
+    2^n entradas en memoria.
+
+    Args:
+        path: fichero de salida
+        n: número de bits de entrada
+        semilla: semilla del generador
+    """
+    rng = np.random.default_rng(semilla)
+    total = 1 << n
+    bloque = min(BLOQUE, total)
+    unos_restantes = total // 2
+    ceros_restantes = total - unos_restantes
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporal = f"{path}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        for _ in range(total // bloque):
+            if unos_restantes == 0:
+                unos = 0
+            elif ceros_restantes == 0:
+                unos = bloque
+            else:
+                unos = rng.hypergeometric(unos_restantes, ceros_restantes, bloque)
+            bits = np.zeros(bloque, dtype=np.uint8)
+            bits[:unos] = 1
+            rng.shuffle(bits)
+            f.write(np.packbits(bits, bitorder='little').tobytes())
+            unos_restantes -= unos
+            ceros_restantes -= bloque - unos
+    os.replace(temporal, path)
+
+
+def abrir_oraculo(path):
+    """
+    Abre un oráculo del almacén sin copiarlo en memoria.
+
+    Args:
+        path: fichero creado por generar_oraculo
+
+    Returns:
+        función oráculo x -> 0/1
+    """
+    tabla = np.memmap(path, dtype=np.uint8, mode='r')
+    return lambda x: (int(tabla[x >> 3]) >> (x & 7)) & 1
+
+
+def pool_oraculos(n, cantidad, directorio=DIRECTORIO_ORACULOS, semilla=0):
+    """
+    Devuelve `cantidad` oráculos balanceados de n bits, generando sólo los que
+    aún no están en el almacén. El oráculo i usa la semilla (semilla, n, i),
+    así que el pool es el mismo en cualquier máquina.
+
+    Args:
+        n: número de bits (n >= 3)
+        cantidad: tamaño del pool
+        directorio: directorio del almacén
+        semilla: semilla base
+
+    Returns:
+        lista de rutas
+    """
+    if n < 3:
+        raise ValueError("El almacén necesita n >= 3 (al menos un byte por tabla)")
+    paths = []
+    for indice in range(cantidad):
+        path = path_oraculo(n, indice, directorio, semilla)
+        if not os.path.exists(path):
+            generar_oraculo(path, n, semilla=[semilla, n, indice])
+        paths.append(path)
+    return paths
+
+
+# Oráculos abiertos en cada proceso trabajador
+_abiertos = {}
+
+
+def _prueba(argumentos):
+    from AjusteexponencialClasico import deutsch_jozsa_classical
+
+    n, tipo, path = argumentos
+    if tipo == "constante":
+        return 2**(n-1) + 1
+    if path not in _abiertos:
+        _abiertos[path] = abrir_oraculo(path)
+    return deutsch_jozsa_classical(n, _abiertos[path])
+
+
+def evaluaciones_paralelas(n, num_trials, procesos=None, tamano_pool=16, directorio=DIRECTORIO_ORACULOS, semilla=None):
+    """
+    Ejecuta num_trials pruebas del algoritmo clásico (mitad constantes, mitad
+    balanceadas en media) repartidas entre procesos, con los oráculos
+    balanceados sacados de un pool compartido.
+
+    Args:
+        n: número de bits
+        num_trials: número de pruebas
+        procesos: procesos trabajadores (por defecto os.cpu_count())
+        tamano_pool: oráculos distintos en el pool
+        directorio: directorio del almacén
+        semilla: semilla del pool de oráculos y del reparto de tipos y
+            oráculos (None: pool con semilla 0 y reparto aleatorio)
+
+    Returns:
+        array (num_trials,) con las evaluaciones de cada prueba
+    """
+    paths = pool_oraculos(n, tamano_pool, directorio, semilla=semilla if semilla is not None else 0)
+    rng = np.random.default_rng(semilla)
+    tipos = np.where(rng.random(num_trials) < 0.5, "constante", "balanceado")
+    elegidos = rng.integers(0, len(paths), num_trials)
+    tareas = [(n, tipo, paths[i]) for tipo, i in zip(tipos, elegidos)]
+
+    with Pool(procesos) as pool:
+        return np.array(pool.map(_prueba, tareas, chunksize=max(1, num_trials // (4 * (procesos or os.cpu_count())))))
+
+
+if __name__ == "__main__":
+    # Uso: python oraculos.py n [num_trials] [procesos] [tamano_pool]
+    n = int(sys.argv[1])
+    num_trials = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    procesos = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    tamano_pool = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+
+    inicio = time.perf_counter()
+    paths = pool_oraculos(n, tamano_pool)
+    print(f"Pool de {tamano_pool} oráculos de n={n} ({os.path.getsize(paths[0]) / 2**20:.1f} MB cada uno) "
+          f"listo en {time.perf_counter() - inicio:.1f} s")
+
+    inicio = time.perf_counter()
+    evaluaciones = evaluaciones_paralelas(n, num_trials, procesos, tamano_pool)
+    print(f"{num_trials} pruebas en {time.perf_counter() - inicio:.1f} s: "
+          f"μ={evaluaciones.mean():.2f}, SE={evaluaciones.std(ddof=1) / np.sqrt(num_trials):.3f}")
@@ -2,24 +2,35 @@ from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 from qiskit_aer.noise import NoiseModel, depolarizing_error, phase_damping_error, amplitude_damping_error
 import numpy as np
-import matplotlib.pyplot as plt
 import random
 from tqdm import tqdm
 import csv
+import json
+import os
+import sys
 
-def deutsch_jozsa_qiskit(n, oracle_type="constant", oracle_case=0, noise_level=0, noise_type="depolarizing"):
+from oraculoparidad import aplicar_oraculo_balanceado
+from rutasimulador import metodo_simulador
+from trazas import guardar_trazas, tramo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cacheresultados import calcular_celdas, semilla_celda
+
+# Diseño de los casos de oráculo en el barrido de ruido (ver plan_casos)
+MODOS_CASOS = ("aleatorios", "exhaustivos", "estratificados")
+
+def deutsch_jozsa_circuit(n, oracle_type="constant", oracle_case=0, modo_oraculo="lineal"):
     """
-    Implementación del algoritmo Deutsch-Jozsa con Qiskit
+    Construye el circuito Deutsch-Jozsa con medida de los n qubits de entrada
     
     Args:
         n: Número de qubits (excluyendo el auxiliar)
         oracle_type: "constant" o "balanced"
         oracle_case: Configuración específica del oráculo
-        noise_level: Nivel de ruido 
-        noise_type: Tipo de ruido ("depolarizing", "dephasing", "damping")
+        modo_oraculo: Construcción del oráculo balanceado ("lineal" o "arbol", ver oraculoparidad)
         
     Returns:
-        resultado clasificado y circuito
+        QuantumCircuit con n+1 qubits y n bits clásicos
     """
     # Crear un circuito con n+1 qubits
     circuit = QuantumCircuit(n+1, n)
@@ -39,10 +50,8 @@ def deutsch_jozsa_qiskit(n, oracle_type="constant", oracle_case=0, noise_level=0
         if oracle_case == 1:
             circuit.z(n)  # Aplicar Z al último qubit si oracle_case=1
     else:  
-        # Oráculo balanceado: aplicar CNOT según oracle_case
-        for i in range(n):
-            if (oracle_case >> i) & 1:
-                circuit.cx(i, n)
+        # Oráculo balanceado: paridad de las entradas marcadas en oracle_case
+        aplicar_oraculo_balanceado(circuit, n, oracle_case, modo_oraculo)
     
     circuit.barrier()
     
@@ -56,43 +65,103 @@ def deutsch_jozsa_qiskit(n, oracle_type="constant", oracle_case=0, noise_level=0
     for i in range(n):
         circuit.measure(i, i)
     
-    # Modelo de ruido
-    noise_model = None
-    if noise_level > 0:
-        noise_model = NoiseModel()
+    return circuit
+
+def build_noise_model(noise_level, noise_type="depolarizing"):
+    """
+    Construye el modelo de ruido uniforme usado en el análisis
+    
+    Args:
+        noise_level: Nivel de ruido 
+        noise_type: Tipo de ruido ("depolarizing", "dephasing", "damping")
         
-        # Seleccionar tipo de error
-        if noise_type == "depolarizing":
-            # Error de despolarización
-            error1 = depolarizing_error(noise_level, 1)  # Para operaciones de 1 qubit
-            error2 = depolarizing_error(noise_level, 2)  # Para operaciones de 2 qubits
-        elif noise_type == "dephasing":
-            # Error de desfase 
-            error1 = phase_damping_error(noise_level)    # Para 1 qubit
-            # Para 2 qubits, aplicar el error de forma independiente
-            error2 = error1.tensor(error1)  # Tensor product para 2 qubits independientes
-        elif noise_type == "damping":
-            # Error de decaimiento de amplitud
-            error1 = amplitude_damping_error(noise_level)  # Para 1 qubit
-            # Para 2 qubits, aplicar el error de forma independiente
-            error2 = error1.tensor(error1)  # Tensor product para 2 qubits independientes
-        else:
-            # Por defecto, usar despolarización
-            error1 = depolarizing_error(noise_level, 1)
-            error2 = depolarizing_error(noise_level, 2)
-            
-        # Aplicar errores a las puertas
-        noise_model.add_all_qubit_quantum_error(error1, ['h', 'x', 'z'])
-        noise_model.add_all_qubit_quantum_error(error2, ['cx'])
+    Returns:
+        NoiseModel con el error aplicado a las puertas h, x, z y cx
+    """
+    noise_model = NoiseModel()
     
-    # Ejecutar el simulador
-    backend = AerSimulator()
-    if noise_model is not None:
-        job = backend.run(circuit, shots=1, noise_model=noise_model)  
+    # Seleccionar tipo de error
+    if noise_type == "depolarizing":
+        # Error de despolarización
+        error1 = depolarizing_error(noise_level, 1)  # Para operaciones de 1 qubit
+        error2 = depolarizing_error(noise_level, 2)  # Para operaciones de 2 qubits
+    elif noise_type == "dephasing":
+        # Error de desfase 
+        error1 = phase_damping_error(noise_level)    # Para 1 qubit
+        # Para 2 qubits, aplicar el error de forma independiente
+        error2 = error1.tensor(error1)  # Tensor product para 2 qubits independientes
+    elif noise_type == "damping":
+        # Error de decaimiento de amplitud
+        error1 = amplitude_damping_error(noise_level)  # Para 1 qubit
+        # Para 2 qubits, aplicar el error de forma independiente
+        error2 = error1.tensor(error1)  # Tensor product para 2 qubits independientes
     else:
-        job = backend.run(circuit, shots=1)
-    result = job.result()
-    counts = result.get_counts()
+        # Por defecto, usar despolarización
+        error1 = depolarizing_error(noise_level, 1)
+        error2 = depolarizing_error(noise_level, 2)
+        
+    # Aplicar errores a las puertas
+    noise_model.add_all_qubit_quantum_error(error1, ['h', 'x', 'z'])
+    noise_model.add_all_qubit_quantum_error(error2, ['cx'])
+    
+    return noise_model
+
+# Un simulador por método, reutilizado entre ejecuciones
+_simuladores = {}
+
+def simulador(metodo):
+    if metodo not in _simuladores:
+        _simuladores[metodo] = AerSimulator(method=metodo)
+    return _simuladores[metodo]
+
+def deutsch_jozsa_qiskit(n, oracle_type="constant", oracle_case=0, noise_level=0, noise_type="depolarizing", noise_model=None,
+                         modo_oraculo="lineal", seed_simulator=None):
+    """
+    Implementación del algoritmo Deutsch-Jozsa con Qiskit
+    
+    Args:
+        n: Número de qubits (excluyendo el auxiliar)
+        oracle_type: "constant" o "balanced"
+        oracle_case: Configuración específica del oráculo
+        noise_level: Nivel de ruido 
+        noise_type: Tipo de ruido ("depolarizing", "dephasing", "damping")
+        noise_model: NoiseModel ya construido (p.ej. desde una calibración);
+            si se indica, se ignoran noise_level y noise_type y se deja a Aer
+            elegir el método
+        modo_oraculo: Construcción del oráculo balanceado ("lineal" o "arbol")
+        seed_simulator: Semilla de Aer (por defecto sale de random)
+        
+    Returns:
+        resultado clasificado y circuito
+    """
+    with tramo("deutsch_jozsa_circuit"):
+        circuit = deutsch_jozsa_circuit(n, oracle_type, oracle_case, modo_oraculo)
+    
+    # Modelo de ruido
+    if noise_model is None and noise_level > 0:
+        with tramo("build_noise_model", noise_type=noise_type):
+            noise_model = build_noise_model(noise_level, noise_type)
+    
+    # Ejecutar el simulador
+    with tramo("backend.run"):
+        # Método de simulación según la tabla de rutas (Benchmarks/escalado.py)
+        if noise_model is None:
+            backend = simulador(metodo_simulador(n))
+        elif noise_level > 0:
+            backend = simulador(metodo_simulador(n, noise_type))
+        else:
+            backend = simulador("automatic")
+        # La semilla del simulador sale de random para que random.seed() haga reproducible la ejecución
+        if seed_simulator is None:
+            seed_simulator = random.getrandbits(31)
+        if noise_model is not None:
+            job = backend.run(circuit, shots=1, noise_model=noise_model, seed_simulator=seed_simulator)  
+        else:
+            job = backend.run(circuit, shots=1, seed_simulator=seed_simulator)
+    with tramo("job.result"):
+        result = job.result()
+    with tramo("get_counts"):
+        counts = result.get_counts()
     
     # Interpretar el resultado
     if '0'*n in counts and len(counts) == 1:
@@ -113,60 +182,190 @@ def generate_balanced_oracle_case(n):
     # Generamos un número aleatorio entre 1 y 2^n - 1 que represente qué qubits aplicar CNOT
     return random.randint(1, (2**n) - 1)
 
-def evaluate_accuracy_with_error(n, noise_levels, num_tests=100, num_runs=10, noise_type="depolarizing"):
+# (n, num_tests, num_runs, casos, seed) -> plan de pruebas
+_planes = {}
+
+def _estratos(casos, total, generador):
+    """Reparte `total` pruebas entre los casos lo más igual posible; los que sobran van a casos al azar."""
+    repeticiones, resto = divmod(total, len(casos))
+    return casos * repeticiones + generador.sample(casos, resto)
+
+def _pesos(pruebas, num_casos):
+    """
+    Peso de cada prueba para que constantes y balanceadas cuenten 1/2 y,
+    dentro de cada tipo, todos los casos cuenten igual (como en el muestreo
+    aleatorio). Si algún caso de un tipo no tiene pruebas, las de ese tipo
+    pesan lo mismo.
+    """
+    repeticiones = {}
+    for prueba in pruebas:
+        repeticiones[prueba] = repeticiones.get(prueba, 0) + 1
+    por_tipo = {tipo: sum(v for (t, _), v in repeticiones.items() if t == tipo) for tipo in num_casos}
+    distintos = {tipo: sum(1 for t, _ in repeticiones if t == tipo) for tipo in num_casos}
+
+    pesos = []
+    for tipo, caso in pruebas:
+        if distintos[tipo] == num_casos[tipo]:
+            pesos.append(0.5 / (num_casos[tipo] * repeticiones[(tipo, caso)]))
+        else:
+            pesos.append(0.5 / por_tipo[tipo])
+    return pesos
+
+def plan_casos(n, num_tests, num_runs, casos="exhaustivos", seed=None):
     """
-    Evalúa la precisión del algoritmo DJ con múltiples ejecuciones para calcular error estadístico
+    Plan de pruebas común a todos los niveles y tipos de ruido (números
+    aleatorios comunes): los mismos casos de oráculo y las mismas semillas de
+    Aer en cada nivel, así que las diferencias entre niveles no incluyen la
+    variación de qué casos se han sorteado.
     
     Args:
         n: Número de qubits (excluyendo el auxiliar)
-        noise_levels: Lista de niveles de ruido a probar
-        num_tests: Número de pruebas aleatorias para cada nivel de ruido en cada run
-        num_runs: Número de ejecuciones independientes para calcular estadísticas
-        noise_type: Tipo de ruido a usar ("depolarizing", "dephasing", "damping")
+        num_tests: Pruebas por ejecución en modo "estratificados" (mitad de cada tipo)
+        num_runs: Número de ejecuciones
+        casos: "exhaustivos" (todos los casos, 2 + 2^n - 1 pruebas por
+            ejecución) o "estratificados" (num_tests/2 pruebas de cada tipo
+            repartidas por igual entre sus casos)
+        seed: Semilla del plan (con None el plan también es fijo)
     
     Returns:
-        Tupla con (medias, desviaciones_estándar) para cada nivel de ruido
+        Lista de num_runs listas de tuplas (oracle_type, oracle_case, peso, seed_simulator);
+        los pesos de cada ejecución suman 1
     """
-    accuracy_means = []
-    accuracy_stds = []
+    clave = (n, num_tests, num_runs, casos, seed)
+    if clave not in _planes:
+        generador = random.Random(semilla_celda({"experimento": "plan_casos", "n": n, "num_tests": num_tests,
+                                                 "num_runs": num_runs, "casos": casos, "seed": seed}))
+        constantes = [0, 1]
+        balanceados = list(range(1, 2**n))
+        num_casos = {"constant": len(constantes), "balanced": len(balanceados)}
+        plan = []
+        for _ in range(num_runs):
+            if casos == "exhaustivos":
+                pruebas = [("constant", c) for c in constantes] + [("balanced", c) for c in balanceados]
+            elif casos == "estratificados":
+                pruebas = ([("constant", c) for c in _estratos(constantes, num_tests // 2, generador)] +
+                           [("balanced", c) for c in _estratos(balanceados, num_tests // 2, generador)])
+            else:
+                raise ValueError(f"Modo de casos sin plan común: {casos}")
+            pesos = _pesos(pruebas, num_casos)
+            plan.append([(tipo, caso, peso, generador.getrandbits(31)) for (tipo, caso), peso in zip(pruebas, pesos)])
+        _planes[clave] = plan
+    return _planes[clave]
+
+def _precision_nivel(spec):
+    """Media y desviación de la precisión para un único nivel de ruido (una celda de la caché)."""
+    n, noise, noise_type = spec["n"], spec["noise_level"], spec["noise_type"]
+    num_tests, num_runs = spec["num_tests"], spec["num_runs"]
+    modo_oraculo = spec["oraculo"]
+
+    # Almacenar resultados de múltiples ejecuciones
+    run_accuracies = []
     
-    for noise in tqdm(noise_levels, desc=f"Evaluando niveles de ruido ({noise_type})"):
-        # Almacenar resultados de múltiples ejecuciones
-        run_accuracies = []
-        
-        for run in range(num_runs):
+    if spec["casos"] != "aleatorios":
+        for pruebas in plan_casos(n, num_tests, num_runs, spec["casos"], spec["seed"]):
+            with tramo("run", noise_level=float(noise), noise_type=noise_type):
+                accuracy = 0.0
+                for oracle_type, oracle_case, peso, seed_simulator in pruebas:
+                    result, _ = deutsch_jozsa_qiskit(n, oracle_type, oracle_case, noise, noise_type,
+                                                     modo_oraculo=modo_oraculo, seed_simulator=seed_simulator)
+                    accuracy += peso * (result == oracle_type)
+                run_accuracies.append(accuracy)
+        return {"media": float(np.mean(run_accuracies)), "std": float(np.std(run_accuracies, ddof=1))}
+    
+    for run in range(num_runs):
+        with tramo("run", noise_level=float(noise), noise_type=noise_type):
             correct_tests = 0
-            
+        
             # Probar funciones constantes y balanceadas
             for _ in range(num_tests // 2):
                 # Función constante
                 oracle_case = random.choice([0, 1])  # 0 o 1 para constante
-                result, _ = deutsch_jozsa_qiskit(n, "constant", oracle_case, noise, noise_type)
+                result, _ = deutsch_jozsa_qiskit(n, "constant", oracle_case, noise, noise_type, modo_oraculo=modo_oraculo)
                 if result == "constant":
                     correct_tests += 1
-                    
+                
                 # Función balanceada
                 oracle_case = generate_balanced_oracle_case(n)
-                result, _ = deutsch_jozsa_qiskit(n, "balanced", oracle_case, noise, noise_type)
+                result, _ = deutsch_jozsa_qiskit(n, "balanced", oracle_case, noise, noise_type, modo_oraculo=modo_oraculo)
                 if result == "balanced":
                     correct_tests += 1
-            
+        
             # Calcular precisión para esta ejecución
             accuracy = correct_tests / num_tests
             run_accuracies.append(accuracy)
-        
-        # Calcular estadísticas
-        mean_accuracy = np.mean(run_accuracies)
-        std_accuracy = np.std(run_accuracies, ddof=1) 
-        
-        accuracy_means.append(mean_accuracy)
-        accuracy_stds.append(std_accuracy)
-        
+    
+    # Calcular estadísticas
+    return {"media": float(np.mean(run_accuracies)), "std": float(np.std(run_accuracies, ddof=1))}
+
+def evaluate_accuracy_with_error(n, noise_levels, num_tests=100, num_runs=10, noise_type="depolarizing",
+                                 seed=None, usar_cache=True, modo_oraculo="lineal", casos="aleatorios"):
+    """
+    Evalúa la precisión del algoritmo DJ con múltiples ejecuciones para calcular error estadístico.
+    Cada nivel de ruido es una celda de la caché de resultados, así que al
+    añadir niveles a un barrido ya hecho sólo se simulan los nuevos.
+    
+    Con casos="aleatorios" cada prueba sortea su oracle_case en cada nivel.
+    Con "exhaustivos" o "estratificados" todos los niveles y tipos de ruido
+    usan el mismo plan de casos y semillas (plan_casos), así que las
+    diferencias entre puntos de la curva se resuelven con menos ejecuciones.
+    
+    Args:
+        n: Número de qubits (excluyendo el auxiliar)
+        noise_levels: Lista de niveles de ruido a probar
+        num_tests: Número de pruebas aleatorias para cada nivel de ruido en cada run
+        num_runs: Número de ejecuciones independientes para calcular estadísticas
+        noise_type: Tipo de ruido a usar ("depolarizing", "dephasing", "damping")
+        seed: Semilla (cada nivel usa una semilla derivada de ella)
+        usar_cache: Reutilizar y guardar resultados en la caché
+        modo_oraculo: Construcción del oráculo balanceado ("lineal" o "arbol")
+        casos: Diseño de los casos de oráculo (ver MODOS_CASOS)
+    
+    Returns:
+        Tupla con (medias, desviaciones_estándar) para cada nivel de ruido
+    """
+    if casos == "exhaustivos":
+        # El número de pruebas lo fija la enumeración; se normaliza para no duplicar celdas
+        num_tests = 2**n + 1
+    celdas = [
+        {
+            "experimento": "ruido_dj",
+            "version": 1,
+            "n": n,
+            "noise_type": noise_type,
+            "noise_level": float(noise),
+            "num_tests": num_tests,
+            "num_runs": num_runs,
+            "casos": casos,
+            "oraculo": modo_oraculo,
+            "backend": "AerSimulator",
+            "seed": seed
+        }
+        for noise in noise_levels
+    ]
+    # La barra muestra la precisión del último nivel calculado mientras avanza el barrido
+    barra = []
+
+    def progreso(pendientes):
+        barra.append(tqdm(pendientes, desc=f"Evaluando niveles de ruido ({noise_type})"))
+        return barra[0]
+
+    def calcular(spec):
+        resultado = _precision_nivel(spec)
+        if barra:
+            barra[0].set_postfix_str(f"ruido {spec['noise_level']:.3f}: {resultado['media']:.1%} ± {resultado['std']:.1%}")
+        return resultado
+
+    resultados = calcular_celdas(celdas, calcular, usar_cache=usar_cache, progreso=progreso)
+
+    accuracy_means = [r["media"] for r in resultados]
+    accuracy_stds = [r["std"] for r in resultados]
+    for noise, mean_accuracy, std_accuracy in zip(noise_levels, accuracy_means, accuracy_stds):
         print(f"Nivel de ruido {noise:.3f}: {mean_accuracy:.3f} ± {std_accuracy:.3f} ({mean_accuracy:.2%} ± {std_accuracy:.2%})")
     
     return accuracy_means, accuracy_stds
 
-def plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, error_results_dict, n, num_tests, num_runs):
+def plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, error_results_dict, n, num_tests, num_runs,
+                                       output_file='deutsch_jozsa_noise_analysis_with_errors.png'):
     """
     Genera una gráfica de la precisión vs nivel de ruido con barras de error para diferentes tipos de ruido
     
@@ -177,7 +376,10 @@ def plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, erro
         n: Número de qubits
         num_tests: Número de pruebas realizadas por ejecución
         num_runs: Número de ejecuciones independientes
+        output_file: Fichero donde se guarda la figura
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
     
     colors = {
@@ -230,13 +432,16 @@ def plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, erro
     plt.tight_layout()
     
     # Guardar la figura con alta resolución
-    plt.savefig('deutsch_jozsa_noise_analysis_with_errors.png', dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
     
     return plt.gcf()
 
-def save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_results_dict, filename="dj_noise_results_with_errors.csv"):
+def save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_results_dict, filename="dj_noise_results_with_errors.csv", metadatos=None):
     """
     Guarda los resultados con errores en un archivo CSV
+    
+    Si se indican metadatos (n, num_tests, num_runs...) se guardan en
+    <base>_meta.json junto al CSV para poder regenerar la figura.
     """
     with open(filename, 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
@@ -254,9 +459,45 @@ def save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_r
                 row.extend([accuracy_results_dict[noise_type][i], error_results_dict[noise_type][i]])
             writer.writerow(row)
     
+    if metadatos is not None:
+        with open(os.path.splitext(filename)[0] + "_meta.json", 'w') as f:
+            json.dump(metadatos, f, indent=2)
+    
     print(f"\nResultados con errores guardados en {filename}")
 
+def load_results_from_csv(filename="dj_noise_results_with_errors.csv"):
+    """
+    Lee un CSV escrito por save_results_to_csv_with_errors
+    
+    Returns:
+        Tupla (noise_levels, accuracy_results_dict, error_results_dict, metadatos);
+        metadatos es None si no existe el fichero <base>_meta.json
+    """
+    with open(filename, 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        headers = next(reader)
+        rows = [[float(v) for v in row] for row in reader if row]
+    
+    columns = list(zip(*rows)) if rows else [[] for _ in headers]
+    noise_levels = list(columns[0])
+    accuracy_results_dict = {}
+    error_results_dict = {}
+    for i in range(1, len(headers), 2):
+        noise_type = headers[i][:-len('_media')]
+        accuracy_results_dict[noise_type] = list(columns[i])
+        error_results_dict[noise_type] = list(columns[i + 1])
+    
+    metadatos = None
+    meta_file = os.path.splitext(filename)[0] + "_meta.json"
+    if os.path.exists(meta_file):
+        with open(meta_file, 'r') as f:
+            metadatos = json.load(f)
+    
+    return noise_levels, accuracy_results_dict, error_results_dict, metadatos
+
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     # Parámetros de la simulación
     n = 4  # Número de qubits
     noise_levels = np.linspace(0, 1, 30)  # 30 niveles de ruido entre 0 y 0.5
@@ -298,4 +539,6 @@ if __name__ == "__main__":
     plt.show()
 
     # Guardar resultados con errores
-    save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_results_dict)
\ No newline at end of file
+    save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_results_dict,
+                                    metadatos={"n": n, "num_tests": num_tests, "num_runs": num_runs})
+    guardar_trazas("dj_noise_results_with_errors.csv")
\ No newline at end of file
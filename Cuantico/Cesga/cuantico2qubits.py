@@ -1,19 +1,27 @@
 import os
+import sys
 import numpy as np
 import json
 import random
-import logging
 
 os.environ["ZMQ_SERVER"] = "tcp://127.0.0.1:5556"
 
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit.circuit.library import HGate, XGate
-from qmiotools.integrations.qiskitqmio.qmiobackend import QmioBackend
 
-backend = QmioBackend(
-    logging_filename=None, 
-    logging_level=logging.ERROR
-)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backends import obtener_backend
+from calibracion import cargar_calibracion, seleccionar_layout
+from experimentos import guardar_ejecucion
+from intervalos import bootstrap_pruebas
+from mitigacion import estadisticas_mitigadas, matrices_por_prueba, qubits_medidos
+from oraculoparidad import aplicar_oraculo_balanceado
+from seguimiento import EstadisticasVivas
+from transpilacion import gestor_pases
+from trazas import guardar_trazas, tramo
+
+path_to_calibration_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2025_04_23__12_00_02.json")
+
 
 def generar_todos_los_casos_balanceados(n):
     casos_balanceados = []
@@ -26,7 +34,7 @@ def generar_todos_los_casos_balanceados(n):
     
     return casos_balanceados
 
-def deutsch_jozsa_circuit(n=2, oracle_type="constant", oracle_case=0):
+def deutsch_jozsa_circuit(n=2, oracle_type="constant", oracle_case=0, modo_oraculo="lineal"):
     circuit = QuantumCircuit(n+1, n)
     
     circuit.x(n)
@@ -38,9 +46,7 @@ def deutsch_jozsa_circuit(n=2, oracle_type="constant", oracle_case=0):
         if oracle_case == 1:
             circuit.z(n)
     else:
-        for i in range(n):
-            if (oracle_case >> i) & 1:
-                circuit.cx(i, n)
+        aplicar_oraculo_balanceado(circuit, n, oracle_case, modo_oraculo)
     
     for i in range(n):
         circuit.h(i)
@@ -50,46 +56,66 @@ def deutsch_jozsa_circuit(n=2, oracle_type="constant", oracle_case=0):
     
     return circuit
 
-def ejecutar_experimento():
+def ejecutar_experimento(modo_oraculo="lineal", tipo_backend="qmio"):
     n = 2
     shots = 1
-    qubit_layout = [19, 20, 13]
+    # El backend se crea al ejecutar, no al importar el módulo. Con "servidor"
+    # los trabajos van al servidor local (servidorlocal.py) en lugar de a Qmio
+    backend, _ = obtener_backend(tipo_backend, path_to_calibration_file)
+    # Layout elegido a partir de la calibración: [entradas..., ancilla]
+    qubit_layout, puntuacion_layout = seleccionar_layout(path_to_calibration_file, n, backend.coupling_map)
     
     num_constant = 100
     num_balanced = 100
     total_pruebas = 200
+    output_file = "2qubits.json"
     
     casos_constantes = [0, 1]
     casos_balanceados = generar_todos_los_casos_balanceados(n)
     
+    print(f"Layout seleccionado: {qubit_layout} (probabilidad estimada sin error: {puntuacion_layout:.3f})")
+    
     resultados = {
+        "configuracion": {
+            "backend": tipo_backend,
+            "n_qubits": n,
+            "shots_por_circuito": shots,
+            "qubit_layout": qubit_layout,
+            "puntuacion_layout": puntuacion_layout
+        },
         "pruebas": [],
         "estadisticas": {}
     }
     
+    # Estadísticas incrementales: línea de progreso y fichero de estado junto a los resultados.
+    # Aquí no hay parada anticipada: las constantes se ejecutan antes que las balanceadas
+    vivas = EstadisticasVivas(total_pruebas, path_estado=os.path.splitext(output_file)[0] + "_estado.json")
+    
     aciertos_constant = 0
     aciertos_balanced = 0
     
     for i in range(num_constant):
-        print(f"\rEjecutando prueba constante {i+1}/{num_constant}", end="")
+        print(f"\rEjecutando prueba constante {i+1}/{num_constant} | {vivas.linea()}", end="")
         
         oracle_case = random.choice(casos_constantes)
-        circuit = deutsch_jozsa_circuit(n, "constant", oracle_case)
+        with tramo("deutsch_jozsa_circuit", prueba=i + 1):
+            circuit = deutsch_jozsa_circuit(n, "constant", oracle_case, modo_oraculo)
         
-        transpiled_circuit = transpile(
-            circuit,
-            backend,
-            initial_layout=qubit_layout,
-            optimization_level=2
-        )
+        with tramo("transpile", prueba=i + 1):
+            transpiled_circuit = gestor_pases(backend, qubit_layout).run(circuit)
         
-        job = backend.run(transpiled_circuit, shots=shots)
-        result = job.result()
-        counts = result.get_counts()
+        # backend.run mide el envío; job.result incluye la cola y la ejecución
+        with tramo("backend.run", prueba=i + 1):
+            job = backend.run(transpiled_circuit, shots=shots)
+        with tramo("job.result", prueba=i + 1):
+            result = job.result()
+        with tramo("get_counts", prueba=i + 1):
+            counts = result.get_counts()
         
         zeros_count = counts.get('0'*n, 0)
         classification = "constant" if zeros_count > 0 else "balanced"
         correct = (classification == "constant")
+        vivas.registrar("constant", correct)
         
         if correct:
             aciertos_constant += 1
@@ -100,31 +126,34 @@ def ejecutar_experimento():
             "oracle_case": oracle_case,
             "counts": counts,
             "classification": classification,
-            "correct": correct
+            "correct": correct,
+            "qubits_medidos": qubits_medidos(transpiled_circuit)
         })
     
     print()
     
     for i in range(num_balanced):
-        print(f"\rEjecutando prueba balanceada {i+1}/{num_balanced}", end="")
+        print(f"\rEjecutando prueba balanceada {i+1}/{num_balanced} | {vivas.linea()}", end="")
         
         oracle_case = random.choice(casos_balanceados)
-        circuit = deutsch_jozsa_circuit(n, "balanced", oracle_case)
+        with tramo("deutsch_jozsa_circuit", prueba=num_constant + i + 1):
+            circuit = deutsch_jozsa_circuit(n, "balanced", oracle_case, modo_oraculo)
         
-        transpiled_circuit = transpile(
-            circuit,
-            backend,
-            initial_layout=qubit_layout,
-            optimization_level=2
-        )
+        with tramo("transpile", prueba=num_constant + i + 1):
+            transpiled_circuit = gestor_pases(backend, qubit_layout).run(circuit)
         
-        job = backend.run(transpiled_circuit, shots=shots)
-        result = job.result()
-        counts = result.get_counts()
+        # backend.run mide el envío; job.result incluye la cola y la ejecución
+        with tramo("backend.run", prueba=num_constant + i + 1):
+            job = backend.run(transpiled_circuit, shots=shots)
+        with tramo("job.result", prueba=num_constant + i + 1):
+            result = job.result()
+        with tramo("get_counts", prueba=num_constant + i + 1):
+            counts = result.get_counts()
         
         zeros_count = counts.get('0'*n, 0)
         classification = "constant" if zeros_count > 0 else "balanced"
         correct = (classification == "balanced")
+        vivas.registrar("balanced", correct)
         
         if correct:
             aciertos_balanced += 1
@@ -135,10 +164,12 @@ def ejecutar_experimento():
             "oracle_case": oracle_case,
             "counts": counts,
             "classification": classification,
-            "correct": correct
+            "correct": correct,
+            "qubits_medidos": qubits_medidos(transpiled_circuit)
         })
     
-    print("\n")
+    print(f"\rPruebas {vivas.pruebas}/{total_pruebas} | {vivas.linea()}\n")
+    vivas.guardar_estado()
     
     precision_constant = aciertos_constant / num_constant
     precision_balanced = aciertos_balanced / num_balanced
@@ -154,18 +185,32 @@ def ejecutar_experimento():
         "total_balanced": num_balanced
     }
     
+    # Corrección de errores de lectura con las fidelidades de los qubits que midió cada prueba
+    matrices_lectura, conjuntos = matrices_por_prueba(cargar_calibracion(path_to_calibration_file),
+                                                      [p["qubits_medidos"] for p in resultados["pruebas"]])
+    estadisticas["mitigacion"] = estadisticas_mitigadas(resultados["pruebas"], n, matrices_lectura, grupos=conjuntos)
+    precision_mitigada = estadisticas["mitigacion"]["precision"]
+    
+    # Intervalos de confianza bootstrap (95%) de las precisiones
+    estadisticas["intervalos"] = bootstrap_pruebas(resultados["pruebas"])
+    intervalo_total = estadisticas["intervalos"]["precision"]["total"]
+    
     resultados["estadisticas"] = estadisticas
     
     print(f"Precisión total: {aciertos_constant + aciertos_balanced}/{total_pruebas} ({precision_total:.2%})")
     print(f"Precisión en funciones constantes: {aciertos_constant}/{num_constant} ({precision_constant:.2%})")
     print(f"Precisión en funciones balanceadas: {aciertos_balanced}/{num_balanced} ({precision_balanced:.2%})")
+    print(f"IC 95% de la precisión total: [{intervalo_total['inferior']:.2%}, {intervalo_total['superior']:.2%}]")
+    print(f"Precisión mitigada (lectura): total {precision_mitigada['total']:.2%}, constantes {precision_mitigada['constant']:.2%}, balanceadas {precision_mitigada['balanced']:.2%}")
     
-    output_file = "2qubits.json"
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     
     with open(output_file, 'w') as f:
         json.dump(resultados, f, indent=2)
     
+    guardar_trazas(output_file)
+    guardar_ejecucion(resultados, tipo_backend, path_to_calibration_file, origen=output_file)
+    
     return resultados
 
 if __name__ == "__main__":
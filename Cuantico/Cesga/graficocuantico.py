@@ -1,8 +1,10 @@
-import matplotlib.pyplot as plt
+import os
 import numpy as np
 import json
 
-def load_json_data(file_2q='C:/Users/victo/TFG-Computacion cuantica/TFG-Deutsch-Jozsa-Algorithm/Cuantico/Cesga/2qubitscesga.json', file_4q='C:/Users/victo/TFG-Computacion cuantica/TFG-Deutsch-Jozsa-Algorithm/Cuantico/Cesga/4qubitscesga.json'):
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+def load_json_data(file_2q=os.path.join(DIRECTORIO, '2qubitscesga.json'), file_4q=os.path.join(DIRECTORIO, '4qubitscesga.json')):
     """Carga los datos desde los archivos JSON"""
     
     # Cargar archivo de 2 qubits
@@ -31,11 +33,13 @@ def load_json_data(file_2q='C:/Users/victo/TFG-Computacion cuantica/TFG-Deutsch-
     
     return data_2q, data_4q
 
-def create_simple_comparison():
+def create_simple_comparison(file_2q=os.path.join(DIRECTORIO, '2qubitscesga.json'), file_4q=os.path.join(DIRECTORIO, '4qubitscesga.json'),
+                             output_file='deutsch_jozsa_simple.png', mostrar=True):
     """Crea una figura simple y limpia"""
+    import matplotlib.pyplot as plt
     
     # Cargar datos
-    data_2q, data_4q = load_json_data()
+    data_2q, data_4q = load_json_data(file_2q, file_4q)
     
     # Configuración simple
     plt.rcParams.update({
@@ -86,11 +90,14 @@ def create_simple_comparison():
     plt.tight_layout()
     
     # Guardar
-    plt.savefig('deutsch_jozsa_simple.png', dpi=500, bbox_inches='tight')
+    plt.savefig(output_file, dpi=500, bbox_inches='tight')
+    
+    if mostrar:
+        plt.show()
     
-    plt.show()
+    print(f"Figura guardada como: {output_file}")
     
-    print("Figura guardada como: deutsch_jozsa_simple.png")
+    return fig
 
 if __name__ == "__main__":
     create_simple_comparison()
\ No newline at end of file
@@ -1,18 +1,29 @@
 import os
+import sys
 import numpy as np
 import json
 import random
 
 os.environ["ZMQ_SERVER"] = "tcp://127.0.0.1:5556"
 
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit.circuit.library import HGate, XGate
-from qmiotools.integrations.qiskitqmio.fakeqmio import FakeQmio
 
-path_to_calibration_file = "2025_04_23__12_00_02.json"
-backend = FakeQmio(path_to_calibration_file)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backends import obtener_backend
+from calibracion import cargar_calibracion, seleccionar_layout
+from experimentos import guardar_ejecucion
+from intervalos import bootstrap_pruebas
+from mitigacion import estadisticas_mitigadas, matrices_por_prueba, qubits_medidos
+from multiprograma import encadenar_circuitos, precision_por_posicion, separar_conteos
+from oraculoparidad import aplicar_oraculo_balanceado
+from seguimiento import EstadisticasVivas
+from transpilacion import transpilar
+from trazas import guardar_trazas, tramo
 
-def deutsch_jozsa_circuit(n=4, oracle_type="constant", oracle_case=0):
+path_to_calibration_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2025_04_23__12_00_02.json")
+
+def deutsch_jozsa_circuit(n=4, oracle_type="constant", oracle_case=0, modo_oraculo="lineal"):
     circuit = QuantumCircuit(n+1, n)
     
     circuit.x(n)
@@ -24,9 +35,7 @@ def deutsch_jozsa_circuit(n=4, oracle_type="constant", oracle_case=0):
         if oracle_case == 1:
             circuit.z(n)
     else:  
-        for i in range(n):
-            if (oracle_case >> i) & 1:
-                circuit.cx(i, n)
+        aplicar_oraculo_balanceado(circuit, n, oracle_case, modo_oraculo)
     
     for i in range(n):
         circuit.h(i)
@@ -36,29 +45,44 @@ def deutsch_jozsa_circuit(n=4, oracle_type="constant", oracle_case=0):
     
     return circuit
 
-def ejecutar_experimento_deutsch_jozsa_estadistico():
+def ejecutar_experimento_deutsch_jozsa_estadistico(shots=1, num_constant=50, num_balanced=250, modo_oraculo="lineal",
+                                                   cadena=1, semiamplitud_objetivo=None, casos=None):
     n = 4
-    shots = 1
     
-    total_pruebas = 300
-    num_balanced = 250
-    num_constant = 50
+    if casos is not None:
+        # Casos fijados por un plan (presupuestoshots.planificar) en lugar del sorteo
+        num_constant = sum(1 for tipo, _ in casos if tipo == "constant")
+        num_balanced = len(casos) - num_constant
+    total_pruebas = num_constant + num_balanced
+    output_file = "4cubits_estadistico_fake.json"
+    # El backend se crea al ejecutar, no al importar el módulo, y se reutiliza entre ejecuciones
+    backend, _ = obtener_backend("fakeqmio", path_to_calibration_file)
     
-    qubit_layout = [12, 13, 19, 20, 6]
+    # Layout elegido a partir de la calibración: [entradas..., ancilla]
+    qubit_layout, puntuacion_layout = seleccionar_layout(path_to_calibration_file, n, backend.coupling_map)
     resultados = {
         "configuracion": {
             "total_pruebas": total_pruebas,
             "num_balanced": num_balanced,
+            "casos_fijados": casos is not None,
             "num_constant": num_constant,
-            "relacion": "3:1",
+            "relacion": f"{num_balanced}:{num_constant}",
             "n_qubits": n,
             "shots_por_circuito": shots,
-            "qubit_layout": qubit_layout
+            "qubit_layout": qubit_layout,
+            "puntuacion_layout": puntuacion_layout,
+            "modo_oraculo": modo_oraculo,
+            "semiamplitud_objetivo": semiamplitud_objetivo,
+            "cadena": cadena
         },
         "pruebas": [],
         "estadisticas": {}
     }
     
+    # Estadísticas incrementales: línea de progreso y fichero de estado junto a los resultados
+    vivas = EstadisticasVivas(total_pruebas, path_estado=os.path.splitext(output_file)[0] + "_estado.json",
+                              semiamplitud_objetivo=semiamplitud_objetivo)
+    
     aciertos_constant = 0
     aciertos_balanced = 0
     fallos_constant = 0
@@ -82,65 +106,103 @@ def ejecutar_experimento_deutsch_jozsa_estadistico():
             "expected": "balanced"
         })
     
+    if casos is not None:
+        pruebas_lista = [{"oracle_type": tipo, "oracle_case": caso, "expected": tipo} for tipo, caso in casos]
+    
     random.shuffle(pruebas_lista)
     
     print("\nIniciando experimento...")
     
-    for i, prueba_config in enumerate(pruebas_lista):
-        print(f"\rEjecutando prueba {i+1}/{total_pruebas} ({prueba_config['oracle_type']})", end="")
-        
-        oracle_type = prueba_config["oracle_type"]
-        oracle_case = prueba_config["oracle_case"]
-        expected = prueba_config["expected"]
-        
-        circuit = deutsch_jozsa_circuit(n, oracle_type, oracle_case)
-        transpiled_circuit = transpile(
-            circuit,
-            backend,
-            initial_layout=qubit_layout,
-            optimization_level=2
-        )
-        
-        job = backend.run(transpiled_circuit, shots=shots)
-        result = job.result()
-        counts = result.get_counts()
+    # Con cadena > 1 cada trabajo ejecuta `cadena` pruebas seguidas con reset entre ellas
+    lotes = [pruebas_lista[inicio:inicio + cadena] for inicio in range(0, total_pruebas, cadena)]
+    
+    with tramo("deutsch_jozsa_circuit", trabajos=len(lotes)):
+        circuitos = [
+            encadenar_circuitos([
+                deutsch_jozsa_circuit(n, prueba_config["oracle_type"], prueba_config["oracle_case"], modo_oraculo)
+                for prueba_config in lote
+            ])
+            for lote in lotes
+        ]
+    
+    # Todos los trabajos de una vez con el gestor de pases de nivel 2 del layout
+    with tramo("transpile", trabajos=len(lotes)):
+        transpilados = transpilar(circuitos, qubit_layout, backend)
+    
+    for trabajo, (lote, transpiled_circuit) in enumerate(zip(lotes, transpilados), 1):
+        inicio = (trabajo - 1) * cadena
+        print(f"\rEjecutando pruebas {inicio+1}-{inicio+len(lote)}/{total_pruebas} | {vivas.linea()}", end="")
         
-        zeros_count = counts.get('0'*n, 0)
-        total_shots = sum(counts.values())
+        # backend.run mide el envío; job.result incluye la cola y la ejecución
+        with tramo("backend.run", trabajo=trabajo):
+            job = backend.run(transpiled_circuit, shots=shots)
+        with tramo("job.result", trabajo=trabajo):
+            result = job.result()
+        with tramo("get_counts", trabajo=trabajo):
+            counts_lote = separar_conteos(result.get_counts(), len(lote), n)
+        # Qubits físicos medidos por cada prueba de la cadena (bits [j·n, (j+1)·n))
+        medidos = qubits_medidos(transpiled_circuit)
         
-        if zeros_count / total_shots > 0.5:
-            classification = "constant"
-        else:
-            classification = "balanced"
+        for posicion, (prueba_config, counts) in enumerate(zip(lote, counts_lote)):
+            oracle_type = prueba_config["oracle_type"]
+            oracle_case = prueba_config["oracle_case"]
+            expected = prueba_config["expected"]
             
-        correct = (classification == expected)
-        
-        if oracle_type == "constant":
-            if correct:
-                aciertos_constant += 1
+            zeros_count = counts.get('0'*n, 0)
+            total_shots = sum(counts.values())
+            
+            if zeros_count / total_shots > 0.5:
+                classification = "constant"
             else:
-                fallos_constant += 1
-        else:
-            if correct:
-                aciertos_balanced += 1
+                classification = "balanced"
+                
+            correct = (classification == expected)
+            vivas.registrar(oracle_type, correct)
+            
+            if oracle_type == "constant":
+                if correct:
+                    aciertos_constant += 1
+                else:
+                    fallos_constant += 1
             else:
-                fallos_balanced += 1
-        
-        resultado = {
-            "prueba_num": i + 1,
-            "tipo": oracle_type,
-            "oracle_type": oracle_type,
-            "oracle_case": oracle_case,
-            "expected": expected,
-            "classified": classification,
-            "counts": counts,
-            "correct": correct,
-            "zeros_percentage": zeros_count / total_shots
-        }
+                if correct:
+                    aciertos_balanced += 1
+                else:
+                    fallos_balanced += 1
+            
+            resultado = {
+                "prueba_num": inicio + posicion + 1,
+                "tipo": oracle_type,
+                "oracle_type": oracle_type,
+                "oracle_case": oracle_case,
+                "expected": expected,
+                "classified": classification,
+                "counts": counts,
+                "correct": correct,
+                "zeros_percentage": zeros_count / total_shots,
+                "trabajo": trabajo,
+                "posicion": posicion,
+                "qubits_medidos": medidos[posicion * n:(posicion + 1) * n]
+            }
+            
+            resultados["pruebas"].append(resultado)
         
-        resultados["pruebas"].append(resultado)
+        if vivas.suficiente():
+            break
     
-    print()
+    print(f"\rPruebas {vivas.pruebas}/{total_pruebas} | {vivas.linea()}")
+    vivas.guardar_estado()
+    
+    # Parada anticipada: las estadísticas se calculan sobre las pruebas hechas
+    if vivas.pruebas < total_pruebas:
+        print(f"{vivas.pruebas_objetivo} pruebas garantizan ±{semiamplitud_objetivo:.1%}: "
+              f"se para tras {vivas.pruebas} de {total_pruebas}")
+        resultados["configuracion"]["parada_anticipada"] = True
+        resultados["configuracion"]["pruebas_objetivo"] = vivas.pruebas_objetivo
+        resultados["configuracion"]["pruebas_realizadas"] = vivas.pruebas
+        num_constant = aciertos_constant + fallos_constant
+        num_balanced = aciertos_balanced + fallos_balanced
+        total_pruebas = vivas.pruebas
     
     precision_constant = aciertos_constant / num_constant if num_constant > 0 else 0
     precision_balanced = aciertos_balanced / num_balanced if num_balanced > 0 else 0
@@ -190,28 +252,56 @@ def ejecutar_experimento_deutsch_jozsa_estadistico():
         }
     }
     
+    # Corrección de errores de lectura con las fidelidades de los qubits que midió cada prueba
+    matrices_lectura, conjuntos = matrices_por_prueba(cargar_calibracion(path_to_calibration_file),
+                                                      [p["qubits_medidos"] for p in resultados["pruebas"]])
+    estadisticas["mitigacion"] = estadisticas_mitigadas(resultados["pruebas"], n, matrices_lectura, grupos=conjuntos)
+    precision_mitigada = estadisticas["mitigacion"]["precision"]
+    
+    # Intervalos de confianza bootstrap (95%) de las precisiones
+    estadisticas["intervalos"] = bootstrap_pruebas(resultados["pruebas"])
+    
+    # Degradación con la posición en la cadena (medida y reset a mitad de circuito)
+    if cadena > 1:
+        estadisticas["precision_por_posicion"] = precision_por_posicion(resultados["pruebas"])
+    intervalo_total = estadisticas["intervalos"]["precision"]["total"]
+    
     resultados["estadisticas"] = estadisticas
     
     print("\n" + "="*60)
     print("RESULTADOS DEL EXPERIMENTO DEUTSCH-JOZSA")
     print("="*60)
-    print(f"Configuración: {n} qubits, relación 3:1, {total_pruebas} pruebas totales")
+    print(f"Configuración: {n} qubits, relación {num_balanced}:{num_constant}, {shots} shots, {total_pruebas} pruebas totales")
     print()
     
     print("PRECISIÓN (Accuracy):")
     print(f"  Total: {aciertos_constant + aciertos_balanced}/{total_pruebas} ({precision_total:.2%})")
     print(f"  Funciones constantes: {aciertos_constant}/{num_constant} ({precision_constant:.2%})")
     print(f"  Funciones balanceadas: {aciertos_balanced}/{num_balanced} ({precision_balanced:.2%})")
+    print(f"  IC 95% (bootstrap) del total: [{intervalo_total['inferior']:.2%}, {intervalo_total['superior']:.2%}]")
     print()
+    print("PRECISIÓN MITIGADA (corrección de lectura):")
+    print(f"  Total: {precision_mitigada['total']:.2%}")
+    print(f"  Funciones constantes: {precision_mitigada['constant']:.2%}")
+    print(f"  Funciones balanceadas: {precision_mitigada['balanced']:.2%}")
+    print()
+    if cadena > 1:
+        print("PRECISIÓN POR POSICIÓN EN LA CADENA:")
+        for punto in estadisticas["precision_por_posicion"]:
+            print(f"  {punto['posicion']:>2}: {punto['precision']:.2%} [{punto['inferior']:.2%}, {punto['superior']:.2%}]")
+        print()
     
-    output_file = "4cubits_estadistico_fake.json"
-    
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     
     with open(output_file, 'w') as f:
         json.dump(resultados, f, indent=2)
     
+    guardar_trazas(output_file)
+    guardar_ejecucion(resultados, "fakeqmio", path_to_calibration_file, origen=output_file)
+    
     print(f"\n📊 Resultados guardados en {output_file}")
+    
+    return resultados
 
 if __name__ == "__main__":
     random.seed(42)
@@ -0,0 +1,99 @@
+"""
+Fábrica de backends para los runners y las simulaciones locales.
+
+Los backends se crean al pedirlos, no al importar los módulos, y se guardan
+por proceso con el hash del contenido del fichero de calibración: repetir un
+barrido o recorrer varias fechas de calibración no reconstruye el
+simulador, y los gestores de pases de transpilacion (que se indexan por
+backend) se reutilizan entre llamadas. Varias calibraciones pueden tener su
+backend a la vez para comparar la deriva entre fechas:
+
+    for nombre, (simulador, opciones) in backends_por_calibracion(glob.glob("Cesga/*.json")).items():
+        ...
+
+Tipos de backend:
+    "qmio": QmioBackend (hardware real a través de ZMQ_SERVER)
+    "fakeqmio": FakeQmio con la calibración dada
+    "aer": AerSimulator con el modelo de ruido de la calibración (ruidocalibrado)
+    "local": FakeQmio si qmiotools está instalado y, si no, "aer"
+    "servidor": BackendServidor, que envía los trabajos al servidor local de
+        servidorlocal.py en ZMQ_SERVER (runners de Cesga sin acceso al CESGA)
+"""
+import logging
+import os
+
+from calibracion import aristas_acoplamiento, cargar_calibracion, hash_archivo
+
+TIPOS = ("qmio", "fakeqmio", "aer", "local", "servidor")
+
+# (tipo, hash de la calibración) -> (backend, opciones_transpile)
+_backends = {}
+
+
+def _crear(tipo, path_calibracion):
+    if tipo == "qmio":
+        from qmiotools.integrations.qiskitqmio.qmiobackend import QmioBackend
+        backend = QmioBackend(logging_filename=None, logging_level=logging.ERROR)
+        return backend, {"backend": backend}
+    if tipo == "fakeqmio":
+        from qmiotools.integrations.qiskitqmio.fakeqmio import FakeQmio
+        backend = FakeQmio(path_calibracion)
+        return backend, {"backend": backend}
+    if tipo == "servidor":
+        from servidorlocal import BackendServidor
+        backend = BackendServidor(path_calibracion)
+        return backend, {"backend": backend}
+
+    from qiskit.transpiler import CouplingMap
+    from qiskit_aer import AerSimulator
+    from ruidocalibrado import cargar_modelo_ruido
+
+    simulador = AerSimulator(noise_model=cargar_modelo_ruido(path_calibracion))
+    coupling_map = CouplingMap(aristas_acoplamiento(cargar_calibracion(path_calibracion)))
+    return simulador, {"coupling_map": coupling_map, "basis_gates": ["ecr", "rz", "sx", "x"]}
+
+
+def obtener_backend(tipo="local", path_calibracion=None):
+    """
+    Devuelve el backend de un tipo y una calibración, creándolo la primera vez.
+
+    Args:
+        tipo: "qmio", "fakeqmio", "aer", "local" o "servidor" (ver TIPOS)
+        path_calibracion: JSON de calibración (no se usa con "qmio", que
+            toma la calibración del propio hardware)
+
+    Returns:
+        tupla (backend, opciones_transpile): backend.run() ejecuta los
+        circuitos transpilados con transpile(circuito, **opciones_transpile)
+        o transpilacion.transpilar(..., **opciones_transpile)
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de backend desconocido: {tipo} (se admiten {', '.join(TIPOS)})")
+
+    clave = (tipo, hash_archivo(path_calibracion) if tipo != "qmio" else None)
+    if clave not in _backends:
+        if tipo == "local":
+            try:
+                _backends[clave] = obtener_backend("fakeqmio", path_calibracion)
+            except ImportError:
+                _backends[clave] = obtener_backend("aer", path_calibracion)
+        else:
+            _backends[clave] = _crear(tipo, path_calibracion)
+    return _backends[clave]
+
+
+def backends_por_calibracion(paths, tipo="local"):
+    """
+    Backends de varias calibraciones, para comparar la deriva entre fechas.
+    Las calibraciones se cargan una vez y los backends quedan en la caché.
+
+    Args:
+        paths: lista de JSON de calibración
+        tipo: tipo de backend (ver obtener_backend)
+
+    Returns:
+        diccionario nombre del fichero sin extensión -> (backend, opciones_transpile),
+        en orden de nombre (las calibraciones de Qmio se nombran por fecha)
+    """
+    return {os.path.splitext(os.path.basename(path))[0]: obtener_backend(tipo, path)
+            for path in sorted(paths, key=os.path.basename)}
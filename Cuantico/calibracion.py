@@ -0,0 +1,380 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Fidelidad mínima admitida para una puerta de 2 qubits: algunas entradas de la
+# calibración valen 0.0 (acoplador roto) y log(0) haría imposible comparar layouts
+FIDELIDAD_MINIMA = 1e-3
+
+# Caché en memoria de layouts ya evaluados: (hash calibración, n, aristas) -> (layout, puntuación)
+_cache_layouts = {}
+
+# Cachés por proceso: (ruta, mtime, tamaño) -> hash y hash -> calibración indexada
+_cache_hashes = {}
+_cache_calibraciones = {}
+
+
+def hash_archivo(path):
+    """
+    Calcula el hash SHA-256 del contenido de un fichero. Se recalcula sólo
+    si el fichero cambia de fecha de modificación o de tamaño.
+
+    Args:
+        path: ruta del fichero
+
+    Returns:
+        cadena hexadecimal con el hash
+    """
+    estado = os.stat(path)
+    clave = (os.path.abspath(path), estado.st_mtime_ns, estado.st_size)
+    if clave not in _cache_hashes:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 16), b''):
+                sha.update(bloque)
+        _cache_hashes[clave] = sha.hexdigest()
+    return _cache_hashes[clave]
+
+
+def _indice_qubit(nombre):
+    # "q[12]" -> 12
+    return int(nombre.strip()[2:-1])
+
+
+def cargar_calibracion(path):
+    """
+    Calibración indexada de un fichero, leída una sola vez por proceso y
+    contenido (ver leer_calibracion). El resultado se comparte entre
+    llamadas y no debe modificarse.
+
+    Args:
+        path: ruta del JSON de calibración
+
+    Returns:
+        diccionario de leer_calibracion
+    """
+    huella = hash_archivo(path)
+    if huella not in _cache_calibraciones:
+        _cache_calibraciones[huella] = leer_calibracion(path)
+    return _cache_calibraciones[huella]
+
+
+def leer_calibracion(path):
+    """
+    Carga un fichero de calibración de Qmio en una estructura indexada por qubit físico.
+
+    Args:
+        path: ruta del JSON de calibración (p.ej. 2025_04_23__12_00_02.json)
+
+    Returns:
+        diccionario con arrays de NumPy indexados por qubit ("t1", "t2",
+        "fidelidad_lectura", "duracion_lectura", "fidelidad_sx", "duracion_sx")
+        y las puertas de 2 qubits en "puertas_2q" con clave (control, target)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    qubits = raw.get("Qubits", {})
+    num_qubits = max(_indice_qubit(q) for q in qubits) + 1
+
+    t1 = np.full(num_qubits, np.nan)
+    t2 = np.full(num_qubits, np.nan)
+    fidelidad_lectura = np.full(num_qubits, np.nan)
+    duracion_lectura = np.zeros(num_qubits)
+    fidelidad_sx = np.ones(num_qubits)
+    duracion_sx = np.zeros(num_qubits)
+
+    for nombre, datos in qubits.items():
+        q = _indice_qubit(nombre)
+        t1[q] = datos.get("T1 (s)", np.nan)
+        t2[q] = datos.get("T2 (s)", np.nan)
+        fidelidad_lectura[q] = datos.get("Fidelity readout", datos.get("Readout fidelity (RB)", np.nan))
+        duracion_lectura[q] = datos.get("Readout duration (s)", 0.0)
+
+    for nombre, puertas in raw.get("Q1Gates", {}).items():
+        q = _indice_qubit(nombre)
+        sx = puertas.get("SX", {})
+        fidelidad_sx[q] = sx.get("Fidelity(RB)", 1.0)
+        duracion_sx[q] = sx.get("Gate duration (s)", 0.0)
+
+    puertas_2q = {}
+    for puertas in raw.get("Q2Gates(RB)", {}).values():
+        for datos in puertas.values():
+            clave = (int(datos["Control"]), int(datos["Target"]))
+            puertas_2q[clave] = {
+                "fidelidad": datos.get("Fidelity(RB)", np.nan),
+                "duracion": datos.get("Duration (s)", 0.0)
+            }
+
+    return {
+        "num_qubits": num_qubits,
+        "t1": t1,
+        "t2": t2,
+        "fidelidad_lectura": fidelidad_lectura,
+        "duracion_lectura": duracion_lectura,
+        "fidelidad_sx": fidelidad_sx,
+        "duracion_sx": duracion_sx,
+        "puertas_2q": puertas_2q
+    }
+
+
+def aristas_acoplamiento(calibracion, coupling_map=None):
+    """
+    Obtiene las aristas (no dirigidas) del mapa de acoplamiento.
+
+    Args:
+        calibracion: estructura devuelta por cargar_calibracion
+        coupling_map: CouplingMap del backend, lista de pares o None para
+            usar las puertas de 2 qubits de la calibración
+
+    Returns:
+        conjunto ordenado de pares (a, b) con a < b
+    """
+    if coupling_map is None:
+        pares = calibracion["puertas_2q"].keys()
+    elif hasattr(coupling_map, "get_edges"):
+        pares = coupling_map.get_edges()
+    else:
+        pares = coupling_map
+
+    return sorted({(min(a, b), max(a, b)) for a, b in pares if a != b})
+
+
+def _log_fidelidades_aristas(calibracion, aristas):
+    # Las aristas del backend sin dato de calibración reciben la mediana
+    fidelidades = {}
+    for a, b in aristas:
+        datos = calibracion["puertas_2q"].get((a, b), calibracion["puertas_2q"].get((b, a)))
+        fidelidades[(a, b)] = np.nan if datos is None else datos["fidelidad"]
+
+    conocidas = [f for f in fidelidades.values() if not np.isnan(f)]
+    mediana = float(np.median(conocidas)) if conocidas else 0.99
+
+    return {
+        arista: float(np.log(np.clip(mediana if np.isnan(f) else f, FIDELIDAD_MINIMA, 1.0)))
+        for arista, f in fidelidades.items()
+    }
+
+
+def _duracion_arista(calibracion, a, b):
+    datos = calibracion["puertas_2q"].get((a, b), calibracion["puertas_2q"].get((b, a)))
+    return 0.0 if datos is None else datos["duracion"]
+
+
+def _grafo(calibracion, aristas):
+    # Vecinos de cada qubit y log-fidelidad de cada arista
+    vecinos = {q: set() for q in range(calibracion["num_qubits"])}
+    for a, b in aristas:
+        vecinos.setdefault(a, set()).add(b)
+        vecinos.setdefault(b, set()).add(a)
+    return vecinos, _log_fidelidades_aristas(calibracion, aristas)
+
+
+def _subgrafos_conexos(vecinos, k):
+    """
+    Enumera los subgrafos conexos de k nodos (algoritmo ESU): cada subconjunto
+    aparece exactamente una vez, empezando por su nodo de menor índice.
+    """
+    def extender(subgrafo, extension, raiz):
+        if len(subgrafo) == k:
+            yield subgrafo
+            return
+        extension = set(extension)
+        while extension:
+            w = extension.pop()
+            nueva = extension | {
+                u for u in vecinos[w]
+                if u > raiz and u not in subgrafo and all(u not in vecinos[s] for s in subgrafo)
+            }
+            yield from extender(subgrafo | {w}, nueva, raiz)
+
+    for v in sorted(vecinos):
+        yield from extender(frozenset([v]), {u for u in vecinos[v] if u > v}, v)
+
+
+def _caminos_minimos(subgrafo, vecinos, log_fid, origen):
+    # Dijkstra dentro del subgrafo con peso -log(fidelidad)
+    coste = {origen: 0.0}
+    previo = {origen: None}
+    pendientes = set(subgrafo)
+    while pendientes:
+        u = min((q for q in pendientes if q in coste), key=coste.get, default=None)
+        if u is None:
+            break
+        pendientes.discard(u)
+        for w in vecinos[u]:
+            if w not in subgrafo:
+                continue
+            c = coste[u] - log_fid[(min(u, w), max(u, w))]
+            if c < coste.get(w, np.inf):
+                coste[w] = c
+                previo[w] = u
+    return previo
+
+
+def puntuar_layout(calibracion, entradas, ancilla, vecinos, log_fid):
+    """
+    Estima el logaritmo de la probabilidad de una ejecución sin errores del
+    circuito DJ con topología en estrella (todas las entradas hacen CNOT sobre
+    la ancilla) para una asignación concreta de qubits físicos.
+
+    Args:
+        calibracion: estructura devuelta por cargar_calibracion
+        entradas: qubits físicos de entrada
+        ancilla: qubit físico de la ancilla
+        vecinos: diccionario qubit -> conjunto de vecinos
+        log_fid: diccionario arista -> log(fidelidad)
+
+    Returns:
+        log-probabilidad estimada (mayor es mejor), o -inf si alguna entrada no
+        está conectada con la ancilla dentro del subgrafo
+    """
+    subgrafo = set(entradas) | {ancilla}
+    previo = _caminos_minimos(subgrafo, vecinos, log_fid, ancilla)
+
+    log_p = 0.0
+    duracion = 0.0
+    for q in entradas:
+        if q not in previo:
+            return -np.inf
+        # Camino entrada -> ancilla: la última arista ejecuta el CNOT y las
+        # anteriores necesitan un SWAP (3 puertas de 2 qubits) cada una
+        camino = []
+        actual = q
+        while previo[actual] is not None:
+            camino.append((actual, previo[actual]))
+            actual = previo[actual]
+        for j, (u, w) in enumerate(camino):
+            repeticiones = 1 if j == len(camino) - 1 else 3
+            log_p += repeticiones * log_fid[(min(u, w), max(u, w))]
+            duracion += repeticiones * _duracion_arista(calibracion, u, w)
+
+    # Puertas de 1 qubit: H, H en las entradas y X, H en la ancilla (≈ 2 SX por qubit)
+    qubits = list(entradas) + [ancilla]
+    log_p += 2 * np.sum(np.log(calibracion["fidelidad_sx"][qubits]))
+    duracion += 2 * np.max(calibracion["duracion_sx"][qubits])
+
+    # Lectura de las entradas
+    log_p += np.sum(np.log(np.clip(calibracion["fidelidad_lectura"][list(entradas)], FIDELIDAD_MINIMA, 1.0)))
+    duracion += np.max(calibracion["duracion_lectura"][list(entradas)])
+
+    # Decoherencia durante la duración total (CNOTs serializados en la ancilla)
+    tasas = 0.5 * (1 / calibracion["t1"][qubits] + 1 / calibracion["t2"][qubits])
+    log_p -= duracion * np.nansum(tasas)
+
+    return float(log_p)
+
+
+def seleccionar_layout(path_calibracion, n, coupling_map=None):
+    """
+    Selecciona el mejor layout físico para el circuito DJ de n qubits de entrada.
+
+    Recorre todos los subgrafos conexos de n+1 qubits del mapa de acoplamiento,
+    prueba cada nodo como ancilla y se queda con la asignación de mayor
+    probabilidad estimada de éxito. El resultado se guarda en caché por
+    contenido del fichero de calibración.
+
+    Args:
+        path_calibracion: ruta del JSON de calibración
+        n: número de qubits de entrada (sin contar la ancilla)
+        coupling_map: CouplingMap del backend, lista de pares o None
+
+    Returns:
+        tupla (layout, puntuacion): layout es la lista [entradas..., ancilla]
+        lista para transpile(initial_layout=...) y puntuacion la probabilidad
+        estimada de una ejecución sin errores
+    """
+    calibracion = cargar_calibracion(path_calibracion)
+    aristas = aristas_acoplamiento(calibracion, coupling_map)
+    clave = (hash_archivo(path_calibracion), n, tuple(aristas))
+    if clave in _cache_layouts:
+        return _cache_layouts[clave]
+
+    vecinos, log_fid = _grafo(calibracion, aristas)
+
+    mejor_layout = None
+    mejor_log_p = -np.inf
+    for subgrafo in _subgrafos_conexos(vecinos, n + 1):
+        for ancilla in sorted(subgrafo):
+            entradas = sorted(subgrafo - {ancilla})
+            log_p = puntuar_layout(calibracion, entradas, ancilla, vecinos, log_fid)
+            if log_p > mejor_log_p:
+                mejor_log_p = log_p
+                mejor_layout = entradas + [ancilla]
+
+    if mejor_layout is None:
+        raise ValueError(f"No hay ningún subgrafo conexo de {n + 1} qubits en el mapa de acoplamiento")
+
+    resultado = (mejor_layout, float(np.exp(mejor_log_p)))
+    _cache_layouts[clave] = resultado
+    return resultado
+
+
+def seleccionar_grupos(path_calibracion, n, k, coupling_map=None, separacion=0, puntuacion_relativa=0.5):
+    """
+    Selecciona k layouts disjuntos para ejecutar k circuitos DJ de n qubits de
+    entrada en paralelo sobre el mismo chip (multiprogramación espacial).
+
+    Se puntúan todas las asignaciones (subgrafo conexo de n+1 qubits, ancilla)
+    igual que en seleccionar_layout y se eligen de mejor a peor, descartando
+    las que comparten qubits con un grupo ya elegido. Con separacion=1 también
+    se descartan las que tocan a un vecino de un grupo elegido, para que
+    ningún acoplador quede entre dos grupos (menos crosstalk, menos grupos).
+    Los grupos cuya probabilidad estimada no llega a puntuacion_relativa veces
+    la del mejor grupo no se usan: sin ese mínimo, con la calibración incluida
+    el quinto grupo de n=4 tiene una puntuación de 0.0002 frente a 0.18 del
+    primero y sólo añade pruebas falladas. Con k=1 el resultado es el mismo
+    que el de seleccionar_layout.
+
+    Args:
+        path_calibracion: ruta del JSON de calibración
+        n: número de qubits de entrada de cada circuito
+        k: número de grupos
+        coupling_map: CouplingMap del backend, lista de pares o None
+        separacion: 0 (grupos disjuntos) o 1 (grupos no adyacentes)
+        puntuacion_relativa: fracción de la puntuación del mejor grupo que
+            debe alcanzar cada grupo (0 = todos los grupos disjuntos)
+
+    Returns:
+        lista de k tuplas (layout, puntuacion) como las de seleccionar_layout,
+        de mayor a menor puntuación
+
+    Raises:
+        ValueError: si no caben k grupos suficientemente buenos en el mapa de acoplamiento
+    """
+    calibracion = cargar_calibracion(path_calibracion)
+    aristas = aristas_acoplamiento(calibracion, coupling_map)
+    clave = (hash_archivo(path_calibracion), n, tuple(aristas), "grupos", separacion)
+
+    if clave not in _cache_layouts:
+        vecinos, log_fid = _grafo(calibracion, aristas)
+        candidatos = []
+        for subgrafo in _subgrafos_conexos(vecinos, n + 1):
+            for ancilla in sorted(subgrafo):
+                entradas = sorted(subgrafo - {ancilla})
+                log_p = puntuar_layout(calibracion, entradas, ancilla, vecinos, log_fid)
+                if log_p > -np.inf:
+                    candidatos.append((log_p, entradas + [ancilla]))
+        # Orden estable: a igual puntuación gana el primero enumerado, como en seleccionar_layout
+        candidatos.sort(key=lambda candidato: -candidato[0])
+
+        grupos = []
+        bloqueados = set()
+        for log_p, layout in candidatos:
+            if bloqueados.isdisjoint(layout):
+                grupos.append((layout, float(np.exp(log_p))))
+                bloqueados.update(layout)
+                if separacion:
+                    bloqueados.update(v for q in layout for v in vecinos[q])
+        _cache_layouts[clave] = grupos
+
+    candidatos = _cache_layouts[clave]
+    puntuacion_minima = puntuacion_relativa * candidatos[0][1] if candidatos else 0.0
+    grupos = [grupo for grupo in candidatos if grupo[1] >= puntuacion_minima]
+    if len(grupos) < k:
+        raise ValueError(f"Sólo caben {len(grupos)} grupos disjuntos de {n + 1} qubits "
+                         f"(separación {separacion}, puntuación mínima {puntuacion_minima:.3g}, "
+                         f"{puntuacion_relativa:g} veces la del mejor) y se pidieron {k}")
+    return grupos[:k]
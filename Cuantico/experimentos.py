@@ -0,0 +1,281 @@
+"""
+Base de datos SQLite con todas las ejecuciones y sus pruebas.
+
+Cada ejecución (un JSON de resultados de los runners o un CSV del barrido de
+ruido) es una fila de `runs`; cada prueba DJ una fila de `trials` con el
+backend, el snapshot de calibración y n repetidos para que el índice
+compuesto resuelva sin JOIN consultas como "precisión por oracle_case en
+Qmio frente a FakeQmio". Los barridos de ruido sólo guardan medias por
+nivel, así que van a `curvas_ruido`.
+
+Cada ejecución se identifica por la huella de su contenido: ingerir dos
+veces el mismo fichero, o el JSON que un runner ya insertó, no la duplica.
+
+    python experimentos.py ingerir Cesga/4qubitscesga.json Cesga/2qubitscesga.json
+    python experimentos.py casos
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+
+PATH_BASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "experimentos.sqlite")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    huella TEXT NOT NULL UNIQUE,
+    origen TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    calibracion TEXT,
+    n INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    shots INTEGER,
+    configuracion TEXT
+);
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    prueba_num INTEGER,
+    backend TEXT NOT NULL,
+    calibracion TEXT,
+    n INTEGER NOT NULL,
+    oracle_type TEXT NOT NULL,
+    oracle_case INTEGER,
+    noise_type TEXT,
+    noise_level REAL,
+    correct INTEGER NOT NULL,
+    classified TEXT,
+    counts TEXT,
+    trabajo INTEGER,
+    grupo INTEGER,
+    posicion INTEGER
+);
+CREATE INDEX IF NOT EXISTS trials_consulta
+    ON trials (backend, calibracion, n, oracle_type, oracle_case, noise_type, noise_level);
+CREATE INDEX IF NOT EXISTS trials_run ON trials (run_id);
+CREATE TABLE IF NOT EXISTS curvas_ruido (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    noise_type TEXT NOT NULL,
+    noise_level REAL NOT NULL,
+    precision REAL NOT NULL,
+    error REAL,
+    PRIMARY KEY (run_id, noise_type, noise_level)
+);
+"""
+
+
+def conectar(path=PATH_BASE):
+    """
+    Abre la base de datos y crea las tablas si no existen.
+
+    Args:
+        path: fichero SQLite
+
+    Returns:
+        sqlite3.Connection
+    """
+    conexion = sqlite3.connect(path)
+    conexion.execute("PRAGMA foreign_keys = ON")
+    conexion.execute("PRAGMA journal_mode = WAL")
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+def _huella(datos):
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _fila_prueba(prueba):
+    # Los JSON de 2 y 4 qubits usan nombres distintos para el mismo campo
+    oracle_type = prueba.get("oracle_type", prueba["tipo"])
+    return (
+        prueba.get("prueba_num"),
+        oracle_type,
+        prueba.get("oracle_case"),
+        prueba.get("noise_type"),
+        prueba.get("noise_level"),
+        int(bool(prueba["correct"])),
+        prueba.get("classified", prueba.get("classification")),
+        json.dumps(prueba["counts"]) if "counts" in prueba else None,
+        prueba.get("trabajo"),
+        prueba.get("grupo"),
+        prueba.get("posicion")
+    )
+
+
+def _insertar_run(conexion, huella, origen, backend, calibracion, n, shots, configuracion, fecha):
+    cursor = conexion.execute(
+        "INSERT OR IGNORE INTO runs (huella, origen, backend, calibracion, n, fecha, shots, configuracion) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (huella, origen, backend, calibracion, n, fecha or datetime.datetime.now().isoformat(timespec="seconds"),
+         shots, json.dumps(configuracion) if configuracion is not None else None)
+    )
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def insertar_resultados(conexion, resultados, backend, calibracion=None, origen="runner", fecha=None):
+    """
+    Inserta una ejecución de los runners (diccionario con "pruebas" y,
+    opcionalmente, "configuracion") con todas sus pruebas de una vez.
+
+    Args:
+        conexion: conexión de conectar
+        resultados: diccionario de resultados tal como se guarda en JSON
+        backend: "qmio", "fakeqmio", "aer"...
+        calibracion: snapshot de calibración (p.ej. "2025_04_23__12_00_02")
+        origen: fichero o programa del que vienen los datos
+        fecha: fecha ISO de la ejecución (por defecto, ahora)
+
+    Returns:
+        id de la ejecución, o None si ya estaba en la base de datos
+    """
+    pruebas = resultados["pruebas"]
+    configuracion = resultados.get("configuracion")
+    if configuracion and "n_qubits" in configuracion:
+        n = configuracion["n_qubits"]
+    else:
+        n = len(next(iter(pruebas[0]["counts"])).replace(" ", ""))
+    shots = configuracion.get("shots_por_circuito") if configuracion else sum(pruebas[0]["counts"].values())
+
+    with conexion:
+        run_id = _insertar_run(conexion, _huella(pruebas), origen, backend, calibracion, n, shots, configuracion, fecha)
+        if run_id is None:
+            return None
+        conexion.executemany(
+            "INSERT INTO trials (run_id, backend, calibracion, n, prueba_num, oracle_type, oracle_case, noise_type, "
+            "noise_level, correct, classified, counts, trabajo, grupo, posicion) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((run_id, backend, calibracion, n) + _fila_prueba(prueba) for prueba in pruebas)
+        )
+    return run_id
+
+
+def insertar_curvas(conexion, noise_levels, accuracy_results_dict, error_results_dict, metadatos=None,
+                    origen="barrido", fecha=None):
+    """
+    Inserta un barrido de ruido (medias y errores por nivel y tipo de ruido).
+
+    Args:
+        conexion: conexión de conectar
+        noise_levels, accuracy_results_dict, error_results_dict, metadatos:
+            lo que devuelve Analisismodelosruido.load_results_from_csv
+        origen: fichero del que vienen los datos
+        fecha: fecha ISO (por defecto, ahora)
+
+    Returns:
+        id de la ejecución, o None si ya estaba en la base de datos
+    """
+    metadatos = metadatos or {}
+    huella = _huella([list(noise_levels), accuracy_results_dict, error_results_dict, metadatos])
+    with conexion:
+        run_id = _insertar_run(conexion, huella, origen, "aer", None, metadatos.get("n", 0), None, metadatos, fecha)
+        if run_id is None:
+            return None
+        conexion.executemany(
+            "INSERT INTO curvas_ruido (run_id, noise_type, noise_level, precision, error) VALUES (?, ?, ?, ?, ?)",
+            ((run_id, noise_type, float(nivel), float(precision), float(error))
+             for noise_type in accuracy_results_dict
+             for nivel, precision, error in zip(noise_levels, accuracy_results_dict[noise_type],
+                                                error_results_dict[noise_type]))
+        )
+    return run_id
+
+
+def _backend_por_nombre(path):
+    nombre = os.path.basename(path).lower()
+    return "fakeqmio" if "fake" in nombre else "qmio"
+
+
+def ingerir(conexion, path, backend=None, calibracion=None):
+    """
+    Ingiere un fichero de resultados existente: JSON de los runners o CSV del
+    barrido de ruido.
+
+    Args:
+        conexion: conexión de conectar
+        path: fichero
+        backend: backend de los JSON (por defecto "fakeqmio" si el nombre
+            contiene "fake" y "qmio" si no)
+        calibracion: snapshot de calibración de los JSON
+
+    Returns:
+        id de la ejecución, o None si ya estaba en la base de datos
+    """
+    fecha = datetime.datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+    if path.endswith(".csv"):
+        from Analisismodelosruido import load_results_from_csv
+        return insertar_curvas(conexion, *load_results_from_csv(path), origen=path, fecha=fecha)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        resultados = json.load(f)
+    return insertar_resultados(conexion, resultados, backend or _backend_por_nombre(path), calibracion,
+                               origen=path, fecha=fecha)
+
+
+def guardar_ejecucion(resultados, backend, path_calibracion=None, origen="runner", path=PATH_BASE):
+    """
+    Inserta los resultados de un runner al terminar la ejecución.
+
+    Args:
+        resultados: diccionario de resultados del runner
+        backend: "qmio", "fakeqmio"...
+        path_calibracion: JSON de calibración usado; se guarda su nombre sin extensión
+        origen: fichero de resultados que escribe el runner
+        path: fichero SQLite
+
+    Returns:
+        id de la ejecución, o None si ya estaba en la base de datos
+    """
+    calibracion = os.path.splitext(os.path.basename(path_calibracion))[0] if path_calibracion else None
+    conexion = conectar(path)
+    try:
+        return insertar_resultados(conexion, resultados, backend, calibracion, origen)
+    finally:
+        conexion.close()
+
+
+def precision_por_caso(conexion, n=None):
+    """
+    Precisión por backend, tipo de oráculo y oracle_case.
+
+    Args:
+        conexion: conexión de conectar
+        n: limitar a n qubits (None: todos)
+
+    Returns:
+        lista de tuplas (backend, n, oracle_type, oracle_case, pruebas, precision)
+    """
+    return conexion.execute(
+        "SELECT backend, n, oracle_type, oracle_case, COUNT(*), AVG(correct) FROM trials "
+        "WHERE (? IS NULL OR n = ?) "
+        "GROUP BY backend, n, oracle_type, oracle_case ORDER BY n, oracle_type, oracle_case, backend",
+        (n, n)
+    ).fetchall()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Base de datos de experimentos Deutsch-Jozsa")
+    parser.add_argument("--base", default=PATH_BASE, help="fichero SQLite")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("ingerir", help="ingerir JSON de resultados o CSV de barridos de ruido")
+    p.add_argument("ficheros", nargs="+")
+    p.add_argument("--backend", help="backend de los JSON (por defecto según el nombre del fichero)")
+    p.add_argument("--calibracion", help="snapshot de calibración de los JSON")
+    p = sub.add_parser("casos", help="precisión por oracle_case y backend")
+    p.add_argument("--n", type=int)
+    args = parser.parse_args()
+
+    conexion = conectar(args.base)
+    if args.comando == "ingerir":
+        for fichero in args.ficheros:
+            run_id = ingerir(conexion, fichero, args.backend, args.calibracion)
+            print(f"{fichero}: " + (f"ejecución {run_id}" if run_id is not None else "ya estaba en la base de datos"))
+    else:
+        print(f"{'Backend':<10} | {'n':>2} | {'Tipo':<8} | {'Caso':>4} | {'Pruebas':>7} | {'Precisión':>9}")
+        for backend, n, oracle_type, oracle_case, pruebas, precision in precision_por_caso(conexion, args.n):
+            print(f"{backend:<10} | {n:>2} | {oracle_type:<8} | {oracle_case:>4} | {pruebas:>7} | {precision:>9.2%}")
+    conexion.close()
@@ -0,0 +1,319 @@
+import json
+import sys
+from statistics import NormalDist
+
+import numpy as np
+
+# Celdas de la tabla de contingencia de las pruebas
+CONSTANTE_ACIERTO, CONSTANTE_FALLO, BALANCEADA_ACIERTO, BALANCEADA_FALLO = range(4)
+
+# Remuestreos por bloque en bootstrap_media, para acotar la memoria a ~bloque*len(valores)
+BLOQUE_REMUESTREOS = 2000
+
+
+def columnas_pruebas(pruebas):
+    """
+    Extrae de la lista "pruebas" de un fichero de resultados las columnas por prueba.
+
+    Args:
+        pruebas: lista de diccionarios con "tipo" ("constant"/"balanced") y "correct"
+
+    Returns:
+        tupla (es_constante, correcto) de arrays booleanos
+    """
+    es_constante = np.fromiter((p["tipo"] == "constant" for p in pruebas), dtype=bool, count=len(pruebas))
+    correcto = np.fromiter((bool(p["correct"]) for p in pruebas), dtype=bool, count=len(pruebas))
+    return es_constante, correcto
+
+
+def tabla_contingencia(es_constante, correcto):
+    """Cuenta las pruebas de cada celda: [constante bien, constante mal, balanceada bien, balanceada mal]."""
+    celda = np.where(es_constante, 0, 2) + np.where(correcto, 0, 1)
+    return np.bincount(celda, minlength=4)
+
+
+def _cociente(numerador, denominador):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominador > 0, numerador / np.maximum(denominador, 1), np.nan)
+
+
+def metricas(conteos):
+    """
+    Calcula las métricas de clasificación a partir de una o muchas tablas de contingencia.
+
+    "precision" y "recall" siguen la definición de los ficheros de resultados
+    (aciertos entre las pruebas de cada tipo), así que coinciden por tipo;
+    "valor_predictivo" es la fracción de las pruebas clasificadas como un tipo
+    que realmente lo eran.
+
+    Args:
+        conteos: array (..., 4) de tablas de contingencia
+
+    Returns:
+        diccionario con arrays de forma conteos.shape[:-1]
+    """
+    conteos = np.asarray(conteos)
+    cc, cb, bb, bc = (conteos[..., k] for k in range(4))
+    precision_constant = _cociente(cc, cc + cb)
+    precision_balanced = _cociente(bb, bb + bc)
+    return {
+        "precision": {
+            "constant": precision_constant,
+            "balanced": precision_balanced,
+            "total": _cociente(cc + bb, cc + cb + bb + bc)
+        },
+        "recall": {
+            "constant": precision_constant,
+            "balanced": precision_balanced
+        },
+        "valor_predictivo": {
+            # Clasificada como constante: constantes acertadas + balanceadas falladas
+            "constant": _cociente(cc, cc + bc),
+            "balanced": _cociente(bb, bb + cb)
+        }
+    }
+
+
+def _intervalo(valor, remuestras, confianza):
+    alfa = (1 - confianza) / 2
+    inferior, superior = np.nanquantile(remuestras, [alfa, 1 - alfa], axis=-1)
+    return {"valor": float(valor), "inferior": float(inferior), "superior": float(superior)}
+
+
+def bootstrap_pruebas(pruebas, num_remuestreos=100000, confianza=0.95, semilla=None):
+    """
+    Intervalos bootstrap (percentil) de precisión, recall, valor predictivo y precisión total.
+
+    Como cada prueba sólo puede caer en una de las cuatro celdas de la tabla
+    de contingencia, remuestrear las pruebas con reemplazo equivale a sacar
+    las cuatro cuentas de una multinomial, lo que permite generar los
+    10^5 remuestreos en una sola llamada vectorizada.
+
+    Args:
+        pruebas: lista "pruebas" de un fichero de resultados
+        num_remuestreos: número de remuestreos bootstrap
+        confianza: nivel de confianza del intervalo
+        semilla: semilla del generador
+
+    Returns:
+        diccionario con la estructura de metricas() y, en cada hoja,
+        {"valor", "inferior", "superior"}
+    """
+    conteos = tabla_contingencia(*columnas_pruebas(pruebas))
+    rng = np.random.default_rng(semilla)
+    remuestras = rng.multinomial(conteos.sum(), conteos / conteos.sum(), size=num_remuestreos)
+
+    puntual = metricas(conteos)
+    bootstrap = metricas(remuestras)
+    return {
+        grupo: {tipo: _intervalo(puntual[grupo][tipo], bootstrap[grupo][tipo], confianza) for tipo in puntual[grupo]}
+        for grupo in puntual
+    }
+
+
+def intervalo_binomial(aciertos, total, confianza=0.95):
+    """
+    Intervalo exacto de Clopper-Pearson para una proporción (vectorizado).
+
+    Args:
+        aciertos: número de aciertos (escalar o array)
+        total: número de pruebas (escalar o array)
+        confianza: nivel de confianza
+
+    Returns:
+        tupla (inferior, superior)
+    """
+    from scipy.stats import beta
+
+    aciertos = np.asarray(aciertos, dtype=float)
+    total = np.asarray(total, dtype=float)
+    alfa = 1 - confianza
+    with np.errstate(invalid='ignore'):
+        inferior = np.where(aciertos > 0, beta.ppf(alfa / 2, aciertos, total - aciertos + 1), 0.0)
+        superior = np.where(aciertos < total, beta.ppf(1 - alfa / 2, aciertos + 1, total - aciertos), 1.0)
+    return inferior, superior
+
+
+def intervalo_wilson(aciertos, total, confianza=0.95):
+    """
+    Intervalo de Wilson para una proporción: forma cerrada, sin scipy, para
+    actualizarlo en cada prueba (ver seguimiento.py).
+
+    Args:
+        aciertos: número de aciertos (escalar o array)
+        total: número de pruebas (escalar o array, > 0)
+        confianza: nivel de confianza
+
+    Returns:
+        tupla (inferior, superior)
+    """
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    aciertos = np.asarray(aciertos, dtype=float)
+    total = np.asarray(total, dtype=float)
+    p = aciertos / total
+    centro = (p + z * z / (2 * total)) / (1 + z * z / total)
+    semiamplitud = z / (1 + z * z / total) * np.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+    return centro - semiamplitud, centro + semiamplitud
+
+
+def pruebas_necesarias(semiamplitud, confianza=0.95):
+    """
+    Número de pruebas con el que el intervalo de Wilson tiene como mucho la
+    semiamplitud pedida sea cual sea la precisión. La anchura es máxima con
+    una precisión de 0.5, donde la semiamplitud vale z / (2·sqrt(total + z²)).
+
+    Args:
+        semiamplitud: semiamplitud máxima del intervalo (p.ej. 0.02)
+        confianza: nivel de confianza
+
+    Returns:
+        número de pruebas (entero >= 1)
+    """
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    return max(1, int(np.ceil(z * z / (4 * semiamplitud * semiamplitud) - z * z)))
+
+
+def intervalos_binomiales(pruebas, confianza=0.95):
+    """
+    Camino rápido sin remuestreo: intervalos exactos de Clopper-Pearson con la
+    misma estructura que bootstrap_pruebas.
+
+    Args:
+        pruebas: lista "pruebas" de un fichero de resultados
+        confianza: nivel de confianza
+
+    Returns:
+        diccionario grupo -> tipo -> {"valor", "inferior", "superior"}
+    """
+    cc, cb, bb, bc = tabla_contingencia(*columnas_pruebas(pruebas))
+    proporciones = {
+        "precision": {"constant": (cc, cc + cb), "balanced": (bb, bb + bc), "total": (cc + bb, cc + cb + bb + bc)},
+        "recall": {"constant": (cc, cc + cb), "balanced": (bb, bb + bc)},
+        "valor_predictivo": {"constant": (cc, cc + bc), "balanced": (bb, bb + cb)}
+    }
+
+    resultado = {}
+    for grupo, tipos in proporciones.items():
+        resultado[grupo] = {}
+        for tipo, (aciertos, total) in tipos.items():
+            inferior, superior = intervalo_binomial(aciertos, total, confianza)
+            resultado[grupo][tipo] = {
+                "valor": float(aciertos / total) if total > 0 else float("nan"),
+                "inferior": float(inferior),
+                "superior": float(superior)
+            }
+    return resultado
+
+
+def bootstrap_proporcion(aciertos, total, num_remuestreos=100000, confianza=0.95, semilla=None):
+    """
+    Intervalos bootstrap de muchas proporciones a la vez, p.ej. la precisión
+    de cada nivel de un barrido de ruido a partir de los aciertos acumulados.
+
+    Args:
+        aciertos: array (L,) de aciertos por celda
+        total: array (L,) de pruebas por celda
+        num_remuestreos: número de remuestreos
+        confianza: nivel de confianza
+        semilla: semilla del generador
+
+    Returns:
+        tupla (valor, inferior, superior) de arrays (L,)
+    """
+    aciertos = np.asarray(aciertos)
+    total = np.asarray(total)
+    valor = _cociente(aciertos, total)
+    rng = np.random.default_rng(semilla)
+    remuestras = rng.binomial(total[:, None], np.nan_to_num(valor)[:, None], size=(len(total), num_remuestreos)) / np.maximum(total, 1)[:, None]
+    alfa = (1 - confianza) / 2
+    inferior, superior = np.quantile(remuestras, [alfa, 1 - alfa], axis=-1)
+    return valor, inferior, superior
+
+
+def bootstrap_media(valores, num_remuestreos=100000, confianza=0.95, semilla=None):
+    """
+    Intervalo bootstrap de la media de valores arbitrarios (p.ej. la precisión
+    de cada run de un barrido). Los índices se generan por bloques de
+    BLOQUE_REMUESTREOS remuestreos para no reservar una matriz de
+    num_remuestreos x len(valores) de una vez.
+
+    Args:
+        valores: array (T,) o (L, T); en el segundo caso un intervalo por fila
+        num_remuestreos: número de remuestreos
+        confianza: nivel de confianza
+        semilla: semilla del generador
+
+    Returns:
+        tupla (media, inferior, superior)
+    """
+    valores = np.atleast_2d(np.asarray(valores, dtype=float))
+    filas, t = valores.shape
+    rng = np.random.default_rng(semilla)
+
+    medias = np.empty((filas, num_remuestreos))
+    for inicio in range(0, num_remuestreos, BLOQUE_REMUESTREOS):
+        fin = min(inicio + BLOQUE_REMUESTREOS, num_remuestreos)
+        indices = rng.integers(0, t, size=(fin - inicio, t))
+        medias[:, inicio:fin] = valores[:, indices].mean(axis=-1)
+
+    alfa = (1 - confianza) / 2
+    inferior, superior = np.quantile(medias, [alfa, 1 - alfa], axis=-1)
+    media = valores.mean(axis=-1)
+    if filas == 1:
+        return float(media[0]), float(inferior[0]), float(superior[0])
+    return media, inferior, superior
+
+
+def comparar(pruebas_a, pruebas_b, num_remuestreos=100000, confianza=0.95, semilla=None):
+    """
+    Intervalo bootstrap de la diferencia de precisión total entre dos
+    experimentos independientes (p.ej. 2 qubits frente a 4 qubits).
+
+    Args:
+        pruebas_a: pruebas del primer experimento
+        pruebas_b: pruebas del segundo experimento
+        num_remuestreos: número de remuestreos
+        confianza: nivel de confianza
+        semilla: semilla del generador
+
+    Returns:
+        diccionario {"valor", "inferior", "superior"} de precision_a - precision_b
+    """
+    rng = np.random.default_rng(semilla)
+    _, correcto_a = columnas_pruebas(pruebas_a)
+    _, correcto_b = columnas_pruebas(pruebas_b)
+    precision_a, precision_b = correcto_a.mean(), correcto_b.mean()
+    diferencias = (rng.binomial(len(correcto_a), precision_a, num_remuestreos) / len(correcto_a)
+                   - rng.binomial(len(correcto_b), precision_b, num_remuestreos) / len(correcto_b))
+    return _intervalo(precision_a - precision_b, diferencias, confianza)
+
+
+if __name__ == "__main__":
+    # Uso: python intervalos.py resultados.json [otros.json ...]
+    import os
+    import time
+
+    todas = []
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            pruebas = json.load(f)["pruebas"]
+        todas.append((os.path.basename(path), pruebas))
+
+        inicio = time.perf_counter()
+        bootstrap = bootstrap_pruebas(pruebas)
+        duracion = time.perf_counter() - inicio
+        exactos = intervalos_binomiales(pruebas)
+
+        print(f"\n{os.path.basename(path)} ({len(pruebas)} pruebas, bootstrap 10^5 remuestreos en {duracion*1e3:.0f} ms)")
+        print(f"  {'Métrica':<26} | {'Valor':>7} | {'Bootstrap 95%':>17} | {'Clopper-Pearson 95%':>19}")
+        for grupo in ("precision", "valor_predictivo"):
+            for tipo, intervalo in bootstrap[grupo].items():
+                exacto = exactos[grupo][tipo]
+                print(f"  {grupo + ' ' + tipo:<26} | {intervalo['valor']:>7.2%} | "
+                      f"[{intervalo['inferior']:.2%}, {intervalo['superior']:.2%}] | "
+                      f"[{exacto['inferior']:.2%}, {exacto['superior']:.2%}]")
+
+    for (nombre_a, pruebas_a), (nombre_b, pruebas_b) in zip(todas, todas[1:]):
+        diferencia = comparar(pruebas_a, pruebas_b)
+        print(f"\nPrecisión total {nombre_a} - {nombre_b}: {diferencia['valor']:+.2%} "
+              f"[{diferencia['inferior']:+.2%}, {diferencia['superior']:+.2%}]")
@@ -0,0 +1,250 @@
+import json
+import sys
+
+import numpy as np
+from qiskit import QuantumCircuit
+
+
+def matrices_desde_calibracion(calibracion, qubits):
+    """
+    Construye las matrices de asignación de lectura a partir de la calibración.
+
+    La calibración de Qmio sólo da una fidelidad de lectura por qubit, así que
+    se supone un error simétrico: A = [[F, 1-F], [1-F, F]].
+
+    Args:
+        calibracion: estructura devuelta por calibracion.cargar_calibracion
+        qubits: qubits físicos medidos, en el orden de los bits clásicos
+
+    Returns:
+        array (len(qubits), 2, 2) con A[q][medido, preparado]
+    """
+    fidelidad = np.clip(calibracion["fidelidad_lectura"][list(qubits)], 0.5, 1.0)
+    fidelidad = np.where(np.isnan(fidelidad), 1.0, fidelidad)
+    matrices = np.empty((len(fidelidad), 2, 2))
+    matrices[:, 0, 0] = matrices[:, 1, 1] = fidelidad
+    matrices[:, 0, 1] = matrices[:, 1, 0] = 1 - fidelidad
+    return matrices
+
+
+def qubits_medidos(circuito):
+    """
+    Qubit físico medido en cada bit clásico de un circuito transpilado. El
+    routing puede mover los qubits lógicos con SWAPs, así que no tienen por
+    qué coincidir con el layout inicial.
+
+    Args:
+        circuito: QuantumCircuit transpilado (qubits = qubits físicos)
+
+    Returns:
+        lista con el qubit físico de cada bit clásico (None si no se mide)
+    """
+    medidos = [None] * circuito.num_clbits
+    for instruccion in circuito.data:
+        if instruccion.operation.name == "measure":
+            medidos[circuito.find_bit(instruccion.clbits[0]).index] = circuito.find_bit(instruccion.qubits[0]).index
+    return medidos
+
+
+def matrices_por_prueba(calibracion, qubits_por_prueba):
+    """
+    Matrices de asignación para pruebas medidas en qubits físicos distintos.
+
+    Args:
+        calibracion: estructura devuelta por calibracion.cargar_calibracion
+        qubits_por_prueba: qubits físicos medidos en cada prueba, en el orden de sus bits
+
+    Returns:
+        tupla (matrices, grupos) para estadisticas_mitigadas: matrices (k, n, 2, 2)
+        de los k conjuntos distintos de qubits y el índice del conjunto de cada prueba
+    """
+    conjuntos = {}
+    grupos = [conjuntos.setdefault(tuple(qubits), len(conjuntos)) for qubits in qubits_por_prueba]
+    matrices = np.array([matrices_desde_calibracion(calibracion, qubits) for qubits in conjuntos])
+    return matrices, grupos
+
+
+def circuitos_calibracion_lectura(n):
+    """
+    Genera los dos circuitos de calibración tensorial: todos los qubits en |0>
+    y todos en |1>.
+
+    Args:
+        n: número de qubits medidos
+
+    Returns:
+        lista [circuito_ceros, circuito_unos]
+    """
+    circuitos = []
+    for estado in (0, 1):
+        circuit = QuantumCircuit(n, n)
+        if estado == 1:
+            circuit.x(range(n))
+        circuit.measure(range(n), range(n))
+        circuitos.append(circuit)
+    return circuitos
+
+
+def matrices_desde_counts(counts_ceros, counts_unos, n):
+    """
+    Estima las matrices de asignación a partir de los resultados de
+    circuitos_calibracion_lectura.
+
+    Args:
+        counts_ceros: counts del circuito con todos los qubits en |0>
+        counts_unos: counts del circuito con todos los qubits en |1>
+        n: número de qubits medidos
+
+    Returns:
+        array (n, 2, 2) con A[q][medido, preparado]
+    """
+    matrices = np.zeros((n, 2, 2))
+    for preparado, counts in ((0, counts_ceros), (1, counts_unos)):
+        bits, pesos = _counts_a_arrays(counts, n)
+        total = pesos.sum()
+        for q in range(n):
+            unos = pesos[((bits >> q) & 1) == 1].sum() / total
+            matrices[q, 1, preparado] = unos
+            matrices[q, 0, preparado] = 1 - unos
+    return matrices
+
+
+def _counts_a_arrays(counts, n):
+    claves = list(counts.keys())
+    bits = np.array([int(k.replace(" ", ""), 2) for k in claves], dtype=np.int64)
+    pesos = np.array([counts[k] for k in claves], dtype=float)
+    return bits, pesos
+
+
+def matriz_probabilidades(lista_counts, n):
+    """
+    Convierte los counts de todas las pruebas en una matriz de probabilidades.
+
+    Args:
+        lista_counts: lista de diccionarios de counts (uno por prueba)
+        n: número de bits medidos
+
+    Returns:
+        array (num_pruebas, 2**n); la columna k es el resultado int(bitstring, 2)
+    """
+    filas = []
+    columnas = []
+    valores = []
+    for i, counts in enumerate(lista_counts):
+        bits, pesos = _counts_a_arrays(counts, n)
+        filas.append(np.full(len(bits), i))
+        columnas.append(bits)
+        valores.append(pesos / pesos.sum())
+
+    probabilidades = np.zeros((len(lista_counts), 2**n))
+    if filas:
+        np.add.at(probabilidades, (np.concatenate(filas), np.concatenate(columnas)), np.concatenate(valores))
+    return probabilidades
+
+
+def corregir_probabilidades(probabilidades, matrices):
+    """
+    Aplica la inversa tensorial de las matrices de asignación a todas las
+    pruebas a la vez.
+
+    Args:
+        probabilidades: array (num_pruebas, 2**n) de matriz_probabilidades
+        matrices: array (n, 2, 2) de matrices de asignación
+
+    Returns:
+        array (num_pruebas, 2**n) de cuasi-probabilidades corregidas
+        (pueden tener componentes negativas)
+    """
+    n = len(matrices)
+    inversas = np.linalg.inv(matrices)
+    tensor = probabilidades.reshape((probabilidades.shape[0],) + (2,) * n)
+
+    # El bit q del índice corresponde al eje n-q (el eje 0 recorre las pruebas)
+    for q in range(n):
+        eje = n - q
+        tensor = np.moveaxis(np.tensordot(inversas[q], tensor, axes=([1], [eje])), 0, eje)
+
+    return tensor.reshape(probabilidades.shape)
+
+
+def estadisticas_mitigadas(pruebas, n, matrices, grupos=None):
+    """
+    Calcula la precisión corregida de lectura de una lista de pruebas.
+
+    Cada prueba aporta la probabilidad corregida de su resultado correcto
+    (P(0...0) si es constante, 1 - P(0...0) si es balanceada), de modo que la
+    media estima la precisión que se obtendría sin errores de lectura. Además
+    se reclasifica cada prueba con la regla "P(0...0) > 0.5".
+
+    Args:
+        pruebas: lista de registros con "counts" y "tipo"
+        n: número de qubits medidos
+        matrices: array (n, 2, 2) de matrices de asignación, o (k, n, 2, 2)
+            si las pruebas se midieron en k grupos de qubits distintos
+        grupos: índice del grupo de cada prueba (sólo con matrices por grupo)
+
+    Returns:
+        diccionario con "precision" y "aciertos_reclasificados" por tipo
+    """
+    tipos = np.array([p["tipo"] for p in pruebas])
+    probabilidades = matriz_probabilidades([p["counts"] for p in pruebas], n)
+    if grupos is None:
+        corregidas = corregir_probabilidades(probabilidades, matrices)
+    else:
+        # Multiprogramación: cada grupo de qubits físicos tiene sus propias matrices
+        grupos = np.asarray(grupos)
+        corregidas = np.empty_like(probabilidades)
+        for g, matrices_grupo in enumerate(matrices):
+            mascara = grupos == g
+            corregidas[mascara] = corregir_probabilidades(probabilidades[mascara], matrices_grupo)
+    # Sin recortar por prueba: la media de las cuasi-probabilidades es insesgada
+    prob_ceros = corregidas[:, 0]
+
+    es_constante = tipos == "constant"
+    prob_correcta = np.where(es_constante, prob_ceros, 1.0 - prob_ceros)
+    acierto_reclasificado = np.where(es_constante, prob_ceros > 0.5, prob_ceros <= 0.5)
+
+    precision = {}
+    aciertos = {}
+    for tipo, mascara in (("constant", es_constante), ("balanced", ~es_constante)):
+        precision[tipo] = float(np.clip(prob_correcta[mascara].mean(), 0, 1)) if mascara.any() else 0
+        aciertos[tipo] = int(acierto_reclasificado[mascara].sum())
+    precision["total"] = float(np.clip(prob_correcta.mean(), 0, 1)) if len(pruebas) > 0 else 0
+    aciertos["total"] = int(acierto_reclasificado.sum())
+
+    return {
+        "precision": precision,
+        "aciertos_reclasificados": aciertos
+    }
+
+
+if __name__ == "__main__":
+    # Uso: python mitigacion.py resultados.json calibracion.json [q0 q1 ... ancilla]
+    import os
+    from calibracion import cargar_calibracion
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        resultados = json.load(f)
+
+    pruebas = resultados["pruebas"]
+    n = len(next(iter(pruebas[0]["counts"])))
+    if len(sys.argv) > 3:
+        layout = [int(q) for q in sys.argv[3:]]
+    else:
+        layout = resultados["configuracion"]["qubit_layout"]
+
+    calibracion = cargar_calibracion(sys.argv[2])
+    if len(sys.argv) <= 3 and all("qubits_medidos" in p for p in pruebas):
+        # Qubits medidos de cada prueba tras el routing
+        matrices, grupos = matrices_por_prueba(calibracion, [p["qubits_medidos"] for p in pruebas])
+        mitigadas = estadisticas_mitigadas(pruebas, n, matrices, grupos)
+    else:
+        mitigadas = estadisticas_mitigadas(pruebas, n, matrices_desde_calibracion(calibracion, layout[:n]))
+
+    print(f"Resultados: {os.path.basename(sys.argv[1])} ({n} qubits, layout {layout})")
+    for tipo in ("constant", "balanced"):
+        del_tipo = [p for p in pruebas if p["tipo"] == tipo]
+        cruda = sum(p["correct"] for p in del_tipo) / len(del_tipo) if del_tipo else 0
+        print(f"  {tipo:<9}: cruda {cruda:.2%}  mitigada {mitigadas['precision'][tipo]:.2%}")
+    cruda_total = sum(p["correct"] for p in pruebas) / len(pruebas)
+    print(f"  total    : cruda {cruda_total:.2%}  mitigada {mitigadas['precision']['total']:.2%}")
@@ -0,0 +1,275 @@
+"""
+Multiprogramación: varias pruebas DJ independientes en un mismo trabajo.
+
+Espacial: cada prueba usa n+1 de los 32 qubits de Qmio.
+calibracion.seleccionar_grupos elige k grupos disjuntos de qubits bien
+calibrados y componer_circuitos junta k circuitos DJ (cada uno con su
+oráculo) en un circuito ancho.
+
+Temporal: encadenar_circuitos ejecuta m pruebas una detrás de otra sobre los
+mismos qubits, con medida a mitad de circuito en un registro clásico por
+prueba y reset de todos los qubits entre pruebas. precision_por_posicion
+mide cuánto empeora la precisión con la posición en la cadena.
+
+Ambas se combinan (k cadenas de m pruebas en paralelo). En todos los casos
+separar_conteos reparte los resultados medidos en diccionarios de counts,
+uno por prueba, con el mismo formato que si cada prueba se hubiera
+ejecutado sola.
+"""
+import random
+
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+
+from intervalos import intervalo_binomial
+
+
+def componer_circuitos(circuitos):
+    """
+    Junta circuitos independientes en uno ancho, uno a continuación de otro
+    en qubits y en bits clásicos: con circuitos iguales de q qubits y c bits,
+    el circuito j ocupa los qubits [j·q, (j+1)·q) y los bits [j·c, (j+1)·c).
+
+    Args:
+        circuitos: lista de QuantumCircuit
+
+    Returns:
+        QuantumCircuit con la suma de qubits y de bits clásicos
+    """
+    ancho = QuantumCircuit(sum(c.num_qubits for c in circuitos), sum(c.num_clbits for c in circuitos))
+    primer_qubit = primer_clbit = 0
+    for circuito in circuitos:
+        ancho.compose(
+            circuito,
+            qubits=range(primer_qubit, primer_qubit + circuito.num_qubits),
+            clbits=range(primer_clbit, primer_clbit + circuito.num_clbits),
+            inplace=True
+        )
+        primer_qubit += circuito.num_qubits
+        primer_clbit += circuito.num_clbits
+    return ancho
+
+
+def encadenar_circuitos(circuitos):
+    """
+    Ejecuta circuitos uno detrás de otro sobre los mismos qubits. Cada
+    circuito mide en su propio registro clásico ("p0", "p1", ...) y entre
+    circuitos se hace reset de todos los qubits, así que cada prueba empieza
+    en |0...0> como si se ejecutara sola.
+
+    Args:
+        circuitos: lista de QuantumCircuit con el mismo número de qubits y bits
+
+    Returns:
+        QuantumCircuit con q qubits y len(circuitos)·c bits; los bits de la
+        prueba j son [j·c, (j+1)·c)
+    """
+    num_qubits = circuitos[0].num_qubits
+    registros = [ClassicalRegister(circuito.num_clbits, f"p{j}") for j, circuito in enumerate(circuitos)]
+    cadena = QuantumCircuit(QuantumRegister(num_qubits, "q"), *registros)
+    for j, circuito in enumerate(circuitos):
+        if j > 0:
+            cadena.reset(range(num_qubits))
+        cadena.compose(circuito, qubits=range(num_qubits), clbits=registros[j], inplace=True)
+    return cadena
+
+
+def layout_compuesto(grupos):
+    """
+    Layout físico del circuito compuesto.
+
+    Args:
+        grupos: lista de layouts [entradas..., ancilla] (uno por circuito)
+
+    Returns:
+        lista para transpile(initial_layout=...)
+    """
+    return [q for layout in grupos for q in layout]
+
+
+def separar_conteos(counts, k, n):
+    """
+    Reparte los counts de un circuito compuesto o encadenado entre los k
+    circuitos que lo forman (en el orden de sus bits clásicos).
+
+    En Qiskit el bit clásico 0 es el último carácter de la cadena, así que el
+    circuito j ocupa los caracteres [len - (j+1)·n, len - j·n); los espacios
+    entre registros se ignoran.
+
+    Args:
+        counts: counts del circuito compuesto
+        k: número de circuitos compuestos
+        n: bits medidos por circuito
+
+    Returns:
+        lista de k diccionarios de counts
+    """
+    separados = [{} for _ in range(k)]
+    for clave, veces in counts.items():
+        bits = clave.replace(" ", "")
+        for j in range(k):
+            parte = bits[len(bits) - (j + 1) * n:len(bits) - j * n]
+            separados[j][parte] = separados[j].get(parte, 0) + veces
+    return separados
+
+
+def _precision_por(pruebas, campo, confianza):
+    por_valor = {}
+    for prueba in pruebas:
+        aciertos, total = por_valor.get(prueba[campo], (0, 0))
+        por_valor[prueba[campo]] = (aciertos + bool(prueba["correct"]), total + 1)
+
+    resultado = []
+    for valor in sorted(por_valor):
+        aciertos, total = por_valor[valor]
+        inferior, superior = intervalo_binomial(aciertos, total, confianza)
+        resultado.append({
+            campo: valor,
+            "aciertos": aciertos,
+            "total": total,
+            "precision": aciertos / total,
+            "inferior": float(inferior),
+            "superior": float(superior)
+        })
+    return resultado
+
+
+def precision_por_posicion(pruebas, confianza=0.95):
+    """
+    Precisión de las pruebas según su posición en la cadena.
+
+    Args:
+        pruebas: registros con "posicion" y "correct"
+        confianza: nivel del intervalo de Clopper-Pearson
+
+    Returns:
+        lista ordenada por posición de diccionarios con "posicion", "aciertos",
+        "total", "precision", "inferior" y "superior"
+    """
+    return _precision_por(pruebas, "posicion", confianza)
+
+
+def precision_por_grupo(pruebas, grupos, confianza=0.95):
+    """
+    Precisión de las pruebas según el grupo de qubits en el que se ejecutaron,
+    para ver si los grupos peor puntuados bajan la precisión total.
+
+    Args:
+        pruebas: registros con "grupo" y "correct"
+        grupos: lista de (layout, puntuacion) de calibracion.seleccionar_grupos
+        confianza: nivel del intervalo de Clopper-Pearson
+
+    Returns:
+        lista ordenada por grupo de diccionarios con "grupo", "qubit_layout",
+        "puntuacion_layout", "aciertos", "total", "precision", "inferior" y "superior"
+    """
+    resultado = _precision_por(pruebas, "grupo", confianza)
+    for punto in resultado:
+        layout, puntuacion = grupos[punto["grupo"]]
+        punto["qubit_layout"] = layout
+        punto["puntuacion_layout"] = puntuacion
+    return resultado
+
+
+def elegir_longitud(por_posicion, tolerancia=0.02):
+    """
+    Longitud de cadena más larga cuyas posiciones no pierden más de
+    `tolerancia` de precisión respecto a la primera: a partir de ahí cada
+    prueba más por trabajo sale peor que una prueba en un trabajo nuevo.
+
+    Args:
+        por_posicion: resultado de precision_por_posicion
+        tolerancia: pérdida de precisión admitida respecto a la posición 0
+
+    Returns:
+        número de pruebas por cadena (al menos 1)
+    """
+    referencia = por_posicion[0]["precision"]
+    longitud = 1
+    for punto in por_posicion[1:]:
+        if punto["precision"] < referencia - tolerancia:
+            break
+        longitud += 1
+    return longitud
+
+
+def simular_cadenas(deutsch_jozsa_circuit, n, longitud, num_trabajos, path_calibracion, shots=1, semilla=0):
+    """
+    Ejecuta cadenas de pruebas DJ aleatorias (1/6 constantes, como en los
+    experimentos de 4 qubits) en el backend local (FakeQmio, o Aer con el
+    ruido de la calibración) para medir la precisión por posición.
+
+    Args:
+        deutsch_jozsa_circuit: función (n, oracle_type, oracle_case) -> circuito con n bits medidos
+        n: número de qubits de entrada
+        longitud: pruebas por cadena
+        num_trabajos: número de cadenas
+        path_calibracion: JSON de calibración de Qmio
+        shots: shots por trabajo
+        semilla: semilla de los oráculos, la transpilación y la simulación
+
+    Returns:
+        lista de registros de prueba con "tipo", "oracle_case", "counts",
+        "correct", "trabajo" y "posicion"
+    """
+    from backends import obtener_backend
+    from calibracion import seleccionar_layout
+    from transpilacion import transpilar
+
+    simulador, opciones_transpile = obtener_backend("local", path_calibracion)
+    layout, _ = seleccionar_layout(path_calibracion, n, opciones_transpile.get("coupling_map") or simulador.coupling_map)
+    generador = random.Random(semilla)
+
+    lotes = []
+    for _ in range(num_trabajos):
+        casos = []
+        for _ in range(longitud):
+            if generador.random() < 1 / 6:
+                casos.append(("constant", generador.randint(0, 1)))
+            else:
+                casos.append(("balanced", generador.randint(1, 2**n - 1)))
+        lotes.append(casos)
+
+    # Todas las cadenas en un solo run: Aer tiene un coste fijo por llamada con el modelo de ruido completo
+    cadenas = [encadenar_circuitos([deutsch_jozsa_circuit(n, tipo, caso) for tipo, caso in casos]) for casos in lotes]
+    transpilados = transpilar(cadenas, layout, seed_transpiler=semilla, **opciones_transpile)
+    resultado = simulador.run(transpilados, shots=shots, seed_simulator=semilla).result()
+
+    pruebas = []
+    for trabajo, casos in enumerate(lotes):
+        counts = resultado.get_counts(trabajo)
+        for posicion, ((tipo, caso), counts_prueba) in enumerate(zip(casos, separar_conteos(counts, longitud, n))):
+            ceros = counts_prueba.get('0' * n, 0) / shots
+            pruebas.append({
+                "tipo": tipo,
+                "oracle_case": caso,
+                "counts": counts_prueba,
+                "correct": (ceros > 0.5) == (tipo == "constant"),
+                "trabajo": trabajo + 1,
+                "posicion": posicion
+            })
+    return pruebas
+
+
+if __name__ == "__main__":
+    # Uso: python multiprograma.py [longitud] [num_trabajos]
+    import os
+    import sys
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    n = 4
+    longitud = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    num_trabajos = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    path_calibracion = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cesga", "2025_04_23__12_00_02.json")
+
+    pruebas = simular_cadenas(deutsch_jozsa_circuit, n, longitud, num_trabajos, path_calibracion)
+    por_posicion = precision_por_posicion(pruebas)
+
+    print(f"Cadenas de {longitud} pruebas (n = {n}, {num_trabajos} trabajos)")
+    print(f"{'Posición':>8} | {'Precisión':>9} | {'IC 95%':>17}")
+    for punto in por_posicion:
+        print(f"{punto['posicion']:>8} | {punto['precision']:>9.2%} | [{punto['inferior']:.2%}, {punto['superior']:.2%}]")
+
+    acumulada = np.cumsum([punto["precision"] for punto in por_posicion])
+    print(f"\nAciertos esperados por trabajo: " + ", ".join(f"m={m} {a:.2f}" for m, a in enumerate(acumulada, 1)))
+    print(f"Longitud recomendada (pérdida <= 2 puntos): {elegir_longitud(por_posicion)}")
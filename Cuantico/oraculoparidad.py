@@ -0,0 +1,125 @@
+import os
+import sys
+
+import numpy as np
+
+# "lineal": una CNOT de cada entrada activa al auxiliar (profundidad k)
+# "arbol": paridad de las entradas activas en un árbol XOR sobre las propias
+#          entradas, una CNOT al auxiliar y descomputación (profundidad 2·ceil(log2 k) + 1)
+MODOS_ORACULO = ("lineal", "arbol")
+
+
+def capas_arbol(activos):
+    """
+    Capas de CNOT de un árbol XOR que deja la paridad de `activos` en activos[0].
+
+    Args:
+        activos: qubits cuya paridad se calcula
+
+    Returns:
+        lista de capas; cada capa es una lista de pares (control, target) disjuntos
+    """
+    nodos = list(activos)
+    capas = []
+    while len(nodos) > 1:
+        capas.append([(nodos[j + 1], nodos[j]) for j in range(0, len(nodos) - 1, 2)])
+        nodos = nodos[::2]
+    return capas
+
+
+def aplicar_oraculo_balanceado(circuit, n, oracle_case, modo="lineal"):
+    """
+    Aplica el oráculo balanceado f(x) = paridad de los bits de x marcados en
+    oracle_case, con el auxiliar en el qubit n.
+
+    Args:
+        circuit: QuantumCircuit con al menos n+1 qubits
+        n: número de qubits de entrada
+        oracle_case: máscara de las entradas que intervienen en la paridad
+        modo: "lineal" o "arbol" (ver MODOS_ORACULO)
+    """
+    activos = [i for i in range(n) if (oracle_case >> i) & 1]
+
+    if modo == "lineal":
+        for i in activos:
+            circuit.cx(i, n)
+    elif modo == "arbol":
+        capas = capas_arbol(activos)
+        for capa in capas:
+            for control, target in capa:
+                circuit.cx(control, target)
+        if activos:
+            circuit.cx(activos[0], n)
+        # Descomputar para devolver las entradas a su estado
+        for capa in reversed(capas):
+            for control, target in capa:
+                circuit.cx(control, target)
+    else:
+        raise ValueError(f"Modo de oráculo desconocido: {modo} (válidos: {', '.join(MODOS_ORACULO)})")
+
+
+def comparar_modos(n, path_calibracion, casos=None, shots=2000, modos=MODOS_ORACULO, semilla=0):
+    """
+    Compara los modos de oráculo tras transpilar para Qmio: profundidad,
+    número de puertas de 2 qubits y precisión simulada con el modelo de ruido
+    de la calibración.
+
+    Sin qmiotools se usa el backend "aer" de backends.obtener_backend
+    (mapa de acoplamiento y ruido de la calibración) en lugar de FakeQmio.
+
+    Args:
+        n: número de qubits de entrada
+        path_calibracion: JSON de calibración de Qmio
+        casos: oracle_case balanceados a comparar (por defecto todos si n <= 4, si no 16 al azar)
+        shots: shots por circuito en la simulación
+        modos: modos de oráculo a comparar
+        semilla: semilla de la transpilación, la simulación y la elección de casos
+
+    Returns:
+        diccionario modo -> {"profundidad", "profundidad_2q", "puertas_2q", "precision"} (medias sobre los casos)
+    """
+    from Analisismodelosruido import deutsch_jozsa_circuit
+    from backends import obtener_backend
+    from calibracion import seleccionar_layout
+    from transpilacion import transpilar
+
+    if casos is None:
+        casos = range(1, 2**n) if n <= 4 else np.random.default_rng(semilla).integers(1, 2**n, 16)
+
+    simulador, opciones_transpile = obtener_backend("local", path_calibracion)
+    layout, _ = seleccionar_layout(path_calibracion, n, opciones_transpile.get("coupling_map") or simulador.coupling_map)
+
+    comparacion = {}
+    for modo in modos:
+        circuitos = [deutsch_jozsa_circuit(n, "balanced", int(caso), modo_oraculo=modo) for caso in casos]
+        transpilados = transpilar(circuitos, layout, seed_transpiler=semilla, **opciones_transpile)
+        resultado = simulador.run(transpilados, shots=shots, seed_simulator=semilla).result()
+        medidas = []
+        for i, transpilado in enumerate(transpilados):
+            puertas_2q = sum(cantidad for puerta, cantidad in transpilado.count_ops().items() if puerta in ("ecr", "cx", "cz"))
+            counts = resultado.get_counts(i)
+            medidas.append((
+                transpilado.depth(),
+                transpilado.depth(lambda instruccion: instruccion.operation.num_qubits == 2),
+                puertas_2q,
+                1 - counts.get('0' * n, 0) / shots
+            ))
+        profundidad, profundidad_2q, puertas_2q, precision = np.mean(medidas, axis=0)
+        comparacion[modo] = {
+            "profundidad": float(profundidad),
+            "profundidad_2q": float(profundidad_2q),
+            "puertas_2q": float(puertas_2q),
+            "precision": float(precision)
+        }
+    return comparacion
+
+
+if __name__ == "__main__":
+    # Uso: python oraculoparidad.py [n ...]
+    path_calibracion = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cesga", "2025_04_23__12_00_02.json")
+    for n in [int(a) for a in sys.argv[1:]] or [2, 4, 6]:
+        print(f"\nn = {n}")
+        print(f"  {'Modo':<7} | {'Profundidad':>11} | {'Prof. 2q':>8} | {'Puertas 2q':>10} | {'Precisión':>9}")
+        for modo, datos in comparar_modos(n, path_calibracion).items():
+            print(f"  {modo:<7} | {datos['profundidad']:>11.1f} | {datos['profundidad_2q']:>8.1f} | "
+                  f"{datos['puertas_2q']:>10.1f} | {datos['precision']:>9.2%}")
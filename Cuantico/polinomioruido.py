@@ -0,0 +1,326 @@
+"""
+Precisión del DJ con ruido como polinomio exacto en el nivel de ruido.
+
+Con el modelo de build_noise_model cada puerta h, x, z y cx va seguida de un
+canal que depende del nivel de ruido, y con un solo shot la prueba acierta
+si mide todo ceros (constante) o no (balanceada). La probabilidad de acierto
+de un oracle_case es por tanto un polinomio:
+
+    despolarizante: E(ρ) = ρ + p·(D(ρ) - ρ), afín en p -> grado <= nº de puertas
+    amortiguamiento / desfase: las coherencias se multiplican por sqrt(1-γ) y
+        las poblaciones por 1-γ, así que el polinomio es en s = sqrt(1-γ)
+        (grado <= 2 por qubit afectado y puerta)
+
+coeficientes_caso propaga la matriz densidad con un polinomio en cada
+entrada (un array (grado+1, 2^(n+1), 2^(n+1))) aplicando las puertas y los
+canales exactamente, sin muestreo. Los coeficientes se guardan en la caché
+de resultados por (n, noise_type, oracle_case); la curva media de un barrido
+es la media de los coeficientes, así que una curva de 30 puntos o de 10.000
+cuesta lo mismo (una evaluación de polinomio) y nivel_umbral la invierte
+con las raíces del polinomio.
+
+La matriz densidad ocupa 16·(grado+1)·4^(n+1) bytes, así que se limita a
+n <= N_MAXIMO.
+
+    python polinomioruido.py 4
+"""
+import os
+import sys
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cacheresultados import calcular_celdas
+
+N_MAXIMO = 7
+
+PUERTAS_1Q = ("h", "x", "z")
+PUERTAS_2Q = ("cx",)
+SIN_RUIDO = ("barrier", "measure")
+
+_PAULIS = [np.eye(2), np.array([[0, 1], [1, 0]]), np.array([[0, -1j], [1j, 0]]), np.diag([1.0, -1.0])]
+
+# (n, noise_type, modo_oraculo) -> (coeficientes constantes, coeficientes balanceadas)
+_polinomios = {}
+
+
+def _en_raiz_de_complemento(noise_type):
+    # Amortiguamiento y desfase son polinomiales en s = sqrt(1-γ); el resto de
+    # tipos usan la despolarización, igual que build_noise_model
+    return noise_type in ("dephasing", "damping")
+
+
+def variable(noise_levels, noise_type):
+    """
+    Variable del polinomio para unos niveles de ruido.
+
+    Args:
+        noise_levels: nivel o array de niveles en [0, 1]
+        noise_type: "depolarizing", "dephasing" o "damping"
+
+    Returns:
+        p para la despolarización, sqrt(1-γ) para amortiguamiento y desfase
+    """
+    noise_levels = np.asarray(noise_levels, dtype=float)
+    return np.sqrt(1 - noise_levels) if _en_raiz_de_complemento(noise_type) else noise_levels
+
+
+def _ejes(q, m):
+    # Ejes de fila y de columna del qubit q (orden de Qiskit: el qubit 0 es el último eje)
+    return 1 + m - 1 - q, 1 + 2 * m - 1 - q
+
+
+def _aplicar_operador(rho, matriz, qubits, m):
+    """U ρ U† sobre `qubits` para todos los coeficientes a la vez."""
+    k = len(qubits)
+    tensor = np.asarray(matriz, dtype=complex).reshape((2,) * 2 * k)
+    filas = [_ejes(q, m)[0] for q in reversed(qubits)]
+    columnas = [_ejes(q, m)[1] for q in reversed(qubits)]
+    rho = np.moveaxis(np.tensordot(tensor, rho, axes=(list(range(k, 2 * k)), filas)), range(k), filas)
+    return np.moveaxis(np.tensordot(tensor.conj(), rho, axes=(list(range(k, 2 * k)), columnas)), range(k), columnas)
+
+
+def _indice(eje_fila, a, eje_columna, b, ndim):
+    indice = [slice(None)] * ndim
+    indice[eje_fila] = a
+    indice[eje_columna] = b
+    return tuple(indice)
+
+
+def _despolarizar(rho, grado, qubits, m):
+    """ρ + x·(D(ρ) - ρ) con D la despolarización completa de `qubits` (media de los Pauli)."""
+    activos = rho[:grado + 1]
+    despolarizado = np.zeros_like(activos)
+    for paulis in np.ndindex(*(4,) * len(qubits)):
+        matriz = _PAULIS[paulis[0]]
+        for p in paulis[1:]:
+            matriz = np.kron(_PAULIS[p], matriz)
+        despolarizado += _aplicar_operador(activos, matriz, qubits, m)
+    despolarizado /= 4 ** len(qubits)
+    rho[1:grado + 2] += despolarizado - activos
+    return grado + 1
+
+
+def _amortiguar(rho, grado, q, m, desfase):
+    """Amortiguamiento de amplitud (o desfase) del qubit q como polinomio en s = sqrt(1-γ)."""
+    fila, columna = _ejes(q, m)
+    ndim = rho.ndim
+    for a, b in ((0, 1), (1, 0)):
+        indice = _indice(fila, a, columna, b, ndim)
+        rho[indice] = np.roll(rho[indice], 1, axis=0)
+    if not desfase:
+        # ρ00 += (1 - s²)·ρ11 y ρ11 -> s²·ρ11
+        unos = _indice(fila, 1, columna, 1, ndim)
+        ceros = _indice(fila, 0, columna, 0, ndim)
+        rho[ceros] += rho[unos] - np.roll(rho[unos], 2, axis=0)
+        rho[unos] = np.roll(rho[unos], 2, axis=0)
+        return grado + 2
+    return grado + 1
+
+
+def _grado_maximo(circuito, noise_type):
+    grado = 0
+    for instruccion in circuito.data:
+        nombre = instruccion.operation.name
+        if nombre in PUERTAS_1Q or nombre in PUERTAS_2Q:
+            por_qubit = 2 if noise_type == "damping" else 1
+            grado += por_qubit * len(instruccion.qubits) if _en_raiz_de_complemento(noise_type) else 1
+    return grado
+
+
+def coeficientes_circuito(circuito, noise_type, n):
+    """
+    Coeficientes del polinomio P(todo ceros en los n primeros qubits) de un
+    circuito con el ruido de build_noise_model.
+
+    Args:
+        circuito: QuantumCircuit con puertas h, x, z, cx, barreras y medidas finales
+        noise_type: "depolarizing", "dephasing" o "damping"
+        n: qubits medidos (0..n-1)
+
+    Returns:
+        array de coeficientes en potencias crecientes de variable(nivel, noise_type)
+    """
+    from qiskit.quantum_info import Operator
+
+    m = circuito.num_qubits
+    rho = np.zeros((_grado_maximo(circuito, noise_type) + 1,) + (2,) * 2 * m, dtype=complex)
+    rho[(0,) + (0,) * 2 * m] = 1.0
+    grado = 0
+
+    for instruccion in circuito.data:
+        nombre = instruccion.operation.name
+        if nombre in SIN_RUIDO:
+            continue
+        if nombre not in PUERTAS_1Q and nombre not in PUERTAS_2Q:
+            raise ValueError(f"Puerta sin modelo de ruido en build_noise_model: {nombre}")
+        qubits = [circuito.find_bit(qubit).index for qubit in instruccion.qubits]
+        rho[:grado + 1] = _aplicar_operador(rho[:grado + 1], Operator(instruccion.operation).data, qubits, m)
+        if _en_raiz_de_complemento(noise_type):
+            for q in qubits:
+                grado = _amortiguar(rho, grado, q, m, desfase=(noise_type == "dephasing"))
+        else:
+            grado = _despolarizar(rho, grado, qubits, m)
+
+    diagonal = np.einsum("kii->ki", rho.reshape(len(rho), 2**m, 2**m)).real
+    # Índice de la base en orden de Qiskit: todo ceros en 0..n-1 con cualquier valor en el resto
+    ceros = [i for i in range(2**m) if i % 2**n == 0]
+    return polynomial.polytrim(diagonal[:, ceros].sum(axis=1), tol=1e-14)
+
+
+def _coeficientes_celda(spec):
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    n = spec["n"]
+    circuito = deutsch_jozsa_circuit(n, spec["oracle_type"], spec["oracle_case"], spec["oraculo"])
+    ceros = coeficientes_circuito(circuito, spec["noise_type"], n)
+    acierto = ceros if spec["oracle_type"] == "constant" else polynomial.polysub([1.0], ceros)
+    return {"coeficientes": [float(c) for c in acierto]}
+
+
+def _celda(n, noise_type, oracle_type, oracle_case, modo_oraculo):
+    if n > N_MAXIMO:
+        raise ValueError(f"n = {n} supera N_MAXIMO = {N_MAXIMO} (matriz densidad de 4^(n+1) entradas por coeficiente)")
+    return {
+        "experimento": "polinomio_dj",
+        "version": 1,
+        "n": n,
+        "noise_type": noise_type,
+        "oracle_type": oracle_type,
+        "oracle_case": int(oracle_case),
+        "oraculo": modo_oraculo
+    }
+
+
+def coeficientes_caso(n, noise_type, oracle_type, oracle_case, modo_oraculo="lineal", usar_cache=True):
+    """
+    Polinomio de la probabilidad de acierto de un oracle_case.
+
+    Args:
+        n: qubits de entrada
+        noise_type: "depolarizing", "dephasing" o "damping"
+        oracle_type: "constant" o "balanced"
+        oracle_case: caso del oráculo
+        modo_oraculo: "lineal" o "arbol"
+        usar_cache: leer y guardar los coeficientes en la caché de resultados
+
+    Returns:
+        array de coeficientes en potencias crecientes de variable(nivel, noise_type)
+    """
+    celda = _celda(n, noise_type, oracle_type, oracle_case, modo_oraculo)
+    return np.array(calcular_celdas([celda], _coeficientes_celda, usar_cache=usar_cache)[0]["coeficientes"])
+
+
+def polinomio_precision(n, noise_type, modo_oraculo="lineal", usar_cache=True):
+    """
+    Polinomios medios de acierto sobre todos los casos, con la misma
+    distribución que el barrido de Analisismodelosruido: caso constante 0 o 1
+    y caso balanceado uniforme en [1, 2^n - 1].
+
+    Args:
+        n, noise_type, modo_oraculo, usar_cache: ver coeficientes_caso
+
+    Returns:
+        tupla (coeficientes constantes, coeficientes balanceadas)
+    """
+    clave = (n, noise_type, modo_oraculo)
+    if clave not in _polinomios or not usar_cache:
+        casos = [("constant", c) for c in (0, 1)] + [("balanced", c) for c in range(1, 2**n)]
+        celdas = [_celda(n, noise_type, tipo, caso, modo_oraculo) for tipo, caso in casos]
+        resultados = calcular_celdas(celdas, _coeficientes_celda, usar_cache=usar_cache)
+
+        medias = {}
+        for tipo in ("constant", "balanced"):
+            coeficientes = [r["coeficientes"] for (t, _), r in zip(casos, resultados) if t == tipo]
+            suma = [0.0]
+            for c in coeficientes:
+                suma = polynomial.polyadd(suma, c)
+            medias[tipo] = suma / len(coeficientes)
+        _polinomios[clave] = (medias["constant"], medias["balanced"])
+    return _polinomios[clave]
+
+
+def evaluar(coeficientes, noise_levels, noise_type):
+    """
+    Evalúa un polinomio de acierto en unos niveles de ruido.
+
+    Args:
+        coeficientes: resultado de coeficientes_caso (o uno de polinomio_precision)
+        noise_levels: nivel o array de niveles
+        noise_type: tipo de ruido del polinomio
+
+    Returns:
+        probabilidad de acierto en cada nivel
+    """
+    return polynomial.polyval(variable(noise_levels, noise_type), coeficientes)
+
+
+def curva_precision(n, noise_levels, noise_type="depolarizing", num_tests=100, modo_oraculo="lineal", usar_cache=True):
+    """
+    Equivalente exacto de Analisismodelosruido.evaluate_accuracy_with_error.
+
+    Args:
+        n: qubits de entrada
+        noise_levels: niveles de ruido
+        noise_type: tipo de ruido
+        num_tests: pruebas por ejecución (mitad constantes, mitad balanceadas),
+            sólo para la desviación típica
+        modo_oraculo, usar_cache: ver coeficientes_caso
+
+    Returns:
+        tupla (medias, desviaciones típicas de la precisión de una ejecución de num_tests pruebas)
+    """
+    constantes, balanceadas = polinomio_precision(n, noise_type, modo_oraculo, usar_cache)
+    p_constant = np.clip(evaluar(constantes, noise_levels, noise_type), 0.0, 1.0)
+    p_balanced = np.clip(evaluar(balanceadas, noise_levels, noise_type), 0.0, 1.0)
+    medias = (p_constant + p_balanced) / 2
+    stds = np.sqrt((p_constant * (1 - p_constant) + p_balanced * (1 - p_balanced)) / (2 * num_tests))
+    return medias, stds
+
+
+def nivel_umbral(n, precision_objetivo, noise_type="depolarizing", modo_oraculo="lineal", usar_cache=True):
+    """
+    Menor nivel de ruido en [0, 1] con el que la precisión media baja a
+    precision_objetivo.
+
+    Args:
+        n: qubits de entrada
+        precision_objetivo: precisión media (p.ej. 0.9)
+        noise_type, modo_oraculo, usar_cache: ver coeficientes_caso
+
+    Returns:
+        nivel de ruido, o None si la precisión no baja tanto en [0, 1]
+    """
+    constantes, balanceadas = polinomio_precision(n, noise_type, modo_oraculo, usar_cache)
+    media = polynomial.polyadd(constantes, balanceadas) / 2
+    if polynomial.polyval(variable(0.0, noise_type), media) <= precision_objetivo:
+        return 0.0
+
+    raices = polynomial.polyroots(polynomial.polysub(media, [precision_objetivo]))
+    raices = raices[np.abs(raices.imag) < 1e-9].real
+    if _en_raiz_de_complemento(noise_type):
+        niveles = 1 - raices[(raices >= 0) & (raices <= 1)] ** 2
+    else:
+        niveles = raices[(raices >= 0) & (raices <= 1)]
+    return float(niveles.min()) if niveles.size else None
+
+
+if __name__ == "__main__":
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    niveles = np.linspace(0, 1, 10000)
+
+    for noise_type in ("depolarizing", "dephasing", "damping"):
+        inicio = time.perf_counter()
+        polinomio_precision(n, noise_type)
+        construccion = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        medias, _ = curva_precision(n, niveles, noise_type)
+        evaluacion = time.perf_counter() - inicio
+        umbrales = ", ".join(f"{objetivo:.0%} en {nivel_umbral(n, objetivo, noise_type):.4f}"
+                             for objetivo in (0.9, 0.75))
+        print(f"{noise_type:<13} | grado {len(_polinomios[(n, noise_type, 'lineal')][1]) - 1:>3} | "
+              f"coeficientes {construccion:.2f} s | 10.000 puntos {evaluacion * 1e3:.2f} ms | "
+              f"precisión(0.1) {np.interp(0.1, niveles, medias):.4f} | {umbrales}")
@@ -0,0 +1,269 @@
+import json
+import random
+import sys
+
+import numpy as np
+from scipy import stats
+
+
+def errores_desde_piloto(pruebas):
+    """
+    Estima la probabilidad de error por shot de cada caso a partir de una
+    ejecución piloto (la lista "pruebas" de un JSON de resultados).
+
+    Un shot es erróneo si mide 0...0 en un oráculo balanceado o cualquier
+    otra cadena en un oráculo constante.
+
+    Args:
+        pruebas: lista de registros con "tipo", "oracle_case" y "counts"
+
+    Returns:
+        diccionario (tipo, oracle_case) -> probabilidad de error por shot
+    """
+    errores = {}
+    shots = {}
+    for prueba in pruebas:
+        counts = prueba["counts"]
+        n = len(next(iter(counts)))
+        total = sum(counts.values())
+        ceros = counts.get('0' * n, 0)
+        fallos = total - ceros if prueba["tipo"] == "constant" else ceros
+        clave = (prueba["tipo"], prueba["oracle_case"])
+        errores[clave] = errores.get(clave, 0) + fallos
+        shots[clave] = shots.get(clave, 0) + total
+    return {clave: errores[clave] / shots[clave] for clave in errores}
+
+
+def errores_desde_modelo(n, noise_model, shots=2000, casos=None):
+    """
+    Estima la probabilidad de error por shot de cada caso simulando el circuito
+    con un NoiseModel (p.ej. ruidocalibrado.cargar_modelo_ruido).
+
+    Args:
+        n: número de qubits de entrada
+        noise_model: NoiseModel de Aer
+        shots: shots de simulación por caso
+        casos: lista de (tipo, oracle_case); por defecto los dos constantes y
+            los balanceados 1..2^n-2 que usan los ejecutores
+
+    Returns:
+        diccionario (tipo, oracle_case) -> probabilidad de error por shot
+    """
+    from qiskit_aer import AerSimulator
+    from Analisismodelosruido import deutsch_jozsa_circuit
+
+    if casos is None:
+        casos = [("constant", 0), ("constant", 1)] + [("balanced", c) for c in range(1, 2**n - 1)]
+
+    backend = AerSimulator(noise_model=noise_model)
+    circuitos = [deutsch_jozsa_circuit(n, tipo, caso) for tipo, caso in casos]
+    resultado = backend.run(circuitos, shots=shots).result()
+
+    errores = {}
+    for i, (tipo, caso) in enumerate(casos):
+        ceros = resultado.get_counts(i).get('0' * n, 0)
+        errores[(tipo, caso)] = (shots - ceros) / shots if tipo == "constant" else ceros / shots
+    return errores
+
+
+def precision_mayoria(p_error, shots):
+    """
+    Probabilidad de clasificar bien un test con la regla de los ejecutores
+    (fracción de 0...0 > 0.5 -> constante) usando `shots` shots.
+
+    Args:
+        p_error: array de probabilidades de error por shot
+        shots: número de shots por circuito
+
+    Returns:
+        array con la probabilidad de acierto de cada caso
+    """
+    p_error = np.asarray(p_error, dtype=float)
+    # Hace falta una mayoría estricta de shots correctos; en un empate la
+    # regla clasifica como balanceado, así que los constantes pierden el empate
+    return stats.binom.sf(shots // 2, shots, 1 - p_error)
+
+
+def varianza_media_casos(precisiones, pruebas):
+    """
+    Varianza de la precisión media de un tipo de oráculo con `pruebas`
+    pruebas repartidas entre sus casos distintos.
+
+    Con pruebas <= N casos se eligen casos distintos sin reemplazo, así que
+    la variación entre casos lleva la corrección de población finita
+    (N - m)/(N - 1); con más pruebas se recorren todos los casos
+    pruebas // N veces (estratificado) y sólo queda el ruido de cada prueba.
+
+    Args:
+        precisiones: array con la probabilidad de acierto de cada caso
+        pruebas: número de pruebas del tipo
+
+    Returns:
+        varianza del estimador de la precisión media del tipo
+    """
+    num_casos = len(precisiones)
+    # Suelo de 1e-4 por prueba: con precisiones estimadas de 1.0 la varianza no es realmente nula
+    dentro = max(float(np.mean(precisiones * (1 - precisiones))), 1e-4)
+    if pruebas >= num_casos:
+        return dentro / pruebas
+    entre = float(np.var(precisiones)) * (num_casos - pruebas) / (num_casos - 1)
+    return (entre + dentro) / pruebas
+
+
+def _pruebas_del_tipo(m, num_casos):
+    # Con más pruebas que casos se redondea a un número entero de pasadas por todos
+    return m if m <= num_casos else -(-m // num_casos) * num_casos
+
+
+def planificar(errores, precision_objetivo, fraccion_constantes=1/6, semiamplitud=0.05,
+               confianza=0.95, t_trabajo=2.0, t_shot=1e-3, max_shots=1001, max_pruebas=20000, semilla=0):
+    """
+    Elige los shots por circuito y cuántos casos de oráculo distintos ejecutar
+    (y cuántas veces cada uno) para minimizar el tiempo total de dispositivo.
+
+    Con s shots por circuito cada tipo de oráculo debe alcanzar la precisión
+    objetivo por votación mayoritaria. Para cada s se busca el menor número
+    de pruebas cuya precisión total (constantes en la proporción
+    fraccion_constantes) se estima con la semiamplitud pedida, con la
+    varianza de varianza_media_casos: primero casos distintos sin repetir y,
+    cuando ya están todos, pasadas completas por todos los casos. El coste
+    es pruebas · (t_trabajo + s · t_shot).
+
+    Args:
+        errores: diccionario (tipo, oracle_case) -> probabilidad de error por shot
+        precision_objetivo: precisión mínima por test para cada tipo de oráculo
+        fraccion_constantes: fracción de pruebas con oráculo constante
+        semiamplitud: semiamplitud deseada del intervalo de la precisión total
+        confianza: nivel de confianza del intervalo
+        t_trabajo: tiempo fijo por trabajo enviado (envío, cola, resultado) en s
+        t_shot: tiempo por shot en s
+        max_shots: máximo de shots por circuito a considerar
+        max_pruebas: máximo de pruebas a considerar
+        semilla: semilla para elegir los casos distintos
+
+    Returns:
+        diccionario con el plan ("shots", "casos_distintos" y "repeticiones"
+        por tipo, "num_constant", "num_balanced", "casos" con la lista
+        (tipo, oracle_case) a ejecutar, "tiempo_estimado" y la precisión
+        prevista por tipo) o None si el objetivo no se alcanza
+    """
+    z = stats.norm.ppf(0.5 + confianza / 2)
+    casos = {tipo: sorted(caso for (t, caso) in errores if t == tipo) for tipo in ("constant", "balanced")}
+    p_error = {tipo: np.array([errores[(tipo, caso)] for caso in casos[tipo]]) for tipo in casos}
+    fracciones = {"constant": fraccion_constantes, "balanced": 1 - fraccion_constantes}
+
+    mejor = None
+    # Shots impares: la mayoría nunca empata
+    for shots in range(1, max_shots + 1, 2):
+        precisiones = {tipo: precision_mayoria(p_error[tipo], shots) for tipo in casos if len(casos[tipo])}
+        precision = {tipo: float(precisiones[tipo].mean()) if tipo in precisiones else 1.0 for tipo in casos}
+        if min(precision.values()) < precision_objetivo:
+            continue
+
+        for num_pruebas in range(10, max_pruebas + 1):
+            pruebas = {}
+            for tipo in casos:
+                m = round(num_pruebas * fracciones[tipo]) if tipo in precisiones else 0
+                pruebas[tipo] = _pruebas_del_tipo(m, len(casos[tipo])) if m else 0
+            total = sum(pruebas.values())
+            # Precisión total agrupada (aciertos / pruebas), como en los ejecutores
+            varianza = sum(pruebas[t] ** 2 * varianza_media_casos(precisiones[t], pruebas[t])
+                           for t in precisiones if pruebas[t]) / total**2
+            if z * np.sqrt(max(varianza, 1e-12)) <= semiamplitud:
+                break
+        else:
+            continue
+
+        tiempo = total * (t_trabajo + shots * t_shot)
+        if mejor is None or tiempo < mejor["tiempo_estimado"]:
+            mejor = {
+                "shots": shots,
+                "num_constant": pruebas["constant"],
+                "num_balanced": pruebas["balanced"],
+                "casos_distintos": {t: min(pruebas[t], len(casos[t])) for t in casos},
+                "repeticiones": {t: max(pruebas[t] // len(casos[t]), 1) if pruebas[t] else 0 for t in casos},
+                "tiempo_estimado": tiempo,
+                "precision_prevista": {
+                    "constant": precision["constant"],
+                    "balanced": precision["balanced"],
+                    "total": (pruebas["constant"] * precision["constant"] +
+                              pruebas["balanced"] * precision["balanced"]) / total
+                }
+            }
+
+    if mejor is not None:
+        # Casos concretos: distintos al azar o todos repetidos `repeticiones` veces
+        generador = random.Random(semilla)
+        mejor["casos"] = []
+        for tipo in casos:
+            if mejor["casos_distintos"][tipo] < len(casos[tipo]):
+                elegidos = generador.sample(casos[tipo], mejor["casos_distintos"][tipo])
+            else:
+                elegidos = casos[tipo] * mejor["repeticiones"][tipo]
+            mejor["casos"] += [(tipo, caso) for caso in elegidos]
+    return mejor
+
+
+def ejecutar_plan(plan, ejecutar_experimento):
+    """
+    Ejecuta un plan con ejecutar_experimento_deutsch_jozsa_estadistico y
+    compara la precisión obtenida con la prevista.
+
+    Args:
+        plan: diccionario devuelto por planificar
+        ejecutar_experimento: función ejecutar_experimento_deutsch_jozsa_estadistico
+            de uno de los ejecutores
+
+    Returns:
+        diccionario de resultados del experimento con la clave "plan" añadida
+    """
+    resultados = ejecutar_experimento(shots=plan["shots"], casos=plan["casos"])
+
+    precision = resultados["estadisticas"]["precision"]
+    print("\nPRECISIÓN PREVISTA FRENTE A OBTENIDA:")
+    for tipo in ("constant", "balanced", "total"):
+        print(f"  {tipo:<9}: prevista {plan['precision_prevista'][tipo]:.2%}  obtenida {precision[tipo]:.2%}")
+
+    resultados["plan"] = plan
+    return resultados
+
+
+if __name__ == "__main__":
+    # Uso: python presupuestoshots.py (piloto.json|calibracion.json) precision_objetivo [simulador|cesga]
+    import os
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    precision_objetivo = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+
+    if "pruebas" in datos:
+        errores = errores_desde_piloto(datos["pruebas"])
+    else:
+        # Fichero de calibración: errores simulados con el modelo de ruido derivado
+        from calibracion import seleccionar_layout
+        from ruidocalibrado import cargar_modelo_ruido
+        n = 4
+        layout, _ = seleccionar_layout(sys.argv[1], n)
+        errores = errores_desde_modelo(n, cargar_modelo_ruido(sys.argv[1], layout))
+
+    plan = planificar(errores, precision_objetivo)
+
+    if plan is None:
+        print(f"No se alcanza una precisión del {precision_objetivo:.0%} por votación mayoritaria")
+        sys.exit(1)
+
+    print(f"Plan para precisión ≥ {precision_objetivo:.0%} por test:")
+    print(f"  Shots por circuito: {plan['shots']}")
+    print(f"  Pruebas: {plan['num_constant']} constantes + {plan['num_balanced']} balanceadas")
+    for tipo in ("constant", "balanced"):
+        print(f"  Casos {tipo}: {plan['casos_distintos'][tipo]} distintos × {plan['repeticiones'][tipo]}")
+    print(f"  Tiempo estimado de dispositivo: {plan['tiempo_estimado']:.1f} s")
+
+    if len(sys.argv) > 3:
+        directorio = "Simulador" if sys.argv[3] == "simulador" else "Cesga"
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), directorio))
+        if directorio == "Simulador":
+            from cuantico4cubits import ejecutar_experimento_deutsch_jozsa_estadistico
+        else:
+            from cuantico4qubits import ejecutar_experimento_deutsch_jozsa_estadistico
+        ejecutar_plan(plan, ejecutar_experimento_deutsch_jozsa_estadistico)
@@ -0,0 +1,171 @@
+import os
+import pickle
+
+import numpy as np
+from qiskit_aer.noise import NoiseModel, ReadoutError, depolarizing_error, thermal_relaxation_error
+
+from calibracion import cargar_calibracion, hash_archivo
+
+# Directorio por defecto para los modelos de ruido serializados
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_ruido")
+
+# Versión del formato: cambiarla invalida los modelos guardados
+VERSION_MODELO = 1
+
+
+def _parametro_despolarizante(fidelidad, num_qubits):
+    """
+    Convierte una fidelidad media de puerta (RB) en el parámetro del canal
+    despolarizante equivalente: F = 1 - λ(d-1)/d.
+    """
+    d = 2 ** num_qubits
+    lam = (1 - fidelidad) * d / (d - 1)
+    return float(np.clip(lam, 0, d**2 / (d**2 - 1)))
+
+
+def _relajacion(t1, t2, duracion):
+    # thermal_relaxation_error exige T2 <= 2·T1
+    if duracion <= 0 or np.isnan(t1) or np.isnan(t2):
+        return None
+    return thermal_relaxation_error(t1, min(t2, 2 * t1), duracion)
+
+
+def _error_1q(calibracion, q, repeticiones=1):
+    fidelidad = calibracion["fidelidad_sx"][q] ** repeticiones
+    error = depolarizing_error(_parametro_despolarizante(fidelidad, 1), 1)
+    relajacion = _relajacion(calibracion["t1"][q], calibracion["t2"][q], repeticiones * calibracion["duracion_sx"][q])
+    return error if relajacion is None else error.compose(relajacion)
+
+
+def _error_2q(calibracion, control, target, fidelidad, duracion):
+    error = depolarizing_error(_parametro_despolarizante(fidelidad, 2), 2)
+    relaj_c = _relajacion(calibracion["t1"][control], calibracion["t2"][control], duracion)
+    relaj_t = _relajacion(calibracion["t1"][target], calibracion["t2"][target], duracion)
+    if relaj_c is not None and relaj_t is not None:
+        # En Qiskit el qubit 0 de la instrucción es el bit menos significativo
+        error = error.compose(relaj_t.tensor(relaj_c))
+    return error
+
+
+def construir_modelo_ruido(calibracion, layout=None):
+    """
+    Construye un NoiseModel de Aer a partir de una calibración de Qmio.
+
+    Cada qubit recibe relajación térmica (T1/T2) durante la duración de sus
+    puertas más un error despolarizante ajustado a la fidelidad RB de la puerta
+    SX; las puertas de 2 qubits usan la fidelidad de la ECR de cada acoplador y
+    la medida un error de lectura simétrico con la fidelidad de lectura.
+
+    Args:
+        calibracion: estructura devuelta por cargar_calibracion
+        layout: lista de qubits físicos [entradas..., ancilla]. Si se indica,
+            el ruido se asigna a los qubits lógicos 0..len(layout)-1 para
+            simular circuitos sin transpilar (h, x, z, cx); si es None se
+            asigna a los qubits físicos para circuitos ya transpilados
+
+    Returns:
+        NoiseModel
+    """
+    noise_model = NoiseModel(basis_gates=['sx', 'x', 'rz', 'ecr', 'h', 'z', 'cx'])
+
+    if layout is None:
+        fisicos = list(range(calibracion["num_qubits"]))
+    else:
+        fisicos = list(layout)
+    logico = {q: i for i, q in enumerate(fisicos)}
+
+    for q in fisicos:
+        i = logico[q]
+        # H ≈ una SX entre rotaciones virtuales, X = SX·SX; Z y Rz son virtuales
+        noise_model.add_quantum_error(_error_1q(calibracion, q), ['sx', 'h'], [i])
+        noise_model.add_quantum_error(_error_1q(calibracion, q, repeticiones=2), ['x'], [i])
+
+        fidelidad = calibracion["fidelidad_lectura"][q]
+        if not np.isnan(fidelidad):
+            fidelidad = float(np.clip(fidelidad, 0.5, 1.0))
+            noise_model.add_readout_error(
+                ReadoutError([[fidelidad, 1 - fidelidad], [1 - fidelidad, fidelidad]]), [i]
+            )
+
+    # Error por defecto para pares sin acoplador directo (CNOT tras routing)
+    fidelidades_2q = [p["fidelidad"] for p in calibracion["puertas_2q"].values() if p["fidelidad"] > 0]
+    if fidelidades_2q:
+        fidelidad_mediana = float(np.median(fidelidades_2q))
+        noise_model.add_all_qubit_quantum_error(
+            depolarizing_error(_parametro_despolarizante(fidelidad_mediana, 2), 2), ['ecr', 'cx']
+        )
+
+    for (control, target), puerta in calibracion["puertas_2q"].items():
+        if control not in logico or target not in logico:
+            continue
+        error = _error_2q(calibracion, control, target, puerta["fidelidad"], puerta["duracion"])
+        # La calibración da un solo sentido; el CNOT inverso cuesta lo mismo más 1q virtuales
+        noise_model.add_quantum_error(error, ['ecr', 'cx'], [logico[control], logico[target]], warnings=False)
+        noise_model.add_quantum_error(
+            _error_2q(calibracion, target, control, puerta["fidelidad"], puerta["duracion"]),
+            ['ecr', 'cx'], [logico[target], logico[control]], warnings=False
+        )
+
+    return noise_model
+
+
+def cargar_modelo_ruido(path_calibracion, layout=None, directorio_cache=DIRECTORIO_CACHE):
+    """
+    Devuelve el NoiseModel de una calibración, leyéndolo de la caché en disco
+    si ya se construyó antes para el mismo contenido de fichero y layout.
+
+    Args:
+        path_calibracion: ruta del JSON de calibración
+        layout: ver construir_modelo_ruido
+        directorio_cache: directorio donde se guardan los modelos serializados
+
+    Returns:
+        NoiseModel
+    """
+    sufijo = "fisico" if layout is None else "-".join(str(q) for q in layout)
+    nombre = f"{hash_archivo(path_calibracion)[:16]}_{sufijo}_v{VERSION_MODELO}.pkl"
+    ruta = os.path.join(directorio_cache, nombre)
+
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, 'rb') as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Fichero corrupto o de otra versión de qiskit-aer: se reconstruye
+            pass
+
+    noise_model = construir_modelo_ruido(cargar_calibracion(path_calibracion), layout)
+
+    os.makedirs(directorio_cache, exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, 'wb') as f:
+        pickle.dump(noise_model, f)
+    os.replace(temporal, ruta)
+
+    return noise_model
+
+
+if __name__ == "__main__":
+    from calibracion import seleccionar_layout
+    from Analisismodelosruido import deutsch_jozsa_qiskit, generate_balanced_oracle_case
+    import random
+
+    n = 4
+    num_tests = 200
+    path_calibracion = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cesga", "2025_04_23__12_00_02.json")
+
+    layout, puntuacion = seleccionar_layout(path_calibracion, n)
+    noise_model = cargar_modelo_ruido(path_calibracion, layout)
+    print(f"Layout {layout} (probabilidad estimada sin error: {puntuacion:.3f})")
+    print(noise_model)
+
+    aciertos_constant = 0
+    aciertos_balanced = 0
+    for _ in range(num_tests // 2):
+        result, _ = deutsch_jozsa_qiskit(n, "constant", random.choice([0, 1]), noise_model=noise_model)
+        aciertos_constant += result == "constant"
+        result, _ = deutsch_jozsa_qiskit(n, "balanced", generate_balanced_oracle_case(n), noise_model=noise_model)
+        aciertos_balanced += result == "balanced"
+
+    print(f"Precisión simulada en funciones constantes: {aciertos_constant / (num_tests // 2):.2%}")
+    print(f"Precisión simulada en funciones balanceadas: {aciertos_balanced / (num_tests // 2):.2%}")
@@ -0,0 +1,64 @@
+"""
+Método de AerSimulator para deutsch_jozsa_qiskit según n y el tipo de ruido.
+
+La tabla rutas_simulador.json la genera Benchmarks/escalado.py y guarda en
+"metadatos" cómo se midió. La incluida se midió con
+
+    python Benchmarks/escalado.py --guardar
+
+para n = 2, 4, ..., 12: 3 rondas intercaladas de todas las configuraciones,
+cada medida es la mediana de 20 ejecuciones de 1 shot en un proceso propio,
+con ruido a los niveles 0.05 y 0.3. El tiempo de cada método es la suma
+sobre los niveles de la mediana entre rondas, y la tabla está suavizada en
+rangos de n: sólo se cambia de método al subir n si el nuevo es más de un
+10 % más rápido, y un método abandonado no vuelve. Las diferencias entre
+métodos por debajo de ese 10 % son del orden del ruido de medida. Las
+medidas de cada ronda están en "medidas".
+"""
+import json
+import os
+
+PATH_RUTAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rutas_simulador.json")
+
+METODO_POR_DEFECTO = "automatic"
+
+_rutas = {}
+
+
+def cargar_rutas(path=PATH_RUTAS):
+    """
+    Carga la tabla de rutas (se lee una sola vez por fichero).
+
+    Returns:
+        diccionario ruido -> {n: método}; vacío si el fichero no existe
+    """
+    if path not in _rutas:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except OSError:
+            datos = {"rutas": {}}
+        _rutas[path] = {ruido: {int(n): metodo for n, metodo in por_n.items()}
+                        for ruido, por_n in datos["rutas"].items()}
+    return _rutas[path]
+
+
+def metodo_simulador(n, noise_type=None, path=PATH_RUTAS):
+    """
+    Método de AerSimulator más rápido medido para n qubits de entrada y un
+    tipo de ruido. Si n no está en la tabla se usa el mayor n medido por
+    debajo; si no hay ninguno, el método automático de Aer.
+
+    Args:
+        n: número de qubits (excluyendo el auxiliar)
+        noise_type: tipo de ruido, o None sin ruido
+        path: tabla de rutas
+
+    Returns:
+        nombre del método ("statevector", "stabilizer"...)
+    """
+    por_n = cargar_rutas(path).get(noise_type or "ideal", {})
+    medidos = [m for m in por_n if m <= n]
+    if not medidos:
+        return METODO_POR_DEFECTO
+    return por_n[max(medidos)]
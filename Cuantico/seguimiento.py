@@ -0,0 +1,152 @@
+"""
+Estadísticas incrementales durante una ejecución larga.
+
+EstadisticasVivas lleva la matriz de confusión prueba a prueba (O(1) por
+prueba) y da en cualquier momento la precisión con intervalos de Wilson.
+Los runners la muestran en la línea de progreso y la escriben cada pocas
+pruebas en un fichero de estado junto al de resultados, que se puede
+consultar mientras el trabajo sigue en cola:
+
+    watch -n 5 cat 4qubits_estado.json
+
+Con una semiamplitud objetivo, suficiente() indica cuándo se han hecho las
+pruebas que garantizan ese intervalo en el peor caso (precisión 0.5, ver
+intervalos.pruebas_necesarias). El número de pruebas se fija antes de
+empezar y no depende de los resultados: parar cuando el intervalo de la
+precisión observada es ya lo bastante estrecho sí sesgaría la estimación
+(la anchura de Wilson depende de la precisión, así que se para antes cuando
+la precisión observada se aleja de 0.5) y, al mirarlo tras cada prueba, el
+intervalo final no tendría la cobertura nominal. Con una precisión lejos de
+0.5 el intervalo final sale más estrecho que el objetivo. Las pruebas deben
+ir en orden aleatorio (como en los runners de 4 qubits) para que las ya
+hechas sean una muestra de las previstas.
+"""
+import datetime
+import json
+import os
+
+from intervalos import intervalo_wilson, pruebas_necesarias
+
+TIPOS = ("constant", "balanced")
+
+
+class EstadisticasVivas:
+    """
+    Matriz de confusión y precisiones actualizadas prueba a prueba.
+
+    Atributos:
+        aciertos, fallos: diccionarios tipo -> número de pruebas
+    """
+
+    __slots__ = ("aciertos", "fallos", "total_previsto", "confianza", "path_estado", "cada",
+                 "semiamplitud_objetivo", "pruebas_objetivo")
+
+    def __init__(self, total_previsto=None, confianza=0.95, path_estado=None, cada=10,
+                 semiamplitud_objetivo=None):
+        """
+        Args:
+            total_previsto: pruebas previstas (sólo informativo)
+            confianza: nivel de los intervalos de Wilson
+            path_estado: fichero JSON de estado (None: no se escribe)
+            cada: escribir el estado cada tantas pruebas
+            semiamplitud_objetivo: semiamplitud máxima del intervalo de la
+                precisión total; suficiente() es cierto tras las pruebas que la
+                garantizan en el peor caso (None: nunca)
+        """
+        self.aciertos = {tipo: 0 for tipo in TIPOS}
+        self.fallos = {tipo: 0 for tipo in TIPOS}
+        self.total_previsto = total_previsto
+        self.confianza = confianza
+        self.path_estado = path_estado
+        self.cada = cada
+        self.semiamplitud_objetivo = semiamplitud_objetivo
+        self.pruebas_objetivo = (pruebas_necesarias(semiamplitud_objetivo, confianza)
+                                 if semiamplitud_objetivo is not None else None)
+
+    def registrar(self, tipo, correcto):
+        """
+        Añade una prueba.
+
+        Args:
+            tipo: "constant" o "balanced"
+            correcto: si la clasificación fue correcta
+        """
+        if correcto:
+            self.aciertos[tipo] += 1
+        else:
+            self.fallos[tipo] += 1
+        if self.pruebas % self.cada == 0:
+            self.guardar_estado()
+
+    @property
+    def pruebas(self):
+        return sum(self.aciertos.values()) + sum(self.fallos.values())
+
+    def intervalo(self, tipo=None):
+        """
+        Precisión e intervalo de Wilson de un tipo de oráculo o del total.
+
+        Args:
+            tipo: "constant", "balanced" o None para el total
+
+        Returns:
+            tupla (precision, inferior, superior), o None si no hay pruebas
+        """
+        tipos = TIPOS if tipo is None else (tipo,)
+        aciertos = sum(self.aciertos[t] for t in tipos)
+        total = aciertos + sum(self.fallos[t] for t in tipos)
+        if total == 0:
+            return None
+        inferior, superior = intervalo_wilson(aciertos, total, self.confianza)
+        return aciertos / total, float(inferior), float(superior)
+
+    def instantanea(self):
+        """
+        Estado actual con la misma estructura que las estadísticas finales.
+
+        Returns:
+            diccionario con pruebas, precision (valor e intervalo por tipo y
+            total), matriz_confusion y la fecha
+        """
+        precision = {}
+        for tipo in TIPOS + (None,):
+            intervalo = self.intervalo(tipo)
+            if intervalo is not None:
+                valor, inferior, superior = intervalo
+                precision[tipo or "total"] = {"valor": valor, "inferior": inferior, "superior": superior}
+        return {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "pruebas": self.pruebas,
+            "total_previsto": self.total_previsto,
+            "pruebas_objetivo": self.pruebas_objetivo,
+            "confianza": self.confianza,
+            "precision": precision,
+            "matriz_confusion": {
+                "constant_correct": self.aciertos["constant"],
+                "constant_as_balanced": self.fallos["constant"],
+                "balanced_correct": self.aciertos["balanced"],
+                "balanced_as_constant": self.fallos["balanced"]
+            },
+            "suficiente": self.suficiente()
+        }
+
+    def linea(self):
+        """Resumen corto para la línea de progreso."""
+        intervalo = self.intervalo()
+        if intervalo is None:
+            return "sin pruebas"
+        valor, inferior, superior = intervalo
+        return f"precisión {valor:.1%} [{inferior:.1%}, {superior:.1%}] ±{(superior - inferior) / 2:.1%}"
+
+    def suficiente(self):
+        """Indica si ya se han hecho las pruebas que garantizan la semiamplitud objetivo."""
+        return self.pruebas_objetivo is not None and self.pruebas >= self.pruebas_objetivo
+
+    def guardar_estado(self):
+        """Escribe la instantánea en path_estado (escritura atómica); sin path_estado no hace nada."""
+        if self.path_estado is None:
+            return
+        temporal = self.path_estado + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.instantanea(), f, indent=2)
+        os.replace(temporal, self.path_estado)
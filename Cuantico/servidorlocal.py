@@ -0,0 +1,425 @@
+"""
+Servidor local con una cola de trabajos como la del endpoint ZMQ de Qmio.
+
+Escucha en ZMQ_SERVER (por defecto tcp://127.0.0.1:5556, la dirección que
+fijan los runners de Cesga) y ejecuta los trabajos en FakeQmio con la
+calibración del repositorio (o en Aer con su modelo de ruido si qmiotools no
+está instalado, ver backends.obtener_backend). Sirve para ejecutar los
+runners de Cesga de extremo a extremo sin acceso al CESGA, someter a carga
+la cola y el manejo de errores y perfilar la espera y la ejecución de cada
+trabajo (DJ_TRAZAS=1):
+
+    python servidorlocal.py servir --latencia 2 --variacion 1 --trabajos-por-minuto 20 --fallos 0.05
+    python servidorlocal.py carga --trabajos 50
+    python ../dj.py hardware cesga4 --backend servidor
+
+El socket es REP, así que los trabajos se atienden de uno en uno en orden de
+llegada, como en la cola de la QPU. Cada trabajo espera `latencia` segundos
+más un extra exponencial de media `variacion`, nunca empieza antes de que
+haya pasado 1/throughput desde el anterior y falla con probabilidad
+`probabilidad_fallo` (respuesta con "Exception" en lugar de "results").
+
+Protocolo: la petición es un objeto de Python serializado con pickle
+(send_pyobj) con el programa (OpenQASM 2 o 3, o un QuantumCircuit) y su
+configuración (diccionario o JSON con "shots"); la respuesta es un
+diccionario con "results" (counts) y "execution_metrics", o con
+"Exception". No es el formato de QmioBackend (qmiotools no se distribuye
+fuera del CESGA y su formato de mensajes no se reproduce aquí), así que un
+QmioBackend no puede conectarse a este servidor. Los runners de Cesga lo
+usan con el backend "servidor" (backends.obtener_backend("servidor"),
+`python dj.py hardware cesga4 --backend servidor`): BackendServidor tiene
+el target de la calibración, de modo que la selección de layout y la
+transpilación son las mismas que con Qmio, y su run() envía cada circuito
+con enviar. Un mensaje que no se puede leer se responde con "Exception" sin
+parar el servidor. pickle ejecuta código al deserializar: el servidor sólo
+debe escuchar en direcciones locales.
+"""
+import json
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+import zmq
+from qiskit.providers import BackendV2, JobStatus, JobV1, Options
+from qiskit.transpiler import Target
+
+from backends import obtener_backend
+from trazas import guardar_trazas, tramo
+
+DIRECCION = os.environ.get("ZMQ_SERVER", "tcp://127.0.0.1:5556")
+PATH_CALIBRACION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cesga", "2025_04_23__12_00_02.json")
+# Con DJ_TRAZAS=1 las trazas del servidor se guardan como servidorlocal_trace.json
+PATH_TRAZAS = "servidorlocal.json"
+
+
+class FalloInyectado(RuntimeError):
+    """Fallo provocado por el servidor para probar el manejo de errores de los runners."""
+
+
+def _leer_peticion(peticion):
+    """
+    Extrae el circuito y los shots de una petición.
+
+    Args:
+        peticion: mensaje tal como llega (bytes de pickle) o ya deserializado:
+            tupla (programa, configuracion) o diccionario con "program" y
+            "config"; programa en OpenQASM 2/3 o QuantumCircuit
+
+    Returns:
+        tupla (QuantumCircuit, shots)
+    """
+    if isinstance(peticion, bytes):
+        peticion = pickle.loads(peticion)
+    if isinstance(peticion, dict):
+        programa, configuracion = peticion["program"], peticion.get("config", {})
+    else:
+        programa, configuracion = peticion
+    if isinstance(configuracion, str):
+        configuracion = json.loads(configuracion)
+
+    if isinstance(programa, str):
+        if programa.lstrip().startswith("OPENQASM 3"):
+            from qiskit import qasm3
+            circuito = qasm3.loads(programa)
+        else:
+            from qiskit import qasm2
+            circuito = qasm2.loads(programa, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
+    else:
+        circuito = programa
+    return circuito, int(configuracion.get("shots", 1))
+
+
+def _responder(counts=None, metricas=None, error=None):
+    if error is not None:
+        return {"Exception": f"{type(error).__name__}: {error}"}
+    return {"results": counts, "execution_metrics": metricas}
+
+
+class ServidorLocal:
+    """
+    Cola de trabajos que imita el endpoint de Qmio.
+
+    Atributos:
+        tiempos: lista de diccionarios por trabajo con la espera en cola, la
+            ejecución y si falló
+    """
+
+    __slots__ = ("simulador", "latencia", "variacion", "intervalo_minimo", "probabilidad_fallo",
+                 "generador", "semilla", "ultimo_inicio", "tiempos")
+
+    def __init__(self, path_calibracion=PATH_CALIBRACION, latencia=0.0, variacion=0.0, trabajos_por_minuto=None,
+                 probabilidad_fallo=0.0, semilla=None):
+        """
+        Args:
+            path_calibracion: JSON de calibración de Qmio
+            latencia: espera fija en cola por trabajo (segundos)
+            variacion: media de la espera extra exponencial (segundos)
+            trabajos_por_minuto: throughput máximo (None: sin límite)
+            probabilidad_fallo: probabilidad de responder con un error
+            semilla: semilla de la latencia, los fallos y la simulación
+        """
+        self.simulador, _ = obtener_backend("local", path_calibracion)
+        self.latencia = latencia
+        self.variacion = variacion
+        self.intervalo_minimo = 60.0 / trabajos_por_minuto if trabajos_por_minuto else 0.0
+        self.probabilidad_fallo = probabilidad_fallo
+        self.generador = random.Random(semilla)
+        self.semilla = semilla
+        self.ultimo_inicio = None
+        self.tiempos = []
+
+    def _esperar_turno(self):
+        espera = self.latencia + (self.generador.expovariate(1 / self.variacion) if self.variacion > 0 else 0.0)
+        if self.ultimo_inicio is not None:
+            espera = max(espera, self.ultimo_inicio + self.intervalo_minimo - time.perf_counter())
+        if espera > 0:
+            time.sleep(espera)
+        self.ultimo_inicio = time.perf_counter()
+
+    def atender(self, peticion):
+        """
+        Procesa una petición: espera en cola, inyecta el fallo si toca y
+        ejecuta el circuito en el simulador.
+
+        Args:
+            peticion: mensaje recibido del cliente (ver _leer_peticion); si
+                no se puede leer, la respuesta es un error
+
+        Returns:
+            diccionario de respuesta (ver _responder)
+        """
+        llegada = time.perf_counter()
+        try:
+            with tramo("cola_local"):
+                self._esperar_turno()
+            inicio = time.perf_counter()
+            if self.generador.random() < self.probabilidad_fallo:
+                raise FalloInyectado("trabajo rechazado por el servidor local")
+            circuito, shots = _leer_peticion(peticion)
+            with tramo("ejecucion_local", shots=shots):
+                semilla = self.generador.randrange(2**31) if self.semilla is not None else None
+                counts = self.simulador.run(circuito, shots=shots, seed_simulator=semilla).result().get_counts()
+            fin = time.perf_counter()
+            metricas = {"cola_s": inicio - llegada, "ejecucion_s": fin - inicio}
+            self.tiempos.append(dict(metricas, fallo=False))
+            return _responder(counts, metricas)
+        except Exception as error:
+            self.tiempos.append({"cola_s": time.perf_counter() - llegada, "ejecucion_s": 0.0, "fallo": True})
+            return _responder(error=error)
+
+    def servir(self, direccion=DIRECCION, max_trabajos=None, path_trazas=PATH_TRAZAS):
+        """
+        Atiende peticiones en `direccion` hasta Ctrl+C o max_trabajos.
+
+        Args:
+            direccion: endpoint ZMQ (por defecto ZMQ_SERVER o tcp://127.0.0.1:5556)
+            max_trabajos: número de trabajos tras el que se para (None: sin límite)
+            path_trazas: con las trazas activas, se guardan junto a este fichero
+                al parar (ver trazas.guardar_trazas)
+        """
+        contexto = zmq.Context.instance()
+        socket = contexto.socket(zmq.REP)
+        socket.bind(direccion)
+        print(f"Servidor local de Qmio en {direccion} ({type(self.simulador).__name__})")
+        try:
+            while max_trabajos is None or len(self.tiempos) < max_trabajos:
+                # Se recibe el mensaje sin deserializar: un mensaje corrupto es un trabajo fallido
+                socket.send_pyobj(self.atender(socket.recv()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket.close(linger=0)
+            print(resumen(self.tiempos))
+            guardar_trazas(path_trazas)
+
+
+def enviar(programa, shots=1, direccion=DIRECCION, timeout=None):
+    """
+    Envía un trabajo al servidor y espera la respuesta.
+
+    Args:
+        programa: OpenQASM o QuantumCircuit ya transpilado para Qmio
+        shots: número de shots
+        direccion: endpoint ZMQ
+        timeout: segundos máximos de espera (None: sin límite)
+
+    Returns:
+        diccionario de respuesta del servidor
+    """
+    socket = zmq.Context.instance().socket(zmq.REQ)
+    socket.connect(direccion)
+    if timeout is not None:
+        socket.setsockopt(zmq.RCVTIMEO, int(timeout * 1000))
+    try:
+        socket.send_pyobj((programa, json.dumps({"shots": shots})))
+        return socket.recv_pyobj()
+    finally:
+        socket.close(linger=0)
+
+
+class ResultadoServidor:
+    """Resultado de un TrabajoServidor con la interfaz de Result que usan los runners."""
+
+    __slots__ = ("counts", "metricas")
+
+    def __init__(self, counts, metricas):
+        self.counts = counts
+        self.metricas = metricas
+
+    @property
+    def success(self):
+        return True
+
+    def get_counts(self, experimento=None):
+        """Counts de un circuito, o de todos (una lista) si el trabajo tenía varios."""
+        if experimento is not None:
+            return self.counts[experimento]
+        return self.counts[0] if len(self.counts) == 1 else self.counts
+
+
+class TrabajoServidor(JobV1):
+    """
+    Trabajo enviado al servidor local. Como en QmioBackend, run() vuelve sin
+    esperar y result() espera a la respuesta: la espera en la cola del
+    servidor se mide en job.result, igual que con Qmio.
+    """
+
+    def __init__(self, backend, circuitos, shots, direccion, timeout):
+        super().__init__(backend, f"servidor-{id(self):x}")
+        self._circuitos = circuitos
+        self._shots = shots
+        self._direccion = direccion
+        self._timeout = timeout
+        self._resultado = None
+
+    def submit(self):
+        pass
+
+    def result(self):
+        """
+        Envía los circuitos (uno por petición) y espera las respuestas.
+
+        Raises:
+            RuntimeError: si el servidor responde con "Exception"
+        """
+        if self._resultado is None:
+            counts, metricas = [], []
+            for circuito in self._circuitos:
+                respuesta = enviar(circuito, self._shots, self._direccion, self._timeout)
+                if "Exception" in respuesta:
+                    raise RuntimeError(f"El servidor local rechazó el trabajo: {respuesta['Exception']}")
+                counts.append(respuesta["results"])
+                metricas.append(respuesta["execution_metrics"])
+            self._resultado = ResultadoServidor(counts, metricas)
+        return self._resultado
+
+    def status(self):
+        return JobStatus.DONE if self._resultado is not None else JobStatus.QUEUED
+
+
+class BackendServidor(BackendV2):
+    """
+    Backend de Qiskit que ejecuta en el servidor local. El target se
+    construye con la calibración (el de FakeQmio si qmiotools está
+    instalado), así que seleccionar_layout, gestor_pases y transpilar lo
+    tratan como a Qmio; run() envía cada circuito con enviar.
+    """
+
+    def __init__(self, path_calibracion=PATH_CALIBRACION, direccion=DIRECCION, timeout=None):
+        """
+        Args:
+            path_calibracion: JSON de calibración de Qmio (la misma que use el servidor)
+            direccion: endpoint ZMQ del servidor
+            timeout: segundos máximos de espera por circuito (None: sin límite)
+        """
+        super().__init__(name="servidor_local", description=f"Servidor local en {direccion}")
+        local, opciones = obtener_backend("local", path_calibracion)
+        if "coupling_map" in opciones:
+            self._target = Target.from_configuration(
+                basis_gates=opciones["basis_gates"] + ["measure", "reset"],
+                num_qubits=opciones["coupling_map"].size(),
+                coupling_map=opciones["coupling_map"]
+            )
+        else:
+            self._target = local.target
+        self.direccion = direccion
+        self.timeout = timeout
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def max_circuits(self):
+        return None
+
+    @classmethod
+    def _default_options(cls):
+        return Options(shots=1)
+
+    def run(self, run_input, **opciones):
+        """
+        Args:
+            run_input: QuantumCircuit transpilado o lista de ellos
+            **opciones: shots
+
+        Returns:
+            TrabajoServidor
+        """
+        circuitos = list(run_input) if isinstance(run_input, (list, tuple)) else [run_input]
+        shots = opciones.get("shots", self.options.shots)
+        return TrabajoServidor(self, circuitos, shots, self.direccion, self.timeout)
+
+
+def resumen(tiempos):
+    """Texto con trabajos, fallos y percentiles de espera y ejecución."""
+    if not tiempos:
+        return "Sin trabajos"
+    cola = np.array([t["cola_s"] for t in tiempos])
+    ejecucion = np.array([t["ejecucion_s"] for t in tiempos if not t["fallo"]])
+    fallos = sum(t["fallo"] for t in tiempos)
+    lineas = [f"Trabajos: {len(tiempos)} ({fallos} fallidos)",
+              f"Cola (s): p50 {np.percentile(cola, 50):.2f}, p95 {np.percentile(cola, 95):.2f}, máx {cola.max():.2f}"]
+    if ejecucion.size:
+        lineas.append(f"Ejecución (s): p50 {np.percentile(ejecucion, 50):.2f}, p95 {np.percentile(ejecucion, 95):.2f}")
+    return "\n".join(lineas)
+
+
+def prueba_carga(num_trabajos, n=4, shots=1, direccion=DIRECCION, path_calibracion=PATH_CALIBRACION, semilla=0):
+    """
+    Envía trabajos DJ aleatorios (transpilados como en los runners) y mide la
+    latencia de extremo a extremo vista por el cliente.
+
+    Args:
+        num_trabajos: número de trabajos
+        n: qubits de entrada
+        shots: shots por trabajo
+        direccion: endpoint ZMQ del servidor
+        path_calibracion: JSON de calibración para el layout y la transpilación
+        semilla: semilla de los oráculos y la transpilación
+
+    Returns:
+        tupla (latencias en segundos, número de fallos, precisión de los trabajos correctos)
+    """
+    from qiskit import qasm2
+    from Analisismodelosruido import deutsch_jozsa_circuit
+    from calibracion import seleccionar_layout
+    from transpilacion import transpilar
+
+    simulador, opciones_transpile = obtener_backend("local", path_calibracion)
+    layout, _ = seleccionar_layout(path_calibracion, n, opciones_transpile.get("coupling_map") or simulador.coupling_map)
+    generador = random.Random(semilla)
+    casos = [("constant", generador.randint(0, 1)) if generador.random() < 1 / 6
+             else ("balanced", generador.randint(1, 2**n - 1)) for _ in range(num_trabajos)]
+    circuitos = transpilar([deutsch_jozsa_circuit(n, tipo, caso) for tipo, caso in casos], layout,
+                           seed_transpiler=semilla, **opciones_transpile)
+
+    latencias, fallos, aciertos = [], 0, 0
+    for (tipo, _), circuito in zip(casos, circuitos):
+        inicio = time.perf_counter()
+        respuesta = enviar(qasm2.dumps(circuito), shots, direccion)
+        latencias.append(time.perf_counter() - inicio)
+        if "Exception" in respuesta:
+            fallos += 1
+            continue
+        counts = respuesta["results"]
+        ceros = sum(v for k, v in counts.items() if set(k.replace(" ", "")) == {"0"}) / shots
+        aciertos += (ceros > 0.5) == (tipo == "constant")
+    correctos = num_trabajos - fallos
+    return latencias, fallos, aciertos / correctos if correctos else float("nan")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor local que imita el endpoint ZMQ de Qmio")
+    parser.add_argument("--direccion", default=DIRECCION)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("servir", help="atender trabajos en FakeQmio")
+    p.add_argument("--calibracion", default=PATH_CALIBRACION)
+    p.add_argument("--latencia", type=float, default=0.0, help="espera fija en cola (s)")
+    p.add_argument("--variacion", type=float, default=0.0, help="media de la espera extra exponencial (s)")
+    p.add_argument("--trabajos-por-minuto", type=float, help="throughput máximo")
+    p.add_argument("--fallos", type=float, default=0.0, help="probabilidad de fallo por trabajo")
+    p.add_argument("--max-trabajos", type=int)
+    p.add_argument("--semilla", type=int)
+    p = sub.add_parser("carga", help="enviar trabajos DJ al servidor y medir la latencia")
+    p.add_argument("--trabajos", type=int, default=20)
+    p.add_argument("--n", type=int, default=4)
+    p.add_argument("--shots", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.comando == "servir":
+        ServidorLocal(args.calibracion, args.latencia, args.variacion, args.trabajos_por_minuto, args.fallos,
+                      args.semilla).servir(args.direccion, args.max_trabajos)
+    else:
+        inicio = time.perf_counter()
+        latencias, fallos, precision = prueba_carga(args.trabajos, args.n, args.shots, args.direccion)
+        total = time.perf_counter() - inicio
+        print(f"{args.trabajos} trabajos en {total:.1f} s ({60 * args.trabajos / total:.1f} trabajos/min), "
+              f"{fallos} fallidos")
+        print(f"Latencia (s): p50 {np.percentile(latencias, 50):.2f}, p95 {np.percentile(latencias, 95):.2f}, "
+              f"máx {max(latencias):.2f}")
+        print(f"Precisión de los trabajos completados: {precision:.2%}")
@@ -0,0 +1,84 @@
+"""
+Gestores de pases reutilizables para los circuitos DJ en Qmio.
+
+transpile(..., optimization_level=2) construye un StagedPassManager nuevo en
+cada llamada (objetivo, plugins de cada etapa...), y para los circuitos DJ de
+5 qubits eso es más de la mitad del coste. Aquí se construye una sola vez por
+backend y layout: como el layout inicial es fijo, la etapa de layout se
+reduce a SetLayout y el resto de etapas (routing con Sabre, traducción a las
+puertas nativas y optimización de nivel 2) da el mismo circuito que
+transpile. Varias pruebas se transpilan en una sola llamada, que Qiskit
+reparte entre procesos.
+"""
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+
+NIVEL_OPTIMIZACION = 2
+
+# (backend, layout, coupling_map, basis_gates, semilla) -> (backend, gestor); se
+# guarda el backend para que su id no se reutilice mientras el gestor exista
+_gestores = {}
+
+
+def gestor_pases(backend=None, initial_layout=None, coupling_map=None, basis_gates=None, seed_transpiler=None):
+    """
+    Devuelve el gestor de pases de nivel 2 para un backend y un layout,
+    construyéndolo la primera vez.
+
+    Args:
+        backend: backend de Qiskit (QmioBackend, FakeQmio...) o None
+        initial_layout: qubits físicos [entradas..., ancilla]
+        coupling_map: mapa de acoplamiento si no se da backend
+        basis_gates: puertas nativas si no se da backend
+        seed_transpiler: semilla de Sabre (None: aleatoria, como transpile)
+
+    Returns:
+        StagedPassManager; gestor.run(circuito o lista) equivale a transpile
+        con optimization_level=2 y el mismo initial_layout
+    """
+    aristas = None
+    if coupling_map is not None:
+        aristas = tuple(coupling_map.get_edges()) if hasattr(coupling_map, "get_edges") else tuple(map(tuple, coupling_map))
+    clave = (id(backend), tuple(initial_layout) if initial_layout is not None else None, aristas,
+             tuple(basis_gates) if basis_gates is not None else None, seed_transpiler)
+
+    if clave not in _gestores:
+        gestor = generate_preset_pass_manager(
+            optimization_level=NIVEL_OPTIMIZACION,
+            backend=backend,
+            coupling_map=coupling_map,
+            basis_gates=basis_gates,
+            initial_layout=list(initial_layout) if initial_layout is not None else None,
+            seed_transpiler=seed_transpiler
+        )
+        _gestores[clave] = (backend, gestor)
+    return _gestores[clave][1]
+
+
+def transpilar(circuitos, layouts, backend=None, **opciones):
+    """
+    Transpila una lista de circuitos con los gestores de gestor_pases. Los
+    circuitos que comparten layout se transpilan juntos en una sola llamada.
+
+    Args:
+        circuitos: lista de QuantumCircuit
+        layouts: un layout para todos o una lista con el de cada circuito
+        backend: backend de Qiskit o None
+        **opciones: coupling_map, basis_gates o seed_transpiler (ver gestor_pases)
+
+    Returns:
+        lista de circuitos transpilados, en el orden de entrada
+    """
+    if layouts and not isinstance(layouts[0], (list, tuple)):
+        layouts = [layouts] * len(circuitos)
+
+    indices_por_layout = {}
+    for i, layout in enumerate(layouts):
+        indices_por_layout.setdefault(tuple(layout), []).append(i)
+
+    transpilados = [None] * len(circuitos)
+    for layout, indices in indices_por_layout.items():
+        gestor = gestor_pases(backend, layout, **opciones)
+        resultado = gestor.run([circuitos[i] for i in indices])
+        for i, circuito in zip(indices, resultado):
+            transpilados[i] = circuito
+    return transpilados
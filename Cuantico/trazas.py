@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Las trazas están desactivadas salvo que se pida con DJ_TRAZAS=1 o activar_trazas()
+_activo = os.environ.get("DJ_TRAZAS", "") not in ("", "0")
+_eventos = []
+_cerrojo = threading.Lock()
+_origen_ns = time.perf_counter_ns()
+
+
+class _TramoNulo:
+    """Contexto vacío que se devuelve cuando las trazas están desactivadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_TRAMO_NULO = _TramoNulo()
+
+
+class _Tramo:
+    __slots__ = ("nombre", "args", "inicio")
+
+    def __init__(self, nombre, args):
+        self.nombre = nombre
+        self.args = args
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        fin = time.perf_counter_ns()
+        with _cerrojo:
+            _eventos.append((self.nombre, self.inicio, fin - self.inicio, threading.get_ident(), self.args))
+        return False
+
+
+def activar_trazas(activo=True):
+    """Activa o desactiva la recogida de trazas."""
+    global _activo
+    _activo = activo
+
+
+def trazas_activas():
+    return _activo
+
+
+def tramo(nombre, **args):
+    """
+    Mide la duración de una etapa:
+
+        with tramo("transpile", prueba=i):
+            ...
+
+    Si las trazas están desactivadas devuelve un contexto vacío compartido,
+    así que el coste es una llamada a función.
+
+    Args:
+        nombre: nombre de la etapa
+        **args: datos adicionales que se guardan en la traza de Chrome
+
+    Returns:
+        gestor de contexto
+    """
+    if not _activo:
+        return _TRAMO_NULO
+    return _Tramo(nombre, args)
+
+
+def limpiar_trazas():
+    with _cerrojo:
+        _eventos.clear()
+
+
+def resumen_latencias():
+    """
+    Agrega las duraciones por etapa.
+
+    Returns:
+        diccionario etapa -> {"n", "total_s", "media_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+    """
+    with _cerrojo:
+        eventos = list(_eventos)
+
+    por_etapa = {}
+    for nombre, _, duracion, _, _ in eventos:
+        por_etapa.setdefault(nombre, []).append(duracion)
+
+    resumen = {}
+    for nombre, duraciones in por_etapa.items():
+        ms = np.array(duraciones) / 1e6
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        resumen[nombre] = {
+            "n": len(ms),
+            "total_s": float(ms.sum() / 1e3),
+            "media_ms": float(ms.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(ms.max())
+        }
+    return resumen
+
+
+def exportar_chrome(path):
+    """
+    Guarda las trazas en formato Chrome trace-event (chrome://tracing, Perfetto).
+
+    Args:
+        path: fichero de salida
+    """
+    with _cerrojo:
+        eventos = list(_eventos)
+
+    pid = os.getpid()
+    trace_events = [
+        {
+            "name": nombre,
+            "ph": "X",
+            "ts": (inicio - _origen_ns) / 1e3,
+            "dur": duracion / 1e3,
+            "pid": pid,
+            "tid": tid,
+            "args": {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v) for k, v in args.items()}
+        }
+        for nombre, inicio, duracion, tid, args in eventos
+    ]
+
+    with open(path, 'w') as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+
+def guardar_trazas(path_resultados):
+    """
+    Guarda junto al fichero de resultados la traza de Chrome
+    (<base>_trace.json) y el resumen de latencias (<base>_latencias.json).
+    No hace nada si las trazas están desactivadas.
+
+    Args:
+        path_resultados: fichero de resultados del experimento
+    """
+    if not _activo:
+        return
+
+    base = os.path.splitext(path_resultados)[0]
+    exportar_chrome(f"{base}_trace.json")
+
+    resumen = resumen_latencias()
+    with open(f"{base}_latencias.json", 'w') as f:
+        json.dump(resumen, f, indent=2)
+
+    print(f"\nLATENCIAS POR ETAPA ({base}_trace.json):")
+    print(f"  {'Etapa':<22} | {'n':>5} | {'total (s)':>9} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9}")
+    for nombre, datos in sorted(resumen.items(), key=lambda item: -item[1]["total_s"]):
+        print(f"  {nombre:<22} | {datos['n']:>5} | {datos['total_s']:>9.3f} | {datos['p50_ms']:>9.3f} | {datos['p95_ms']:>9.3f} | {datos['p99_ms']:>9.3f}")
@@ -0,0 +1,186 @@
+"""
+Caché de resultados direccionada por contenido.
+
+Cada celda de un experimento (un valor de n, un nivel de ruido...) se describe
+con un diccionario (la especificación) que incluye todo lo que determina su
+resultado: parámetros, número de pruebas, semilla, backend, hash de la
+calibración... La clave es el SHA-256 de su forma canónica en JSON y el
+resultado se guarda en disco como un fichero JSON por celda.
+
+Al repetir o ampliar un barrido sólo se calculan las celdas que faltan. Si el
+tamaño total supera el máximo se eliminan primero las celdas usadas hace más
+tiempo.
+
+Sólo se guardan las celdas reproducibles: las que llevan "seed" distinta de
+None o las deterministas, que no llevan "seed". Una celda con "seed": None es
+una muestra aleatoria nueva en cada ejecución y devolver la guardada repetiría
+siempre la primera.
+"""
+import hashlib
+import json
+import os
+import random
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_CACHE = os.path.join(RAIZ, "cache_resultados")
+TAMANO_MAXIMO = 256 * 1024 * 1024  # bytes
+
+
+def _canonico(valor):
+    """Convierte la especificación a tipos JSON con una representación única."""
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, range)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return [_canonico(v) for v in valor.tolist()]
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        # repr de 12 cifras: np.linspace(0, 1, 30)[k] y el mismo valor escrito a mano coinciden
+        valor = float(f"{float(valor):.12g}")
+        return int(valor) if valor.is_integer() else valor
+    return valor
+
+
+def clave(spec):
+    """
+    Calcula la clave de una celda.
+
+    Args:
+        spec: diccionario con la especificación de la celda
+
+    Returns:
+        cadena hexadecimal (SHA-256)
+    """
+    texto = json.dumps(_canonico(spec), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def semilla_celda(spec):
+    """Semilla derivada de la especificación, para que cada celda sea reproducible por sí sola."""
+    return int(clave(spec)[:8], 16)
+
+
+def _path_celda(k, directorio):
+    return os.path.join(directorio, k[:2], f"{k}.json")
+
+
+def obtener(spec, directorio=DIRECTORIO_CACHE):
+    """
+    Busca el resultado de una celda.
+
+    Args:
+        spec: especificación de la celda
+        directorio: directorio de la caché
+
+    Returns:
+        resultado guardado o None si no está
+    """
+    path = _path_celda(clave(spec), directorio)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            resultado = json.load(f)["resultado"]
+    except (OSError, ValueError, KeyError):
+        return None
+    # Marcar como usada recientemente para la expulsión
+    os.utime(path)
+    return resultado
+
+
+def guardar(spec, resultado, directorio=DIRECTORIO_CACHE):
+    """
+    Guarda el resultado de una celda (escritura atómica).
+
+    Args:
+        spec: especificación de la celda
+        resultado: valor serializable en JSON
+        directorio: directorio de la caché
+    """
+    path = _path_celda(clave(spec), directorio)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporal = f"{path}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({"spec": _canonico(spec), "resultado": resultado}, f)
+    os.replace(temporal, path)
+
+
+def podar(directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO):
+    """
+    Elimina las celdas menos usadas hasta que la caché ocupe como mucho tamano_maximo bytes.
+
+    Returns:
+        número de celdas eliminadas
+    """
+    ficheros = []
+    for raiz, _, nombres in os.walk(directorio):
+        for nombre in nombres:
+            if nombre.endswith(".json"):
+                path = os.path.join(raiz, nombre)
+                estado = os.stat(path)
+                ficheros.append((estado.st_mtime, estado.st_size, path))
+
+    total = sum(tamano for _, tamano, _ in ficheros)
+    eliminadas = 0
+    for _, tamano, path in sorted(ficheros):
+        if total <= tamano_maximo:
+            break
+        os.remove(path)
+        total -= tamano
+        eliminadas += 1
+    return eliminadas
+
+
+def reproducible(spec):
+    """Indica si el resultado de la celda está determinado por su especificación."""
+    return "seed" not in spec or spec["seed"] is not None
+
+
+def calcular_celdas(celdas, calcular, usar_cache=True, directorio=DIRECTORIO_CACHE,
+                    tamano_maximo=TAMANO_MAXIMO, progreso=None):
+    """
+    Devuelve el resultado de cada celda, calculando sólo las que no están en la caché.
+
+    Si la especificación lleva "seed" distinta de None, random y NumPy se
+    inicializan con semilla_celda(spec) antes de calcular la celda, de modo
+    que el resultado no depende de qué otras celdas se calculen en la misma
+    ejecución. Las celdas con "seed": None no se leen ni se guardan en la
+    caché (ver reproducible).
+
+    Args:
+        celdas: lista de especificaciones
+        calcular: función spec -> resultado serializable en JSON
+        usar_cache: si es False se calcula todo y no se guarda nada
+        directorio: directorio de la caché
+        tamano_maximo: tamaño máximo de la caché en bytes
+        progreso: envoltorio opcional del iterable de celdas pendientes (p.ej. tqdm)
+
+    Returns:
+        lista de resultados en el orden de celdas
+    """
+    en_cache = [usar_cache and reproducible(spec) for spec in celdas]
+    resultados = [obtener(spec, directorio) if cacheable else None for spec, cacheable in zip(celdas, en_cache)]
+    pendientes = [i for i, resultado in enumerate(resultados) if resultado is None]
+
+    if usar_cache and len(pendientes) < len(celdas):
+        print(f"Caché: {len(celdas) - len(pendientes)}/{len(celdas)} celdas ya calculadas")
+
+    iterable = progreso(pendientes) if progreso is not None and pendientes else pendientes
+    for i in iterable:
+        spec = celdas[i]
+        if spec.get("seed") is not None:
+            semilla = semilla_celda(spec)
+            random.seed(semilla)
+            np.random.seed(semilla)
+        resultados[i] = calcular(spec)
+        if en_cache[i]:
+            guardar(spec, resultados[i], directorio)
+
+    if any(en_cache[i] for i in pendientes):
+        podar(directorio, tamano_maximo)
+
+    return resultados
@@ -0,0 +1,279 @@
+"""
+Punto de entrada único para los experimentos del TFG.
+
+    python dj.py ajuste --n-max 18 --headless --salida ajuste.json
+    python dj.py histograma --n 16
+    python dj.py aleatorio --n 30 --k-max 20
+    python dj.py ruido --n 4 --niveles 30 --headless
+    python dj.py hardware simulador --shots 1
+    python dj.py graficos ruido --entrada dj_noise_results_with_errors.csv
+
+Las opciones globales (--headless, --seed, --sin-cache, --trazas,
+--auditoria) se pueden dar antes o después del subcomando. Cada subcomando
+importa sus módulos al ejecutarse, de modo que los subcomandos clásicos no
+cargan qiskit. Con --headless nunca se importa
+matplotlib en los subcomandos de cálculo. "graficos" redibuja las figuras a
+partir de los resultados guardados con el backend Agg (ver renderizado.py).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+def _usar_directorio(*partes):
+    path = os.path.join(RAIZ, *partes)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def _mostrar_figuras(args):
+    if args.headless:
+        return
+    import matplotlib.pyplot as plt
+    plt.show()
+
+
+def _guardar_json(datos, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {path}")
+
+
+def comando_ajuste(args):
+    _usar_directorio("Clasico")
+    from AjusteexponencialClasico import ajustar, calcular_estadisticas, graficar_ajuste
+
+    rango = range(args.n_min, args.n_max + 1)
+    media, error_estandar, evaluaciones = calcular_estadisticas(rango, args.trials, seed=args.seed,
+                                                                usar_cache=not args.sin_cache)
+    ajuste = ajustar(rango, media, error_estandar, evaluaciones if args.bootstrap else None, args.bootstrap)
+
+    if args.salida:
+        _guardar_json({
+            "rango": list(rango),
+            "num_trials": args.trials,
+            "media": [float(m) for m in media],
+            "error_estandar": [float(e) for e in error_estandar],
+            "ajuste": ajuste
+        }, args.salida)
+
+    if not args.headless:
+        graficar_ajuste(rango, media, error_estandar, ajuste["a"])
+        _mostrar_figuras(args)
+
+
+def comando_histograma(args):
+    _usar_directorio("Clasico")
+    from clasicohistograma import ejecutar_histograma, graficar_histograma, imprimir_estadisticas
+
+    evaluations_balanced, evaluations_constant = ejecutar_histograma(args.n, args.trials, seed=args.seed, usar_cache=not args.sin_cache)
+
+    if args.salida:
+        _guardar_json({
+            "n": args.n,
+            "total_trials": args.trials,
+            "evaluations_balanced": evaluations_balanced,
+            "evaluations_constant": evaluations_constant
+        }, args.salida)
+
+    if not args.headless:
+        graficar_histograma(args.n, evaluations_balanced, evaluations_constant, args.trials)
+        _mostrar_figuras(args)
+    imprimir_estadisticas(evaluations_balanced, evaluations_constant)
+
+
+def comando_aleatorio(args):
+    _usar_directorio("Clasico")
+    from clasicoaleatorio import curva_error, graficar_curva
+
+    curva = curva_error(args.n, range(1, args.k_max + 1), args.trials, reemplazo=not args.sin_reemplazo, semilla=args.seed)
+    print(f"{'k':>3} | {'Error empírico':>19} | {'Cota 2^(1-k)':>12}")
+    for punto in curva:
+        print(f"{punto['k']:>3} | {punto['error_balanceadas']:.6f} ± {punto['error_estandar']:.6f} | {punto['cota']:>12.6f}")
+
+    if args.salida:
+        _guardar_json({"n": args.n, "num_trials": args.trials, "curva": curva}, args.salida)
+
+    if not args.headless:
+        graficar_curva(args.n, curva)
+        _mostrar_figuras(args)
+
+
+def comando_ruido(args):
+    _usar_directorio("Cuantico")
+    import numpy as np
+    from Analisismodelosruido import (evaluate_accuracy_with_error, plot_accuracy_vs_noise_with_errors,
+                                      save_results_to_csv_with_errors)
+
+    noise_levels = np.linspace(0, args.nivel_max, args.niveles)
+    accuracy_results_dict = {}
+    error_results_dict = {}
+    for noise_type in args.tipos:
+        print(f"\nEvaluando modelo de ruido: {noise_type}")
+        if args.exacto:
+            from polinomioruido import curva_precision
+            medias, stds = curva_precision(args.n, noise_levels, noise_type, args.tests, args.oraculo,
+                                           usar_cache=not args.sin_cache)
+            accuracy_means, accuracy_stds = medias.tolist(), stds.tolist()
+        else:
+            accuracy_means, accuracy_stds = evaluate_accuracy_with_error(args.n, noise_levels, args.tests, args.runs,
+                                                                         noise_type, seed=args.seed,
+                                                                         usar_cache=not args.sin_cache,
+                                                                         modo_oraculo=args.oraculo, casos=args.casos)
+        accuracy_results_dict[noise_type] = accuracy_means
+        error_results_dict[noise_type] = accuracy_stds
+
+    save_results_to_csv_with_errors(noise_levels, accuracy_results_dict, error_results_dict, args.csv,
+                                    metadatos={"n": args.n, "num_tests": args.tests, "num_runs": args.runs,
+                                               "modo_oraculo": args.oraculo, "exacto": args.exacto,
+                                               "casos": args.casos})
+
+    if not args.headless:
+        plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, error_results_dict,
+                                           args.n, args.tests, args.runs)
+        _mostrar_figuras(args)
+
+
+def comando_hardware(args):
+    if args.destino == "simulador":
+        _usar_directorio("Cuantico", "Simulador")
+        from cuantico4cubits import ejecutar_experimento_deutsch_jozsa_estadistico
+    elif args.destino == "cesga4":
+        _usar_directorio("Cuantico", "Cesga")
+        from cuantico4qubits import ejecutar_experimento_deutsch_jozsa_estadistico
+    else:
+        _usar_directorio("Cuantico", "Cesga")
+        from cuantico2qubits import ejecutar_experimento
+        ejecutar_experimento(modo_oraculo=args.oraculo, tipo_backend=args.backend)
+        return
+
+    ejecutar_experimento_deutsch_jozsa_estadistico(
+        shots=args.shots,
+        num_constant=args.constantes,
+        num_balanced=args.balanceadas,
+        modo_oraculo=args.oraculo,
+        cadena=args.cadena,
+        semiamplitud_objetivo=args.semiamplitud,
+        **({"programas": args.programas, "puntuacion_relativa": args.puntuacion_relativa,
+            "tipo_backend": args.backend}
+           if args.destino == "cesga4" else {})
+    )
+
+
+def comando_graficos(args):
+    from renderizado import FIGURAS, renderizar
+
+    figuras = list(FIGURAS) if args.figura == "todas" else [args.figura]
+    for figura in figuras:
+        renderizar(figura, args.entrada, args.salida, forzar=args.forzar)
+
+
+def _opciones_globales(parser):
+    parser.add_argument("--headless", action="store_true",
+                        help="no mostrar figuras ni importar matplotlib en los subcomandos de cálculo")
+    parser.add_argument("--seed", type=int, help="semilla de random y NumPy")
+    parser.add_argument("--trazas", action="store_true", help="activar las trazas por etapa (DJ_TRAZAS=1)")
+    parser.add_argument("--auditoria", action="store_true",
+                        help="verificar los recuentos de evaluaciones contra las consultas reales (DJ_AUDITORIA=1)")
+    parser.add_argument("--sin-cache", action="store_true", help="recalcular todo sin usar la caché de resultados")
+    return parser
+
+
+def crear_parser():
+    parser = _opciones_globales(
+        argparse.ArgumentParser(description="Experimentos Deutsch-Jozsa clásicos, simulados y en hardware"))
+    # Las opciones globales también se aceptan después del subcomando; con SUPPRESS
+    # el subcomando no pisa con su valor por defecto las dadas antes de él
+    globales = _opciones_globales(argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS))
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("ajuste", parents=[globales], help="ajuste exponencial del algoritmo clásico")
+    p.add_argument("--n-min", type=int, default=2)
+    p.add_argument("--n-max", type=int, default=19)
+    p.add_argument("--trials", type=int, default=200)
+    p.add_argument("--bootstrap", type=int, default=0, help="remuestreos para los intervalos de los parámetros")
+    p.add_argument("--salida", help="guardar medias, errores y ajuste en este JSON")
+    p.set_defaults(funcion=comando_ajuste)
+
+    p = sub.add_parser("histograma", parents=[globales], help="histograma de evaluaciones del algoritmo clásico")
+    p.add_argument("--n", type=int, default=16, help="número m de entradas posibles de la función")
+    p.add_argument("--trials", type=int, default=6000)
+    p.add_argument("--salida", help="guardar las evaluaciones en este JSON")
+    p.set_defaults(funcion=comando_histograma)
+
+    p = sub.add_parser("aleatorio", parents=[globales], help="variante clásica aleatoria: error frente a número de consultas")
+    p.add_argument("--n", type=int, default=30)
+    p.add_argument("--k-max", type=int, default=20)
+    p.add_argument("--trials", type=int, default=200000)
+    p.add_argument("--sin-reemplazo", action="store_true", help="consultas en posiciones distintas")
+    p.add_argument("--salida", help="guardar la curva en este JSON")
+    p.set_defaults(funcion=comando_aleatorio)
+
+    p = sub.add_parser("ruido", parents=[globales], help="barrido de niveles y modelos de ruido")
+    p.add_argument("--n", type=int, default=4)
+    p.add_argument("--niveles", type=int, default=30)
+    p.add_argument("--nivel-max", type=float, default=1.0)
+    p.add_argument("--tests", type=int, default=100)
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--tipos", nargs="+", default=["depolarizing", "dephasing", "damping"])
+    p.add_argument("--csv", default="dj_noise_results_with_errors.csv")
+    p.add_argument("--casos", choices=["aleatorios", "exhaustivos", "estratificados"], default="aleatorios",
+                   help="casos de oráculo: sorteo por nivel, todos con pesos o estratificados, con el mismo "
+                        "plan en todos los niveles (números aleatorios comunes)")
+    p.add_argument("--exacto", action="store_true",
+                   help="curva exacta con el polinomio de cada caso en lugar de simular (ver Cuantico/polinomioruido.py)")
+    p.add_argument("--oraculo", choices=["lineal", "arbol"], default="lineal",
+                   help="construcción del oráculo balanceado (ver Cuantico/oraculoparidad.py)")
+    p.set_defaults(funcion=comando_ruido)
+
+    p = sub.add_parser("hardware", parents=[globales], help="ejecución en Qmio (CESGA) o en FakeQmio")
+    p.add_argument("destino", choices=["cesga2", "cesga4", "simulador"])
+    p.add_argument("--backend", choices=["qmio", "servidor"], default="qmio",
+                   help="Qmio o el servidor local de Cuantico/servidorlocal.py (cesga2 y cesga4)")
+    p.add_argument("--shots", type=int, default=1)
+    p.add_argument("--constantes", type=int, default=50)
+    p.add_argument("--balanceadas", type=int, default=250)
+    p.add_argument("--programas", type=int, default=1,
+                   help="pruebas por trabajo en grupos de qubits disjuntos (sólo cesga4)")
+    p.add_argument("--puntuacion-relativa", type=float, default=0.5,
+                   help="fracción de la puntuación del mejor grupo que debe alcanzar cada grupo (sólo cesga4)")
+    p.add_argument("--cadena", type=int, default=1,
+                   help="pruebas seguidas por grupo con medida y reset a mitad de circuito (cesga4 y simulador)")
+    p.add_argument("--semiamplitud", type=float,
+                   help="parar tras las pruebas que garantizan esta semiamplitud del IC 95%% de la precisión total "
+                        "en el peor caso (cesga4 y simulador)")
+    p.add_argument("--oraculo", choices=["lineal", "arbol"], default="lineal",
+                   help="construcción del oráculo balanceado (ver Cuantico/oraculoparidad.py)")
+    p.set_defaults(funcion=comando_hardware)
+
+    p = sub.add_parser("graficos", parents=[globales], help="redibujar figuras a partir de resultados guardados")
+    p.add_argument("figura", choices=["ajuste", "histograma", "aleatorio", "ruido", "cesga", "todas"])
+    p.add_argument("--entrada", nargs="+", help="ficheros de resultados (por defecto los de renderizado.FIGURAS)")
+    p.add_argument("--salida", help="fichero de imagen")
+    p.add_argument("--forzar", action="store_true", help="redibujar aunque los resultados no hayan cambiado")
+    p.set_defaults(funcion=comando_graficos)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    if args.trazas:
+        os.environ["DJ_TRAZAS"] = "1"
+    if args.auditoria:
+        os.environ["DJ_AUDITORIA"] = "1"
+    if args.seed is not None:
+        import numpy as np
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
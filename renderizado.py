@@ -0,0 +1,160 @@
+"""
+Regeneración de figuras a partir de resultados guardados.
+
+Cada figura se dibuja con el backend no interactivo Agg leyendo sólo los
+ficheros de resultados (JSON o CSV), sin repetir el cálculo. Un manifiesto
+(.renderizado.json, junto a las figuras) guarda el hash del contenido de las
+entradas y del código de la función de dibujo, de modo que sólo se redibujan
+las figuras cuyos datos o estilo han cambiado.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+for _directorio in (("Clasico",), ("Cuantico",), ("Cuantico", "Cesga")):
+    _path = os.path.join(RAIZ, *_directorio)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+NOMBRE_MANIFIESTO = ".renderizado.json"
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _leer_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dibujar_ajuste(entradas, salida):
+    from AjusteexponencialClasico import graficar_ajuste
+    datos = _leer_json(entradas[0])
+    fig = graficar_ajuste(datos["rango"], datos["media"], datos["error_estandar"], datos["ajuste"]["a"])
+    fig.savefig(salida, dpi=300, bbox_inches='tight')
+    return fig
+
+
+def _dibujar_histograma(entradas, salida):
+    from clasicohistograma import graficar_histograma
+    datos = _leer_json(entradas[0])
+    fig = graficar_histograma(datos["n"], datos["evaluations_balanced"], datos["evaluations_constant"], datos["total_trials"])
+    fig.savefig(salida, dpi=300, bbox_inches='tight')
+    return fig
+
+
+def _dibujar_aleatorio(entradas, salida):
+    from clasicoaleatorio import graficar_curva
+    datos = _leer_json(entradas[0])
+    fig = graficar_curva(datos["n"], datos["curva"])
+    fig.savefig(salida, dpi=300, bbox_inches='tight')
+    return fig
+
+
+def _dibujar_ruido(entradas, salida):
+    from Analisismodelosruido import load_results_from_csv, plot_accuracy_vs_noise_with_errors
+    noise_levels, accuracy_results_dict, error_results_dict, metadatos = load_results_from_csv(entradas[0])
+    metadatos = metadatos or {"n": 4, "num_tests": 100, "num_runs": 20}
+    return plot_accuracy_vs_noise_with_errors(noise_levels, accuracy_results_dict, error_results_dict,
+                                              metadatos["n"], metadatos["num_tests"], metadatos["num_runs"],
+                                              output_file=salida)
+
+
+def _dibujar_cesga(entradas, salida):
+    from graficocuantico import create_simple_comparison
+    return create_simple_comparison(entradas[0], entradas[1], output_file=salida, mostrar=False)
+
+
+# figura -> (función de dibujo, módulos cuyo código afecta al estilo, entradas por defecto, salida por defecto)
+FIGURAS = {
+    "ajuste": (_dibujar_ajuste, ["AjusteexponencialClasico"], ["ajuste.json"], "ajuste_clasico.png"),
+    "histograma": (_dibujar_histograma, ["clasicohistograma"], ["histograma.json"], "histograma_clasico.png"),
+    "aleatorio": (_dibujar_aleatorio, ["clasicoaleatorio"], ["aleatorio.json"], "clasico_aleatorio.png"),
+    "ruido": (_dibujar_ruido, ["Analisismodelosruido"], ["dj_noise_results_with_errors.csv"],
+              "deutsch_jozsa_noise_analysis_with_errors.png"),
+    "cesga": (_dibujar_cesga, ["graficocuantico"],
+              [os.path.join(RAIZ, "Cuantico", "Cesga", "2qubitscesga.json"),
+               os.path.join(RAIZ, "Cuantico", "Cesga", "4qubitscesga.json")],
+              "deutsch_jozsa_simple.png"),
+}
+
+
+def huella(figura, entradas):
+    """
+    Calcula el hash que identifica una figura: contenido de las entradas más
+    el código de la función de dibujo y de los módulos que la implementan.
+
+    Args:
+        figura: nombre de la figura en FIGURAS
+        entradas: ficheros de resultados
+
+    Returns:
+        cadena hexadecimal
+    """
+    dibujar, modulos, _, _ = FIGURAS[figura]
+    sha = hashlib.sha256()
+    sha.update(inspect.getsource(dibujar).encode())
+    for modulo in modulos:
+        with open(inspect.getfile(__import__(modulo)), 'rb') as f:
+            sha.update(f.read())
+    for path in entradas:
+        with open(path, 'rb') as f:
+            sha.update(hashlib.sha256(f.read()).digest())
+    return sha.hexdigest()
+
+
+def renderizar(figura, entradas=None, salida=None, forzar=False):
+    """
+    Dibuja una figura si sus entradas o su código han cambiado desde la
+    última vez.
+
+    Args:
+        figura: nombre de la figura (clave de FIGURAS)
+        entradas: ficheros de resultados (por defecto los de FIGURAS)
+        salida: fichero de imagen (por defecto el de FIGURAS)
+        forzar: redibujar aunque no haya cambios
+
+    Returns:
+        True si se ha redibujado, False si la figura estaba al día
+    """
+    dibujar, _, entradas_defecto, salida_defecto = FIGURAS[figura]
+    entradas = entradas or entradas_defecto
+    salida = salida or salida_defecto
+
+    path_manifiesto = os.path.join(os.path.dirname(os.path.abspath(salida)), NOMBRE_MANIFIESTO)
+    manifiesto = _leer_json(path_manifiesto) if os.path.exists(path_manifiesto) else {}
+
+    clave = os.path.abspath(salida)
+    valor = huella(figura, entradas)
+    if not forzar and manifiesto.get(clave) == valor and os.path.exists(salida):
+        print(f"{figura}: sin cambios ({salida})")
+        return False
+
+    # Cada función de dibujo guarda la figura en `salida` con su propia resolución
+    plt = _pyplot()
+    fig = dibujar(entradas, salida)
+    plt.close(fig)
+
+    manifiesto[clave] = valor
+    with open(path_manifiesto, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2)
+
+    print(f"{figura}: figura guardada en {salida}")
+    return True
+
+
+if __name__ == "__main__":
+    # Uso: python renderizado.py [figura ...]
+    for figura in sys.argv[1:] or FIGURAS:
+        entradas = FIGURAS[figura][2]
+        if all(os.path.exists(path) for path in entradas):
+            renderizar(figura)
+        else:
+            print(f"{figura}: faltan resultados ({', '.join(entradas)})")